@@ -1,5 +1,6 @@
 """EDI module"""
 
+from . import controllers
 from . import models
 from . import tests
 from . import wizard
@@ -19,6 +19,8 @@ Key Features
 * Autodetect EDI document type based on input files
 * Send and receive documents to/from remote EDI servers
 * Schedule polling of remote EDI servers
+* Queue EDI documents for processing by concurrent workers
+* Export throughput and backlog metrics to Prometheus
 * Process EDI documents via XML-RPC interface
 * Handle errors via Odoo issue tracker
     """,
@@ -34,17 +36,22 @@ Key Features
         'data/edi_gateway_local_data.xml',
         'data/edi_gateway_mail_data.xml',
         'data/edi_gateway_xmlrpc_data.xml',
+        'data/edi_job_data.xml',
         'data/edi_partner_data.xml',
         'data/edi_partner_tutorial_data.xml',
         'data/edi_raw_data.xml',
         'views/edi_menu_views.xml',
+        'views/edi_batch_tuning_views.xml',
         'views/edi_document_views.xml',
+        'views/edi_document_metrics_views.xml',
         'views/edi_document_type_views.xml',
         'views/edi_gateway_views.xml',
         'views/edi_gateway_path_views.xml',
+        'views/edi_job_views.xml',
         'views/edi_partner_views.xml',
         'views/edi_partner_title_views.xml',
         'views/edi_partner_tutorial_views.xml',
+        'views/edi_precache_path_views.xml',
         'views/edi_raw_views.xml',
         'views/edi_record_type_views.xml',
         'views/edi_transfer_views.xml',
@@ -0,0 +1,3 @@
+"""EDI controllers"""
+
+from . import main
@@ -0,0 +1,39 @@
+"""EDI HTTP controllers"""
+
+import hmac
+import odoo
+from odoo import api, http, SUPERUSER_ID
+from odoo.http import request
+from odoo.tools import config
+from ..tools import EdiOpenMetrics
+
+
+class EdiMetricsController(http.Controller):
+    """EDI metrics controller
+
+    Serves EDI throughput and backlog metrics in OpenMetrics text
+    format at ``/edi/metrics``.  The endpoint is disabled unless a
+    ``metrics_token`` option is present in the ``[edi]`` section of
+    the local configuration file, and requests must present this
+    token as an HTTP bearer token (e.g. via the Prometheus
+    ``bearer_token`` scrape option).
+    """
+
+    @http.route('/edi/metrics', type='http', auth='none', csrf=False)
+    def metrics(self, **_kwargs):
+        """Serve EDI metrics"""
+        token = config.get_misc('edi', 'metrics_token', None)
+        if not token or not request.db:
+            return request.not_found()
+        auth = request.httprequest.headers.get('Authorization', '')
+        if not hmac.compare_digest(auth, 'Bearer %s' % token):
+            return http.Response("Unauthorized", status=401, headers=[
+                ('WWW-Authenticate', 'Bearer'),
+            ])
+        with odoo.registry(request.db).cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            body = env['edi.openmetrics'].export()
+        return http.Response(body, headers=[
+            ('Content-Type', EdiOpenMetrics.CONTENT_TYPE),
+            ('Cache-Control', 'no-cache'),
+        ])
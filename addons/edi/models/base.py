@@ -0,0 +1,80 @@
+"""Base model extensions"""
+
+from itertools import chain
+from odoo import api, models
+from ..tools import lookup_cache
+
+
+class Base(models.AbstractModel):
+    """Base model
+
+    Invalidate the EDI lookup cache whenever records in an EDI lookup
+    relationship target model are created, written, or unlinked.
+    """
+
+    _inherit = 'base'
+
+    @api.model
+    def _edi_lookup_targets(self):
+        """Get EDI lookup relationship target models affected by each model
+
+        Returns a dictionary mapping the name of each model that may
+        affect any EDI lookup relationship target model (i.e. the
+        target model itself, or a parent via ``_inherits``) to the
+        set of affected target model names.  The dictionary is
+        computed once per registry.
+        """
+        registry = self.env.registry
+        targets = getattr(registry, 'edi_lookup_targets', None)
+        if targets is None:
+            names = frozenset(
+                model._fields[rel.target].comodel_name
+                for model in registry.values()
+                for rel in getattr(model, '_edi_relates', ())
+            )
+            targets = {}
+            for name, model in registry.items():
+                affected = names.intersection(
+                    chain((name,), model._inherits_children)
+                )
+                if affected:
+                    targets[name] = frozenset(affected)
+            registry.edi_lookup_targets = targets
+        return targets
+
+    @api.model_cr
+    def _register_hook(self):
+        # Recompute affected target models once all models are loaded
+        self.env.registry.edi_lookup_targets = None
+        return super()._register_hook()
+
+    @api.model
+    def _invalidate_edi_lookups(self):
+        """Invalidate EDI lookup cache entries for this model
+
+        Nothing is done unless this model may affect an EDI lookup
+        relationship target model.  Other processes are notified of
+        the invalidation (after commit).
+        """
+        affected = self._edi_lookup_targets().get(self._name)
+        if not affected:
+            return
+        cr = self.env.cr
+        for name in affected:
+            lookup_cache.invalidate(cr.dbname, name, cr=cr)
+        lookup_cache.signal(cr)
+
+    @api.model
+    def create(self, vals):
+        self._invalidate_edi_lookups()
+        return super().create(vals)
+
+    @api.multi
+    def write(self, vals):
+        self._invalidate_edi_lookups()
+        return super().write(vals)
+
+    @api.multi
+    def unlink(self):
+        self._invalidate_edi_lookups()
+        return super().unlink()
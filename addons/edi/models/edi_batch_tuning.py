@@ -0,0 +1,144 @@
+"""EDI batch size tuning"""
+
+from itertools import islice
+import logging
+from odoo import api, fields, models
+from odoo.tools import config
+from ..tools import batch_tuner
+
+_logger = logging.getLogger(__name__)
+
+
+class EdiBatchTuning(models.Model):
+    """EDI batch size tuning
+
+    Automatic batch size tuning is enabled via the ``batch_tuning``
+    option in the ``[edi]`` section of the local configuration file.
+    The learned batch size for each model and operation is bounded by
+    the ``batch_min`` and ``batch_max`` options, and is reduced
+    whenever the process peak memory usage grows by more than
+    ``batch_memory`` kilobytes during a single batch.
+
+    If automatic batch size tuning is disabled, then the batch size
+    is taken directly from the corresponding model attribute (e.g.
+    ``BATCH_SIZE``).
+
+    Learned batch sizes are persisted in this model, and are shared
+    by all processes using the same database.
+    """
+
+    _name = 'edi.batch.tuning'
+    _description = "EDI Batch Size"
+    _order = 'name, operation'
+
+    name = fields.Char(string="Model", required=True, readonly=True,
+                       index=True)
+    operation = fields.Char(string="Operation", required=True, readonly=True)
+    size = fields.Integer(string="Batch Size", required=True)
+    cost = fields.Float(string="Time per Record (ms)", readonly=True)
+    queries = fields.Float(string="Queries per Record", readonly=True)
+    memory = fields.Integer(string="Peak Memory Growth (kB)", readonly=True)
+    samples = fields.Integer(string="Samples", readonly=True)
+
+    _sql_constraints = [
+        ('name_operation_uniq', 'unique (name, operation)',
+         "The batch size must be unique per model and operation")
+    ]
+
+    @api.model
+    def tuner(self):
+        """Get configured batch size tuner (or ``None`` if disabled)"""
+        if not config.get_misc('edi', 'batch_tuning', False):
+            return None
+        batch_tuner.configure(
+            minimum=config.get_misc('edi', 'batch_min', None),
+            maximum=config.get_misc('edi', 'batch_max', None),
+            memory=config.get_misc('edi', 'batch_memory', None),
+        )
+        return batch_tuner
+
+    @api.model
+    def batch_size(self, model, operation):
+        """Get batch size for a model and operation
+
+        The default batch size is taken from the model attribute named
+        by ``operation``.
+        """
+        default = getattr(model, operation)
+        tuner = self.tuner()
+        if tuner is None:
+            return default
+        key = (self.env.cr.dbname, model._name, operation)
+        if key not in tuner:
+            learned = self.search([('name', '=', model._name),
+                                   ('operation', '=', operation)])
+            if learned:
+                default = learned.size
+        return tuner.size(key, default)
+
+    @api.model
+    def batched(self, model, operation, iterable):
+        """Iterate over iterable in automatically tuned batches
+
+        Yields ``(range, batch)`` tuples in the same way as
+        :func:`~..tools.batched`.  Each batch is measured while it is
+        being processed by the caller, and the batch size is adjusted
+        before the next batch is retrieved.  Batches of a recordset
+        are themselves recordsets.
+        """
+        concat = list
+        if isinstance(iterable, models.BaseModel):
+            concat = lambda s: iterable.browse(x.id for x in s)
+        iterator = iter(iterable)
+        start = 0
+        while True:
+            size = self.batch_size(model, operation)
+            batch = concat(islice(iterator, size))
+            if not batch:
+                break
+            tuner = self.tuner()
+            with self.statistics() as stats:
+                yield (range(start, start + len(batch)), batch)
+            if tuner is not None:
+                key = (self.env.cr.dbname, model._name, operation)
+                new = tuner.record(key, size, len(batch), stats.elapsed,
+                                   stats.count, stats.memory)
+                if new != size:
+                    _logger.info("%s %s batch size tuned from %d to %d",
+                                 model._name, operation, size, new)
+            start += len(batch)
+
+    @api.model
+    def store(self):
+        """Persist learned batch sizes
+
+        Learned batch sizes are upserted, so that concurrent processes
+        storing the same model and operation cannot violate the
+        uniqueness constraint.
+        """
+        tuner = self.tuner()
+        if tuner is None:
+            return
+        dbname = self.env.cr.dbname
+        flushed = tuner.flush(lambda x: x[0] == dbname)
+        for key, samples in flushed.items():
+            (_dbname, name, operation) = key
+            self.env.cr.execute(
+                'INSERT INTO "%s" (name, operation, size, cost, queries, '
+                'memory, samples, create_uid, create_date, write_uid, '
+                'write_date) VALUES (%%s, %%s, %%s, %%s, %%s, %%s, %%s, '
+                '%%s, (now() at time zone \'UTC\'), %%s, '
+                '(now() at time zone \'UTC\')) '
+                'ON CONFLICT (name, operation) DO UPDATE SET '
+                'size = EXCLUDED.size, cost = EXCLUDED.cost, '
+                'queries = EXCLUDED.queries, memory = EXCLUDED.memory, '
+                'samples = "%s".samples + EXCLUDED.samples, '
+                'write_uid = EXCLUDED.write_uid, '
+                'write_date = EXCLUDED.write_date' % (self._table,
+                                                       self._table),
+                (name, operation, tuner.sizes[key], tuner.costs[key] * 1000,
+                 tuner.queries[key], tuner.peaks[key], samples,
+                 self.env.uid, self.env.uid)
+            )
+        if flushed:
+            self.invalidate_cache()
@@ -1,12 +1,17 @@
 """EDI documents"""
 
 from base64 import b64decode, b64encode
-from collections import namedtuple
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+from itertools import zip_longest
+import json
 import logging
+import threading
+from psycopg2 import OperationalError
 from odoo import api, fields, models
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
 from odoo.tools.translate import _
-from ..tools import NoRecordValuesError
+from ..tools import lookup_cache, EdiQueryAnalyser, NoRecordValuesError
 
 _logger = logging.getLogger(__name__)
 
@@ -77,9 +82,46 @@ class EdiDocumentType(models.Model):
     active = fields.Boolean(default=True, string='Active',
                             help='Display in list views or searches.')
 
+    # Compare inputs against the previous document of the same type
+    delta = fields.Boolean(string="Delta Input", default=False,
+                           help="Process only input lines that have "
+                           "changed since the previous successfully "
+                           "executed document of this type")
+
+    # Commit execution in checkpointed batches
+    chunked = fields.Boolean(string="Chunked Execution", default=False,
+                             help="Execute and commit records in batches, "
+                             "allowing failed execution to be resumed")
+
+    # Execute independent record types concurrently
+    parallel = fields.Boolean(string="Parallel Execution", default=False,
+                              help="Execute record types with no mutual "
+                              "dependencies concurrently")
+
+    # Analyse queries for N+1 patterns
+    analyse = fields.Boolean(string="Query Analysis", default=False,
+                             help="Analyse database queries and attach a "
+                             "report of N+1 query patterns to each document")
+
+    # Sampling profiler
+    profile = fields.Boolean(string="Profiling", default=False,
+                             help="Run a sampling profiler during preparation "
+                             "and execution, and attach a flame graph and "
+                             "a list of hot spots to each document")
+
     _sql_constraints = [('model_uniq', 'unique (model_id)',
                          "The document model must be unique")]
 
+    @api.multi
+    @api.constrains('delta', 'model_id')
+    def _check_delta(self):
+        for doc_type in self.filtered('delta'):
+            DocModel = self.env[doc_type.model_id.model]
+            if not getattr(DocModel, '_edi_delta', False):
+                raise ValidationError(_("Document model %s does not support "
+                                        "delta input") %
+                                      doc_type.model_id.model)
+
     @api.model
     def autocreate(self, inputs):
         """Autocreate documents based on input attachments"""
@@ -146,6 +188,7 @@ class EdiDocument(models.Model):
     state = fields.Selection([('draft', "New"),
                               ('cancel', "Cancelled"),
                               ('prep', "Prepared"),
+                              ('part', "Partially Executed"),
                               ('done', "Completed")],
                              string="Status", readonly=True, index=True,
                              default='draft', copy=False,
@@ -158,6 +201,18 @@ class EdiDocument(models.Model):
                                    copy=False)
     note = fields.Text(string="Notes")
 
+    # Execution checkpoint (for chunked execution)
+    checkpoint_rec_type_id = fields.Many2one('edi.record.type',
+                                             string="Checkpoint Record Type",
+                                             readonly=True, copy=False)
+    checkpoint_rec_id = fields.Integer(string="Checkpoint Record",
+                                       readonly=True, copy=False)
+
+    # Executed record types (for parallel execution)
+    executed_rec_type_ids = fields.Many2many('edi.record.type',
+                                             string="Executed Record Types",
+                                             readonly=True, copy=False)
+
     # Communications
     transfer_id = fields.Many2one('edi.transfer', string="Transfer",
                                   readonly=True, copy=False, index=True)
@@ -251,6 +306,44 @@ class EdiDocument(models.Model):
             })
         return new
 
+    @api.model
+    def claim(self):
+        """Claim the oldest unprocessed document (if any)
+
+        Documents with open issues are ignored.  The claimed document
+        is locked using both a row-level lock and a session-level
+        advisory lock, and will be skipped by any concurrent callers.
+        The advisory lock survives any intermediate commits (e.g. for
+        chunked or parallel execution), and must be released using
+        :meth:`~.release`.
+        """
+        skip = [0]
+        while True:
+            self.env.cr.execute(
+                'SELECT id FROM "%s" WHERE state IN %%s AND issue_count = 0 '
+                'AND id NOT IN %%s ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED'
+                % self._table, (('draft', 'prep', 'part'), tuple(skip))
+            )
+            row = self.env.cr.fetchone()
+            if row is None:
+                return self.browse()
+            self.env.cr.execute(
+                "SELECT pg_try_advisory_lock(%s::regclass::oid::integer, %s)",
+                (self._table, row[0])
+            )
+            if self.env.cr.fetchone()[0]:
+                return self.browse(row[0])
+            skip.append(row[0])
+
+    @api.multi
+    def release(self):
+        """Release documents claimed using :meth:`~.claim`"""
+        for doc in self:
+            self.env.cr.execute(
+                "SELECT pg_advisory_unlock(%s::regclass::oid::integer, %s)",
+                (self._table, doc.id)
+            )
+
     @api.multi
     def lock_for_action(self):
         """Lock document"""
@@ -258,15 +351,108 @@ class EdiDocument(models.Model):
             # Obtain a database row-level exclusive lock by writing the record
             doc.state = doc.state
 
+    @api.multi
+    def relock(self):
+        """Reacquire document lock after committing
+
+        Committing releases the row-level lock obtained by
+        :meth:`~.lock_for_action`.  The lock is reacquired without
+        waiting, and the document state and execution checkpoint are
+        checked to ensure that no other process has acted upon the
+        document in the meantime.
+
+        The lock is obtained using ``FOR NO KEY UPDATE`` (as for an
+        ``UPDATE`` statement), so that worker threads may still create
+        records referring to the document.
+        """
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute(
+                    'SELECT state, checkpoint_rec_type_id, checkpoint_rec_id '
+                    'FROM "%s" WHERE id = %%s FOR NO KEY UPDATE NOWAIT' %
+                    self._table, (self.id,)
+                )
+                row = self.env.cr.fetchone()
+        except OperationalError:
+            row = None
+        expected = (self.state, self.checkpoint_rec_type_id.id or None,
+                    self.checkpoint_rec_id or 0)
+        if row is None or (row[0], row[1], row[2] or 0) != expected:
+            raise UserError(_("Document %s was modified by another process") %
+                            self.name)
+
     @api.multi
     def inputs(self):
-        """Iterate over decoded input attachments"""
+        """Iterate over decoded input attachments
+
+        If the document type uses delta input, then each input
+        attachment is compared line by line against the corresponding
+        input attachment of the previous successfully executed
+        document of the same type (if any), and only the changed or
+        added lines are included.  If the context key ``edi_delta``
+        is set to ``removed``, then only the removed lines are
+        included instead.
+        """
         self.ensure_one()
         if not self.input_ids:
             raise UserError(_("Missing input attachment"))
+        previous = self.delta_document()
+        if previous:
+            removed = (self.env.context.get('edi_delta') == 'removed')
+            return self.delta_inputs(previous, removed=removed)
         return ((x.datas_fname, b64decode(x.datas))
                 for x in self.input_ids.sorted('id'))
 
+    @api.multi
+    def delta_document(self):
+        """Get previous document for delta input comparison (if any)"""
+        self.ensure_one()
+        if not self.doc_type_id.delta:
+            return self.browse()
+        return self.search([('doc_type_id', '=', self.doc_type_id.id),
+                            ('state', '=', 'done'),
+                            ('id', '!=', self.id)],
+                           order='execute_date desc, id desc', limit=1)
+
+    @api.multi
+    def delta_inputs(self, previous, removed=False):
+        """Iterate over changed lines of decoded input attachments
+
+        Input attachments are paired with the input attachments of
+        the ``previous`` document in order of creation.  Each line is
+        treated as a member of a multiset, so that duplicated lines
+        are handled correctly and reordered lines are not treated as
+        changes.  Any header lines (as defined by the document
+        model) are always included.
+        """
+        self.ensure_one()
+        DocModel = self.env[self.doc_type_id.model_id.model]
+        header = DocModel._edi_delta_header
+        pairs = zip_longest(self.input_ids.sorted('id'),
+                            previous.input_ids.sorted('id'))
+        for current, old in pairs:
+            if removed:
+                (current, old) = (old, current)
+            if not current:
+                continue
+            lines = b64decode(current.datas).splitlines()
+            unmatched = Counter(b64decode(old.datas).splitlines()[header:]
+                                if old else ())
+            changed = []
+            for line in lines[header:]:
+                if unmatched[line]:
+                    unmatched[line] -= 1
+                else:
+                    changed.append(line)
+            del unmatched
+            _logger.info("%s delta %s %s: %d of %d lines", self.name,
+                         current.datas_fname,
+                         ('removed' if removed else 'changed'),
+                         len(changed), len(lines))
+            yield (current.datas_fname,
+                   b''.join(line + b'\n' for line in lines[:header] + changed))
+
     @api.multi
     def input(self):
         """Get single decoded input attachment"""
@@ -292,20 +478,326 @@ class EdiDocument(models.Model):
 
     @api.multi
     def execute_records(self):
-        """Execute records"""
+        """Execute records
+
+        If the document type uses chunked execution, then records are
+        executed via :meth:`~.execute_records_chunked`.
+        """
         self.ensure_one()
+        if self.doc_type_id.chunked:
+            self.execute_records_chunked()
+            return
+        if self.doc_type_id.parallel:
+            self.execute_records_parallel()
+            return
         for rec_type in self.doc_type_id.rec_type_ids:
+            self.execute_rec_type(rec_type)
+
+    @api.multi
+    def execute_rec_type(self, rec_type, worker=None):
+        """Execute records of a single record type"""
+        self.ensure_one()
+        RecModel = self.env[rec_type.model_id.model]
+        recs = RecModel.search([('doc_id', '=', self.id)])
+        with self.statistics() as stats:
+            recs.execute()
+            self.recompute()
+        count = len(recs)
+        self.record_metrics('records', stats, model=RecModel._name,
+                            records_in=count)
+        if count:
+            _logger.info("%s executed %s in %.2fs, %d records, %d queries "
+                         "(%d per record)%s", self.name, RecModel._name,
+                         stats.elapsed, count, stats.count,
+                         (stats.count / count),
+                         (" in worker %s" % worker if worker else ""))
+
+    @api.multi
+    def rec_type_waves(self):
+        """Group record types into waves of mutually independent types
+
+        Each wave comprises the record types for which all declared
+        dependencies have been satisfied by the preceding waves.
+        """
+        self.ensure_one()
+        rec_types = self.doc_type_id.rec_type_ids
+        remaining = rec_types
+        waves = []
+        while remaining:
+            # pylint: disable=cell-var-from-loop
+            wave = remaining.filtered(
+                lambda x: not (x.depends_ids & remaining)
+            )
+            if not wave:
+                raise UserError(_("Circular record type dependencies: %s") %
+                                ", ".join(remaining.mapped('name')))
+            waves.append(wave)
+            remaining -= wave
+        return waves
+
+    @api.multi
+    def execute_records_parallel(self):
+        """Execute independent record types in parallel
+
+        Record types are grouped into waves using
+        :meth:`~.rec_type_waves`.  The record types within each wave
+        are executed concurrently in worker threads, each using its
+        own database cursor and environment, and all workers are
+        joined before the next wave starts.
+
+        Since worker cursors can see only committed changes, the
+        document is marked as partially executed and any pending
+        changes are committed before each parallel wave.  Each record
+        type is recorded as executed (using :meth:`~.mark_executed`)
+        within the same transaction as its records, and any
+        subsequent execution will skip record types that have already
+        been executed.  Record types are always executed serially
+        when running unit tests, which must remain within a single
+        transaction.
+        """
+        self.ensure_one()
+        testing = getattr(threading.currentThread(), 'testing', False)
+        self.state = 'part'
+        for wave in self.pending_rec_type_waves():
+            if len(wave) == 1 or testing:
+                for rec_type in wave:
+                    with self.env.cr.savepoint():
+                        self.execute_rec_type(rec_type)
+                        self.mark_executed(rec_type)
+                    self.commit_and_relock()
+            else:
+                self.execute_rec_types_parallel(wave)
+
+    @api.multi
+    def pending_rec_type_waves(self):
+        """Group record types not yet executed into waves
+
+        Record types that have already been executed (e.g. before a
+        failure in a subsequent wave) are omitted, along with any
+        waves left empty as a result.
+        """
+        self.ensure_one()
+        executed = self.executed_rec_type_ids
+        waves = (wave - executed for wave in self.rec_type_waves())
+        return [wave for wave in waves if wave]
+
+    @api.multi
+    def execute_rec_types_parallel(self, rec_types):
+        """Execute record types concurrently in worker threads
+
+        Any pending changes are committed before the workers are
+        started.  The first error raised by any worker is reraised
+        once all workers have been joined.
+        """
+        self.ensure_one()
+        self.commit_and_relock()
+        errors = {}
+        workers = [
+            threading.Thread(target=self._execute_worker,
+                             args=(rec_type.id, errors),
+                             name='edi-%s' % rec_type.model_id.model)
+            for rec_type in rec_types
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.invalidate_cache()
+        if errors:
+            raise next(iter(errors.values()))
+
+    @api.multi
+    def _execute_worker(self, rec_type_id, errors):
+        """Execute records of a single record type in a worker thread"""
+        # pylint: disable=broad-except
+        with api.Environment.manage(), self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            doc = self.with_env(env)
+            rec_type = env['edi.record.type'].browse(rec_type_id)
+            try:
+                doc.execute_rec_type(rec_type,
+                                     worker=threading.current_thread().name)
+                doc.mark_executed(rec_type)
+            except Exception as err:
+                cr.rollback()
+                errors[rec_type_id] = err
+
+    @api.multi
+    def mark_executed(self, rec_type):
+        """Record execution of a record type
+
+        The relation table is updated directly, without writing to
+        the document itself, since the document may be locked by the
+        thread that started the worker calling this method.
+        """
+        self.ensure_one()
+        field = self._fields['executed_rec_type_ids']
+        self.env.cr.execute(
+            'INSERT INTO "%s" ("%s", "%s") VALUES (%%s, %%s) '
+            'ON CONFLICT DO NOTHING' % (field.relation, field.column1,
+                                        field.column2),
+            (self.id, rec_type.id)
+        )
+        self.invalidate_cache(['executed_rec_type_ids'], self.ids)
+
+    @api.multi
+    def execute_records_chunked(self):
+        """Execute records in checkpointed batches
+
+        Each batch of :attr:`~.BATCH_SIZE` records of each record type
+        is executed within its own transaction.  An execution
+        checkpoint (the record type and the last executed record ID)
+        is recorded and committed after each batch, and the document
+        is marked as partially executed.  Any subsequent execution
+        will resume from the checkpoint.
+
+        Lookup relationships between records in different batches may
+        be resolved only if the referenced record appears in an
+        earlier batch.
+        """
+        self.ensure_one()
+        rec_types = self.doc_type_id.rec_type_ids
+        if self.checkpoint_rec_type_id in rec_types:
+            rec_types = rec_types[
+                rec_types.ids.index(self.checkpoint_rec_type_id.id):
+            ]
+        for rec_type in rec_types:
             RecModel = self.env[rec_type.model_id.model]
-            recs = RecModel.search([('doc_id', '=', self.id)])
-            with self.statistics() as stats:
-                recs.execute()
-                self.recompute()
-            count = len(recs)
-            if count:
-                _logger.info("%s executed %s in %.2fs, %d records, %d queries "
-                             "(%d per record)", self.name, RecModel._name,
-                             stats.elapsed, count, stats.count,
-                             (stats.count / count))
+            domain = [('doc_id', '=', self.id)]
+            if rec_type == self.checkpoint_rec_type_id:
+                domain.append(('id', '>', self.checkpoint_rec_id))
+            recs = RecModel.search(domain, order='id')
+            for r, batch in recs.batched(RecModel.BATCH_SIZE):
+                with self.statistics() as stats, self.env.cr.savepoint():
+                    batch.execute()
+                    self.recompute()
+                self.checkpoint(rec_type, batch[-1].id)
+                _logger.info("%s executed %s %d-%d of %d in %.2fs, %d "
+                             "queries", self.name, RecModel._name, r[0],
+                             r[-1], len(recs), stats.elapsed, stats.count)
+
+    @api.multi
+    def checkpoint(self, rec_type, rec_id):
+        """Record execution checkpoint
+
+        The checkpoint is committed immediately using
+        :meth:`~.commit_and_relock`.
+        """
+        self.ensure_one()
+        self.write({
+            'state': 'part',
+            'checkpoint_rec_type_id': rec_type.id,
+            'checkpoint_rec_id': rec_id,
+        })
+        self.commit_and_relock()
+
+    @api.multi
+    def commit_and_relock(self):
+        """Commit pending changes and reacquire document lock
+
+        Nothing is committed when running unit tests, which must
+        remain within a single transaction.
+        """
+        self.ensure_one()
+        if not getattr(threading.currentThread(), 'testing', False):
+            self.env.cr.commit()
+            self.relock()
+
+    @api.multi
+    def record_count(self):
+        """Count EDI records of all record types"""
+        return sum(self.record_counts().values())
+
+    @api.multi
+    def record_counts(self):
+        """Count EDI records of each record type (indexed by model)"""
+        self.ensure_one()
+        counts = Counter()
+        for rec_type in self.doc_type_id.rec_type_ids:
+            model = rec_type.model_id.model
+            counts[model] += self.env[model].search_count([
+                ('doc_id', '=', self.id)
+            ])
+        return counts
+
+    @api.multi
+    def analyser(self):
+        """Construct query analyser
+
+        The query analyser will be inactive unless query analysis is
+        enabled for the document type.
+        """
+        self.ensure_one()
+        return EdiQueryAnalyser(self.env.cr, filter=self.doc_type_id.analyse)
+
+    @api.multi
+    def report_queries(self, analyser, phase):
+        """Attach N+1 query pattern report
+
+        The report is attached to the document as a JSON file, listing
+        the queries that were issued at least once per EDI record of
+        any single record type from the same call site.  Queries
+        issued by worker threads during parallel execution are not
+        included.
+        """
+        self.ensure_one()
+        if not analyser.counts:
+            return
+        records = self.record_counts()
+        offenders = analyser.report(records)
+        report = {
+            'document': self.name,
+            'phase': phase,
+            'records': dict(records),
+            'queries': sum(analyser.counts.values()),
+            'fingerprints': len(analyser.counts),
+            'offenders': offenders,
+        }
+        _logger.info("%s %s issued %d queries with %d N+1 patterns",
+                     self.name, phase, report['queries'], len(offenders))
+        self.message_post(
+            body=(_("Query analysis (%s): %d queries, %d N+1 patterns") %
+                  (phase, report['queries'], len(offenders))),
+            attachments=[('%s.%s.queries.json' % (self.name, phase),
+                          json.dumps(report, indent=2).encode())],
+        )
+
+    @api.multi
+    def report_profile(self, stats, phase):
+        """Attach sampling profiler report
+
+        The collapsed call stacks (suitable for input to a flame graph
+        tool such as ``flamegraph.pl`` or speedscope) and the
+        functions with the highest self time are attached to the
+        document.  Worker threads used during parallel execution are
+        not sampled.
+        """
+        self.ensure_one()
+        profiler = stats.profiler
+        if profiler is None or not profiler.samples:
+            return
+        top = profiler.top()
+        report = {
+            'document': self.name,
+            'phase': phase,
+            'elapsed': stats.elapsed,
+            'samples': profiler.samples,
+            'interval': profiler.interval,
+            'top': top,
+        }
+        _logger.info("%s %s profiled with %d samples, hottest %s",
+                     self.name, phase, profiler.samples, top[0]['function'])
+        self.message_post(
+            body=(_("Profile (%s): %d samples, hottest %s (%.0f%%)") %
+                  (phase, profiler.samples, top[0]['function'],
+                   top[0]['fraction'] * 100)),
+            attachments=[
+                ('%s.%s.collapsed.txt' % (self.name, phase),
+                 profiler.collapsed().encode()),
+                ('%s.%s.profile.json' % (self.name, phase),
+                 json.dumps(report, indent=2).encode()),
+            ],
+        )
 
     @api.multi
     def action_prepare(self):
@@ -324,26 +816,38 @@ class EdiDocument(models.Model):
         self.close_issues()
         # Create audit trail
         Audit = self.env['edi.attachment.audit']
-        Audit.audit_attachments(self, self.input_ids,
-                                body=_("Input attachments"))
+        with self.statistics() as stats:
+            Audit.audit_attachments(self, self.input_ids,
+                                    body=_("Input attachments"))
+        self.record_metrics('audit', stats, records_in=len(self.input_ids))
         # Prepare document
         _logger.info("Preparing %s", self.name)
         DocModel = self.env[self.doc_type_id.model_id.model]
         env = self.with_context(tracking_disable=True, recompute=False).env
+        analyser = self.analyser()
+        stats = self.statistics(profile=self.doc_type_id.profile)
         try:
             # pylint: disable=broad-except
-            with self.statistics() as stats, env.cr.savepoint(),\
-                                             env.clear_upon_failure():
+            with stats, analyser, env.cr.savepoint(),\
+                    env.clear_upon_failure():
                 self.prepare_date = fields.Datetime.now()
                 DocModel.with_env(env).prepare(self.with_env(env))
                 self.recompute()
         except Exception as err:
+            # Discard buffered lookups that may refer to rolled back records
+            lookup_cache.rollback(env.cr)
             self.raise_issue(_("Preparation failed: %s"), err)
             return False
+        finally:
+            self.report_queries(analyser, 'prepare')
+            self.report_profile(stats, 'prepare')
         # Mark as prepared
         self.state = 'prep'
-        _logger.info("Prepared %s in %.2fs, %d queries",
-                     self.name, stats.elapsed, stats.count)
+        self.env['edi.batch.tuning'].store()
+        self.record_metrics('prepare', stats, records_out=self.record_count())
+        _logger.info("Prepared %s in %.2fs, %d queries, %d lookup cache hits "
+                     "(%d misses)", self.name, stats.elapsed, stats.count,
+                     stats.hits, stats.misses)
         return True
 
     @api.multi
@@ -384,7 +888,7 @@ class EdiDocument(models.Model):
             if not prepared:
                 return False
         # Check document state
-        if self.state != 'prep':
+        if self.state not in ('prep', 'part'):
             raise UserError(_("Cannot execute a %s document") %
                             self._get_state_name())
         # Close any stale issues
@@ -393,24 +897,44 @@ class EdiDocument(models.Model):
         _logger.info("Executing %s", self.name)
         DocModel = self.env[self.doc_type_id.model_id.model]
         env = self.with_context(tracking_disable=True, recompute=False).env
+        # Chunked and parallel execution commit intermediate changes,
+        # and so cannot take place within a savepoint
+        doc_type = self.doc_type_id
+        savepoint = (ExitStack() if doc_type.chunked or doc_type.parallel
+                     else env.cr.savepoint())
+        analyser = self.analyser()
+        stats = self.statistics(profile=doc_type.profile)
         try:
             # pylint: disable=broad-except
-            with self.statistics() as stats, env.cr.savepoint(),\
-                                             env.clear_upon_failure():
+            with stats, analyser, savepoint, env.clear_upon_failure():
                 DocModel.with_env(env).execute(self.with_env(env))
                 self.recompute()
         except Exception as err:
+            # Discard buffered lookups that may refer to rolled back records
+            lookup_cache.rollback(env.cr)
             self.raise_issue(_("Execution failed: %s"), err)
             return False
+        finally:
+            self.report_queries(analyser, 'execute')
+            self.report_profile(stats, 'execute')
         # Create audit trail
         Audit = self.env['edi.attachment.audit']
-        Audit.audit_attachments(self, self.output_ids,
-                                body=_("Output attachments"))
+        with self.statistics() as audit_stats:
+            Audit.audit_attachments(self, self.output_ids,
+                                    body=_("Output attachments"))
+        self.record_metrics('audit', audit_stats,
+                            records_out=len(self.output_ids))
         # Mark as processed
         self.execute_date = fields.Datetime.now()
         self.state = 'done'
-        _logger.info("Executed %s in %.2fs, %d queries",
-                     self.name, stats.elapsed, stats.count)
+        self.checkpoint_rec_type_id = False
+        self.checkpoint_rec_id = 0
+        self.executed_rec_type_ids = [(5,)]
+        self.env['edi.batch.tuning'].store()
+        self.record_metrics('execute', stats, records_in=self.record_count())
+        _logger.info("Executed %s in %.2fs, %d queries, %d lookup cache hits "
+                     "(%d misses)", self.name, stats.elapsed, stats.count,
+                     stats.hits, stats.misses)
         return True
 
     @api.multi
@@ -468,6 +992,19 @@ class EdiDocumentModel(models.AbstractModel):
     _name = 'edi.document.model'
     _description = "EDI Document Model"
 
+    _edi_delta = False
+    """Input attachments may be compared line by line for delta input
+
+    This should be set only for document models whose input
+    attachments comprise independent lines (such as headerless CSV
+    files), since delta input passes only the changed lines to the
+    document model.  Formats with records spanning multiple lines
+    (such as SAP IDocs or JSON documents) must never set this.
+    """
+
+    _edi_delta_header = 0
+    """Number of header lines always included in delta input"""
+
     @api.model
     def record_models(self, doc, supermodel='edi.record'):
         """Get EDI record model classes"""
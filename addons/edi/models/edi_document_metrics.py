@@ -0,0 +1,76 @@
+"""EDI document performance metrics"""
+
+from odoo import api, fields, models, tools
+
+
+class EdiDocument(models.Model):
+    """Extend ``edi.document`` to include performance metrics"""
+
+    _inherit = 'edi.document'
+
+    metric_ids = fields.One2many('edi.document.metrics', 'doc_id',
+                                 string="Performance", readonly=True)
+
+    @api.multi
+    def record_metrics(self, phase, stats, **kwargs):
+        """Record performance metrics for a processing phase
+
+        The wall time, query count, and growth in process peak memory
+        usage are taken from the :class:`~..tools.EdiStatistics` object
+        ``stats``, and may be overridden along with any other metrics
+        field values via keyword arguments.
+        """
+        self.ensure_one()
+        vals = {
+            'doc_id': self.id,
+            'doc_type_id': self.doc_type_id.id,
+            'phase': phase,
+            'elapsed': stats.elapsed,
+            'queries': stats.count,
+            'memory': stats.memory,
+        }
+        vals.update(kwargs)
+        return self.env['edi.document.metrics'].create(vals)
+
+
+class EdiDocumentMetrics(models.Model):
+    """EDI document performance metrics
+
+    Each record captures the performance of a single processing phase
+    of an EDI document, optionally restricted to a single EDI record
+    model.
+    """
+
+    _name = 'edi.document.metrics'
+    _description = "EDI Document Metrics"
+    _order = 'id'
+
+    doc_id = fields.Many2one('edi.document', string="Document",
+                             required=True, readonly=True, index=True,
+                             ondelete='cascade')
+    doc_type_id = fields.Many2one('edi.document.type', string="Document Type",
+                                  readonly=True, index=True)
+    phase = fields.Selection([('prepare', "Preparation"),
+                              ('create', "Record Creation"),
+                              ('elide', "Record Elision"),
+                              ('relates', "Lookup Relationships"),
+                              ('records', "Record Execution"),
+                              ('execute', "Execution"),
+                              ('audit', "Audit")],
+                             string="Phase", required=True, readonly=True,
+                             index=True)
+    model = fields.Char(string="Record Model", readonly=True, index=True)
+    elapsed = fields.Float(string="Wall Time (s)", readonly=True)
+    queries = fields.Integer(string="Queries", readonly=True)
+    records_in = fields.Integer(string="Records In", readonly=True)
+    records_out = fields.Integer(string="Records Out", readonly=True)
+    elided = fields.Integer(string="Elided", readonly=True)
+    memory = fields.Integer(string="Peak Memory Growth (kB)",
+                            readonly=True, group_operator='max')
+
+    @api.model_cr
+    def init(self):
+        """Create index for :meth:`edi.openmetrics.recent` queries"""
+        super().init()
+        tools.create_index(self._cr, 'edi_document_metrics_phase_date_index',
+                           self._table, ['phase', 'create_date'])
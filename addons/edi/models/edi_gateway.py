@@ -117,6 +117,15 @@ class EdiGateway(models.Model):
     )
     automatic = fields.Boolean(string="Process automatically", default=True)
     resend = fields.Boolean(string="Resend missing files", default=True)
+    queue = fields.Boolean(
+        string="Queue documents", default=False,
+        help="""Queue received documents for processing
+
+        If set, received documents will be queued for processing by
+        EDI job workers rather than being processed within the
+        transfer.
+        """,
+    )
 
     # Authentication
     username = fields.Char(string="Username")
@@ -339,6 +348,7 @@ class EdiGateway(models.Model):
         })
         self.lock_for_transfer(transfer)
         Model = self.env[self.model_id.model]
+        stats = self.statistics()
         try:
             # pylint: disable=broad-except
             if self.safety:
@@ -360,6 +370,8 @@ class EdiGateway(models.Model):
                     transfer.do_transfer(auto_conn)
         except Exception as err:
             transfer.raise_issue(_("Transfer failed: %s"), err)
+        stats.stop()
+        transfer.duration = stats.elapsed
         return transfer
 
     @api.multi
@@ -54,7 +54,8 @@ class EdiIssue(models.AbstractModel):
                                 domain=['|', ('stage_id.fold', '=', False),
                                         ('stage_id', '=', False)])
     issue_count = fields.Integer(string="Issue Count",
-                                 compute='_compute_issue_counts', store=True)
+                                 compute='_compute_issue_counts', store=True,
+                                 index=True)
     rel_issue_count = fields.Integer(string="Related Issue Count",
                                      compute='_compute_issue_counts',
                                      store=True)
@@ -0,0 +1,191 @@
+"""EDI jobs"""
+
+from contextlib import ExitStack
+import logging
+import os
+import threading
+import time
+from odoo import api, fields, models
+from odoo.tools.translate import _
+
+_logger = logging.getLogger(__name__)
+
+
+class EdiDocument(models.Model):
+    """Extend ``edi.document`` to include EDI jobs"""
+
+    _inherit = 'edi.document'
+
+    job_ids = fields.One2many('edi.job', 'doc_id', string="Jobs",
+                              readonly=True)
+
+
+class EdiJob(models.Model):
+    """EDI job
+
+    An EDI job represents a queued request to prepare and execute an
+    EDI document.
+
+    Jobs are claimed by workers using ``SELECT ... FOR UPDATE SKIP
+    LOCKED``, allowing any number of concurrent workers (e.g. cron
+    workers) to drain the queue in parallel without blocking each
+    other.  A claimed job is marked as running and committed before
+    the document is processed, and is protected by a session-level
+    advisory lock that survives any intermediate commits (e.g. for
+    chunked or parallel execution).  The advisory lock is released
+    automatically by the database if the worker dies (e.g. due to
+    running out of memory), allowing the abandoned job to be
+    reclaimed by another worker.
+    """
+
+    _name = 'edi.job'
+    _description = "EDI Job"
+    _order = 'id desc'
+
+    doc_id = fields.Many2one('edi.document', string="Document",
+                             required=True, readonly=True, index=True,
+                             ondelete='cascade')
+    state = fields.Selection([('pending', "Pending"),
+                              ('running', "Running"),
+                              ('done', "Completed"),
+                              ('failed', "Failed")],
+                             string="Status", required=True, readonly=True,
+                             index=True, default='pending')
+    worker = fields.Char(string="Worker", readonly=True)
+    start_date = fields.Datetime(string="Started on", readonly=True)
+    end_date = fields.Datetime(string="Finished on", readonly=True)
+    duration = fields.Float(string="Duration (in seconds)", readonly=True)
+
+    @api.model
+    def enqueue(self, docs):
+        """Enqueue documents for processing
+
+        Documents that already have a pending job are not enqueued
+        again.
+        """
+        pending = self.search([('doc_id', 'in', docs.ids),
+                               ('state', '=', 'pending')]).mapped('doc_id')
+        jobs = self.browse()
+        for doc in docs - pending:
+            jobs += self.create({'doc_id': doc.id})
+        return jobs
+
+    @api.model
+    def claim(self):
+        """Claim the oldest pending or abandoned job (if any)
+
+        The claimed job is locked using both a row-level lock (until
+        the end of the current transaction) and a session-level
+        advisory lock, which must be released using :meth:`~.release`.
+        A running job for which the advisory lock can be acquired has
+        been abandoned by its worker, and is reclaimed.
+        """
+        skip = [0]
+        while True:
+            self.env.cr.execute(
+                'SELECT id, state FROM "%s" WHERE state IN %%s '
+                'AND id NOT IN %%s ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED'
+                % self._table, (('pending', 'running'), tuple(skip))
+            )
+            row = self.env.cr.fetchone()
+            if row is None:
+                return self.browse()
+            self.env.cr.execute(
+                "SELECT pg_try_advisory_lock(%s::regclass::oid::integer, %s)",
+                (self._table, row[0])
+            )
+            if self.env.cr.fetchone()[0]:
+                if row[1] == 'running':
+                    _logger.warning("Reclaiming abandoned job %d", row[0])
+                return self.browse(row[0])
+            skip.append(row[0])
+
+    @api.multi
+    def release(self):
+        """Release jobs claimed using :meth:`~.claim`"""
+        for job in self:
+            self.env.cr.execute(
+                "SELECT pg_advisory_unlock(%s::regclass::oid::integer, %s)",
+                (self._table, job.id)
+            )
+
+    @api.multi
+    def start(self, worker=None):
+        """Mark job as running"""
+        self.ensure_one()
+        if worker is None:
+            worker = '%s:%d:%s' % (os.uname()[1], os.getpid(),
+                                   threading.current_thread().name)
+        self.write({
+            'state': 'running',
+            'worker': worker,
+            'start_date': fields.Datetime.now(),
+        })
+
+    @api.multi
+    def run(self):
+        """Run job
+
+        Any unexpected exception is logged, all uncommitted changes
+        are rolled back (or, when running unit tests, rolled back to
+        a savepoint), and the job is marked as failed.
+        """
+        self.ensure_one()
+        testing = getattr(threading.currentThread(), 'testing', False)
+        start = time.time()
+        doc = self.doc_id
+        _logger.info("%s running job for %s", self.worker, doc.name)
+        savepoint = self.env.cr.savepoint() if testing else ExitStack()
+        try:
+            # pylint: disable=broad-except
+            with savepoint:
+                executed = doc.state == 'done' or doc.action_execute()
+        except Exception:
+            _logger.exception("%s failed to run job for %s", self.worker,
+                              doc.name)
+            if not testing:
+                self.env.cr.rollback()
+            self.env.clear()
+            executed = False
+        self.write({
+            'state': 'done' if executed else 'failed',
+            'end_date': fields.Datetime.now(),
+            'duration': (time.time() - start),
+        })
+        _logger.info("%s %s %s in %.2fs", self.worker,
+                     ('completed' if executed else 'failed'), doc.name,
+                     self.duration)
+        return executed
+
+    @api.model
+    def run_pending(self, limit=None, worker=None):
+        """Run pending jobs until the queue is empty
+
+        Each job is committed as soon as it has been claimed, and
+        again as soon as it completes (except when running unit tests,
+        which must remain within a single transaction).  Returns the
+        number of jobs run.
+        """
+        testing = getattr(threading.currentThread(), 'testing', False)
+        count = 0
+        while limit is None or count < limit:
+            job = self.claim()
+            if not job:
+                break
+            try:
+                job.start(worker=worker)
+                if not testing:
+                    self.env.cr.commit()
+                job.run()
+                count += 1
+                if not testing:
+                    self.env.cr.commit()
+            finally:
+                job.release()
+        return count
+
+    @api.multi
+    def name_get(self):
+        """Show document name"""
+        return [(x.id, _("Job %d for %s") % (x.id, x.doc_id.name))
+                for x in self]
@@ -0,0 +1,193 @@
+"""EDI OpenMetrics exporter"""
+
+from odoo import api, models
+from odoo.tools import config
+from ..tools import EdiOpenMetrics
+
+BACKLOG_STATES = ('draft', 'prep', 'part')
+"""Document states awaiting preparation or execution"""
+
+
+class EdiOpenMetricsExporter(models.AbstractModel):
+    """EDI OpenMetrics exporter
+
+    Exposes EDI throughput and backlog metrics in OpenMetrics text
+    format, suitable for scraping by Prometheus.  All values are
+    computed by aggregate SQL queries (over the performance metrics
+    captured from :class:`~..tools.EdiStatistics` by
+    :meth:`~.edi.document.record_metrics` where applicable), so that
+    scraping does not need to load any records into the ORM.
+
+    Every query is bounded by an indexed predicate, so that the cost
+    of scraping does not grow with the total history of the database:
+    backlog counts consider only documents in the backlog states, and
+    throughput figures consider only the metrics and transfers
+    recorded within the trailing window given by the
+    ``metrics_window`` option (in seconds, defaulting to one hour) in
+    the ``[edi]`` section of the local configuration file.
+    Throughput figures are therefore exposed as gauges over this
+    window rather than as lifetime counters.
+    """
+
+    _name = 'edi.openmetrics'
+    _description = "EDI OpenMetrics Exporter"
+
+    @api.model
+    def window(self):
+        """Get throughput window (in seconds)"""
+        return int(config.get_misc('edi', 'metrics_window', 3600))
+
+    @api.model
+    def query(self, sql, params=()):
+        """Execute an aggregate query and return all result rows"""
+        self.env.cr.execute(sql, params)
+        return self.env.cr.fetchall()
+
+    @api.model
+    def recent(self, sql, params=()):
+        """Execute an aggregate query bounded by the throughput window
+
+        The query must include a ``%(since)s`` placeholder, which is
+        replaced by the start of the throughput window.
+        """
+        since = ("(now() at time zone 'UTC') - interval '%d seconds'" %
+                 self.window())
+        return self.query(sql % {'since': since}, params)
+
+    @api.model
+    def export_documents(self, out):
+        """Export document backlog and completion counts"""
+        rows = self.query(
+            "SELECT doc.state, type.name, COUNT(*) FROM edi_document doc "
+            "JOIN edi_document_type type ON type.id = doc.doc_type_id "
+            "WHERE doc.state IN %s "
+            "GROUP BY doc.state, type.name ORDER BY type.name, doc.state",
+            (BACKLOG_STATES,)
+        )
+        out.family('edi_backlog_documents', 'gauge',
+                   "EDI documents awaiting preparation or execution")
+        for state, name, count in rows:
+            out.sample(count, state=state, type=name)
+        rows = self.recent(
+            "SELECT type.name, COUNT(*) FROM edi_document_metrics m "
+            "JOIN edi_document_type type ON type.id = m.doc_type_id "
+            "WHERE m.phase = %%s AND m.create_date >= %(since)s "
+            "GROUP BY type.name ORDER BY type.name", ('execute',)
+        )
+        out.family('edi_recent_documents', 'gauge',
+                   "EDI documents executed within the window")
+        for name, count in rows:
+            out.sample(count, type=name)
+
+    @api.model
+    def export_records(self, out):
+        """Export record throughput"""
+        rows = self.recent(
+            "SELECT model, SUM(records_in), SUM(elapsed), SUM(queries) "
+            "FROM edi_document_metrics WHERE phase = %%s "
+            "AND create_date >= %(since)s AND model IS NOT NULL "
+            "GROUP BY model ORDER BY model", ('records',)
+        )
+        out.family('edi_recent_records', 'gauge',
+                   "EDI records executed within the window")
+        for model, count, _elapsed, _queries in rows:
+            out.sample(count, model=model)
+        out.family('edi_recent_record_seconds', 'gauge',
+                   "Time spent executing EDI records within the window")
+        for model, _count, elapsed, _queries in rows:
+            out.sample(elapsed, model=model)
+        out.family('edi_recent_record_queries', 'gauge',
+                   "Queries issued executing EDI records within the window")
+        for model, _count, _elapsed, queries in rows:
+            out.sample(queries, model=model)
+        out.family('edi_records_per_second', 'gauge',
+                   "Average EDI records executed per second")
+        for model, count, elapsed, _queries in rows:
+            if elapsed:
+                out.sample(count / elapsed, model=model)
+        out.family('edi_queries_per_record', 'gauge',
+                   "Average queries issued per EDI record executed")
+        for model, count, _elapsed, queries in rows:
+            if count:
+                out.sample(queries / count, model=model)
+
+    @api.model
+    def export_elision(self, out):
+        """Export record elision"""
+        rows = self.recent(
+            "SELECT model, SUM(records_in), SUM(elided) "
+            "FROM edi_document_metrics WHERE phase = %%s "
+            "AND create_date >= %(since)s AND model IS NOT NULL "
+            "GROUP BY model ORDER BY model", ('elide',)
+        )
+        out.family('edi_recent_elision_candidates', 'gauge',
+                   "EDI records considered for elision within the window")
+        for model, count, _elided in rows:
+            out.sample(count, model=model)
+        out.family('edi_recent_elided_records', 'gauge',
+                   "EDI records elided as unchanged within the window")
+        for model, _count, elided in rows:
+            out.sample(elided, model=model)
+        out.family('edi_elided_ratio', 'gauge',
+                   "Fraction of EDI records elided as unchanged")
+        for model, count, elided in rows:
+            if count:
+                out.sample(elided / count, model=model)
+
+    @api.model
+    def export_transfers(self, out):
+        """Export transfer durations and sizes"""
+        rows = self.recent(
+            "SELECT gw.name, COUNT(*), SUM(xfer.duration), "
+            "SUM(COALESCE((SELECT SUM(att.file_size) "
+            "FROM edi_transfer_input_ids rel "
+            "JOIN ir_attachment att ON att.id = rel.ir_attachment_id "
+            "WHERE rel.edi_transfer_id = xfer.id), 0) + "
+            "COALESCE((SELECT SUM(att.file_size) "
+            "FROM edi_transfer_output_ids rel "
+            "JOIN ir_attachment att ON att.id = rel.ir_attachment_id "
+            "WHERE rel.edi_transfer_id = xfer.id), 0)) "
+            "FROM edi_transfer xfer "
+            "JOIN edi_gateway gw ON gw.id = xfer.gateway_id "
+            "WHERE xfer.create_date >= %(since)s "
+            "GROUP BY gw.name ORDER BY gw.name"
+        )
+        out.family('edi_recent_transfers', 'gauge',
+                   "EDI transfers within the window")
+        for name, count, _duration, _size in rows:
+            out.sample(count, gateway=name)
+        out.family('edi_recent_transfer_seconds', 'gauge',
+                   "Time spent in EDI transfers within the window")
+        for name, _count, duration, _size in rows:
+            out.sample(duration, gateway=name)
+        out.family('edi_recent_transfer_bytes', 'gauge',
+                   "Size of EDI attachments transferred within the window")
+        for name, _count, _duration, size in rows:
+            out.sample(size, gateway=name)
+
+    @api.model
+    def export_issues(self, out):
+        """Export open issue counts"""
+        out.family('edi_open_issues', 'gauge', "Open EDI issues by source")
+        for source, table in (('document', 'edi_document'),
+                              ('gateway', 'edi_gateway'),
+                              ('transfer', 'edi_transfer')):
+            [(count,)] = self.query(
+                "SELECT COALESCE(SUM(issue_count), 0) FROM %s "
+                "WHERE issue_count > 0" % table
+            )
+            out.sample(count, source=source)
+
+    @api.model
+    def export(self):
+        """Export all metrics in OpenMetrics text format"""
+        out = EdiOpenMetrics()
+        out.family('edi_metrics_window_seconds', 'gauge',
+                   "Window over which throughput metrics are calculated")
+        out.sample(self.window())
+        self.export_documents(out)
+        self.export_records(out)
+        self.export_elision(out)
+        self.export_transfers(out)
+        self.export_issues(out)
+        return str(out)
@@ -99,6 +99,7 @@ class EdiPartnerTitleRecord(models.Model):
     _description = "Partner Title"
 
     _edi_sync_target = 'title_id'
+    _edi_sync_bulk_create = True
 
     title_id = fields.Many2one('res.partner.title', string="Title",
                                required=False, readonly=True, index=True,
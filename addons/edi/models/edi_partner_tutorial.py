@@ -48,6 +48,7 @@ class EdiPartnerTutorialDocument(models.AbstractModel):
     _name = 'edi.partner.tutorial.document'
     _inherit = 'edi.partner.document'
     _description = "Tutorial partner CSV file"
+    _edi_delta = True
 
     @api.model
     def partner_record_values(self, data):
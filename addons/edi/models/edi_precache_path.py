@@ -0,0 +1,291 @@
+"""EDI precache paths"""
+
+from collections import Counter, defaultdict, deque
+import logging
+import re
+from odoo import api, fields, models
+from odoo.models import LOG_ACCESS_COLUMNS
+from odoo.tools import config
+from ..tools import EdiQueryRecorder
+
+_logger = logging.getLogger(__name__)
+
+READ_QUERY = re.compile(
+    r'^SELECT (?P<columns>.*?) FROM "(?P<table>\w+)".*"(?P=table)"\.id IN %s',
+    re.S
+)
+"""Regular expression matching a record read query"""
+
+READ_COLUMN = re.compile(r'\bas "(\w+)"', re.I)
+"""Regular expression matching a column within a record read query"""
+
+PRECACHE_DEPTH = 3
+"""Maximum length of a discovered precache path (excluding the field)"""
+
+PRECACHE_IGNORE = ('ir.', 'mail.', 'bus.', 'res.users')
+"""Model name prefixes ignored when discovering precache paths"""
+
+
+class EdiPrecachePath(models.Model):
+    """EDI precache path
+
+    A precache path is a relational field path (e.g.
+    ``product_tmpl_id.name``) that will be loaded into the field value
+    cache for each batch of EDI records, in addition to any paths
+    loaded by :meth:`~.edi.record.precache` and
+    :meth:`~.edi.record.sync.precache_targets`.
+
+    Precache paths may be discovered automatically by enabling the
+    ``precache_learning`` option in the ``[edi]`` section of the local
+    configuration file.  While learning, the queries issued during
+    the first batch of each batched operation are recorded.  Any
+    model that is read more than once within the batch is assumed to
+    be missing precaching, and the shortest path of relational
+    fields actually traversed to reach that model from the EDI record
+    (or from the target record, for synchronizer records) is
+    persisted.
+    """
+
+    _name = 'edi.precache.path'
+    _description = "EDI Precache Path"
+    _order = 'name, root, path'
+
+    name = fields.Char(string="Model", required=True, index=True)
+    root = fields.Selection([('record', "EDI Record"),
+                             ('target', "Target Record")],
+                            string="Root", required=True, default='record')
+    path = fields.Char(string="Path", required=True)
+
+    _sql_constraints = [
+        ('name_root_path_uniq', 'unique (name, root, path)',
+         "The precache path must be unique per model and root")
+    ]
+
+    @api.model
+    def create(self, vals):
+        self.clear_paths()
+        return super().create(vals)
+
+    @api.multi
+    def write(self, vals):
+        self.clear_paths()
+        return super().write(vals)
+
+    @api.multi
+    def unlink(self):
+        self.clear_paths()
+        return super().unlink()
+
+    @api.model
+    def clear_paths(self):
+        """Clear cached precache paths
+
+        Only the precache path cache is cleared, leaving all other
+        ORM caches intact.  Other processes will pick up any changes
+        when their model registry is next reloaded.
+        """
+        self.pool.edi_precache_paths = {}
+
+    @api.model
+    def paths(self, name, root):
+        """Get precache paths for a model and root
+
+        Paths are cached within the model registry.
+        """
+        cache = getattr(self.pool, 'edi_precache_paths', None)
+        if cache is None:
+            cache = self.pool.edi_precache_paths = {}
+        key = (name, root)
+        paths = cache.get(key)
+        if paths is None:
+            paths = cache[key] = tuple(
+                self.search([('name', '=', name),
+                             ('root', '=', root)]).mapped('path')
+            )
+        return paths
+
+    @api.model
+    def precache(self, model, root, recs):
+        """Precache all paths for a model and root"""
+        for path in self.paths(model._name, root):
+            recs.mapped(path)
+
+    @api.model
+    def learning(self, model, batches):
+        """Learn precache paths while processing the first batch
+
+        Accepts an iterable of ``(range, batch)`` tuples, and yields
+        the same tuples.  Queries are recorded while the first batch
+        is being processed by the caller.
+        """
+        roots = getattr(model, '_edi_precache_roots', None)
+        if roots is None or not config.get_misc('edi', 'precache_learning',
+                                                 False):
+            yield from batches
+            return
+        first = True
+        for r, batch in batches:
+            if not first:
+                yield (r, batch)
+                continue
+            first = False
+            with EdiPrecacheRecorder(self.env) as recorder:
+                yield (r, batch)
+            self.learn(model, recorder)
+
+    @api.model
+    def discover(self, root, names, edges):
+        """Find shortest traversed relational field path to a model
+
+        Only relational fields present in ``edges`` (a mapping from
+        ``(model name, field name)`` to the number of traversals)
+        are followed, with the most frequently traversed fields
+        being preferred.
+
+        Returns a ``(path, model)`` tuple, or ``(None, None)`` if no
+        path exists.  The path is empty if ``root`` is itself one of
+        the specified models.
+        """
+        queue = deque([(root._name, ())])
+        seen = {root._name}
+        while queue:
+            (name, path) = queue.popleft()
+            if name in names:
+                return ('.'.join(path), name)
+            if len(path) >= PRECACHE_DEPTH:
+                continue
+            fnames = sorted((fname for model, fname in edges
+                             if model == name),
+                            key=lambda x: (-edges[(name, x)], x))
+            for fname in fnames:
+                comodel = self.env[name]._fields[fname].comodel_name
+                if comodel in seen:
+                    continue
+                seen.add(comodel)
+                queue.append((comodel, path + (fname,)))
+        return (None, None)
+
+    @api.model
+    def learn(self, model, recorder):
+        """Learn precache paths from an :class:`EdiPrecacheRecorder`"""
+
+        # Identify tables read more than once
+        reads = recorder.reads
+        tables = set(k for k, v in reads.items() if v > 1)
+        if not tables:
+            return
+
+        # Identify corresponding models
+        names_by_table = defaultdict(set)
+        for name in self.env.registry:
+            Model = self.env[name]
+            if Model._abstract or name.startswith(PRECACHE_IGNORE):
+                continue
+            if Model._table in tables:
+                names_by_table[Model._table].add(name)
+
+        # Find and record traversed path to each model
+        for table, names in names_by_table.items():
+            for root, recs in model._edi_precache_roots():
+                (path, name) = self.discover(recs, names, recorder.edges)
+                if path is None:
+                    continue
+                Model = self.env[name]
+                fnames = sorted(x for x in recorder.columns[table]
+                                if x != 'id' and x in Model._fields)
+                if not fnames:
+                    break
+                fname = (Model._rec_name if Model._rec_name in fnames
+                         else fnames[0])
+                path = '.'.join(x for x in (path, fname) if x)
+                if path not in self.paths(model._name, root):
+                    _logger.info("%s learned precache path %s.%s (%d reads)",
+                                 model._name, root, path, reads[table])
+                    self.store(model._name, root, path)
+                break
+
+    @api.model
+    def store(self, name, root, path):
+        """Store precache path
+
+        The path is inserted using a single upsert statement, so that
+        concurrent processes learning the same path do not violate
+        the uniqueness constraint.
+        """
+        self.env.cr.execute(
+            'INSERT INTO "%s" '
+            '(name, root, path, create_uid, create_date, write_uid, '
+            'write_date) VALUES (%%s, %%s, %%s, %%s, '
+            "(now() at time zone 'UTC'), %%s, (now() at time zone 'UTC')) "
+            'ON CONFLICT (name, root, path) DO NOTHING' % self._table,
+            (name, root, path, self.env.uid, self.env.uid)
+        )
+        self.clear_paths()
+
+
+def cached_ids(value):
+    """Get record IDs referred to by a cached relational field value"""
+    if isinstance(value, models.BaseModel):
+        return value._ids
+    if isinstance(value, dict):
+        return tuple(x for v in value.values() for x in cached_ids(v))
+    if isinstance(value, (tuple, list)):
+        return value
+    if isinstance(value, int) and value:
+        return (value,)
+    return ()
+
+
+class EdiPrecacheRecorder(EdiQueryRecorder):
+    """Precache query recorder
+
+    A precache query recorder is a query recorder that counts the
+    record read queries issued for each table, and identifies the
+    relational fields actually traversed to reach the records being
+    read.  A relational field is considered to have been traversed
+    if its value, as held in the field value cache at the point that
+    the query is issued, refers to any of the records being read.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.reads = Counter()
+        self.columns = defaultdict(set)
+        self.edges = Counter()
+        self.referrers = None
+        super().__init__(env.cr, filter=READ_QUERY.search)
+
+    def fields(self, table):
+        """Get candidate relational fields referring to a table"""
+        if self.referrers is None:
+            self.referrers = defaultdict(list)
+            for name in self.env.registry:
+                Model = self.env[name]
+                if Model._abstract or name.startswith(PRECACHE_IGNORE):
+                    continue
+                for fname, field in Model._fields.items():
+                    if not field.relational or not field.store:
+                        continue
+                    if field.automatic or fname in LOG_ACCESS_COLUMNS:
+                        continue
+                    comodel = field.comodel_name
+                    if comodel.startswith(PRECACHE_IGNORE):
+                        continue
+                    self.referrers[self.env[comodel]._table].append(field)
+        return self.referrers[table]
+
+    def log(self, query, params):
+        """Record query and count traversed relational fields"""
+        super().log(query, params)
+        m = READ_QUERY.search(query)
+        table = m.group('table')
+        self.reads[table] += 1
+        self.columns[table].update(READ_COLUMN.findall(m.group('columns')))
+        ids = (set(params[0]) if isinstance(params, (list, tuple)) and params
+               else set())
+        cache = self.env.cache._data
+        for field in self.fields(table):
+            values = cache.get(field)
+            if values and any(ids.intersection(cached_ids(x))
+                              for x in values.values()):
+                self.edges[(field.model_name, field.name)] += 1
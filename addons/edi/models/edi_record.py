@@ -1,5 +1,6 @@
 """EDI records"""
 
+from collections import defaultdict
 import logging
 from itertools import chain
 from operator import attrgetter, itemgetter
@@ -7,7 +8,9 @@ from odoo import api, fields, models
 from odoo.exceptions import UserError
 from odoo.tools.translate import _
 from odoo.osv import expression
-from ..tools import NoRecordValuesError
+from odoo.tools import config
+from ..tools import (lookup_cache, EdiBulkCreator, EdiCacheEvictor,
+                     NoRecordValuesError)
 
 _logger = logging.getLogger(__name__)
 
@@ -64,6 +67,19 @@ class EdiRecordType(models.Model):
     doc_type_ids = fields.Many2many('edi.document.type',
                                     string="Document Types")
     sequence = fields.Integer(string="Sequence", help="Application Order")
+    depends_ids = fields.Many2many('edi.record.type',
+                                   'edi_record_type_depends_rel',
+                                   'rec_type_id', 'depends_id',
+                                   string="Depends On",
+                                   help="Record types that must be executed "
+                                   "before this record type when executing "
+                                   "record types in parallel")
+
+    @api.model_cr
+    def init(self):
+        """Create lookup cache invalidation signalling sequence"""
+        super().init()
+        lookup_cache.setup(self._cr)
 
 
 class EdiRecord(models.AbstractModel):
@@ -80,12 +96,24 @@ class EdiRecord(models.AbstractModel):
     each query.
     """
 
+    BATCH_PREPARE = property(attrgetter('BATCH_SIZE'))
+    """Batch size for creating EDI records during preparation"""
+
+    BATCH_ELIDE = property(attrgetter('BATCH_SIZE'))
+    """Batch size for eliding unchanged EDI records during preparation"""
+
     BATCH_CREATE = property(attrgetter('BATCH_SIZE'))
     """Batch size for creating new records"""
 
     BATCH_UPDATE = property(attrgetter('BATCH_SIZE'))
     """Batch size for updating existing records"""
 
+    BATCH_COPY = 10000
+    """Batch size for bulk loading records via ``COPY``
+
+    This is used only for models that enable :attr:`~._edi_bulk_copy`.
+    """
+
     _edi_relates = ()
     """EDI lookup relationships"""
 
@@ -100,6 +128,33 @@ class EdiRecord(models.AbstractModel):
     created within the same document.
     """
 
+    _edi_relates_cache = True
+    """Cache EDI lookup relationship target IDs
+
+    Successful lookups are cached within the process-level
+    :data:`~..tools.lookup_cache`, allowing lookup keys that recur
+    across batches, record types, and documents to be resolved without
+    searching the target model again.  Entries are shared with other
+    threads only once the transaction that added them has been
+    committed.  The cache is invalidated whenever a record in the
+    target model is created, written, or unlinked (by any process).
+
+    Derived models may set this to ``False`` to indicate that lookups
+    must always search the target model.
+    """
+
+    _edi_bulk_copy = False
+    """Prepare records using ``COPY FROM STDIN``
+
+    Derived models may set this to ``True`` to indicate that EDI
+    records should be loaded into the database using ``COPY FROM
+    STDIN`` rather than ``INSERT``.  This is substantially faster for
+    documents with very large numbers of records, but bypasses all
+    create-time side effects (such as constraint checks and stored
+    computed fields), and so must be enabled only for models that do
+    not rely upon any such side effects.
+    """
+
     _name = 'edi.record'
     _description = "EDI Record"
     _order = 'doc_id, id'
@@ -132,40 +187,54 @@ class EdiRecord(models.AbstractModel):
         Fill in any missing target IDs based on the EDI lookup
         relationships, where possible.
         """
-        # pylint: disable=too-many-locals
-        Record = self.browse()
+        # pylint: disable=cell-var-from-loop
         doc = self.mapped('doc_id')
         ready = self
-        for rel in self._edi_relates:
-            # pylint: disable=cell-var-from-loop
-
-            # Find records missing a target, if any
-            missing = self.filtered(lambda x: x[rel.key] and not x[rel.target])
-
-            # Process records in batches to minimise database lookups
-            keygetter = itemgetter(rel.key)
-            for r, batch in missing.batched(self.BATCH_SIZE):
-                _logger.info("%s recording %s.%s %d-%d of %d", doc.name,
-                             self._name, rel.target, r[0], r[-1], len(missing))
-
-                # Search for target records by key
-                Target = Record[rel.target]
-                targets = Target.search(expression.AND([
-                    [(rel.via, 'in', list(set(keygetter(x) for x in batch)))],
-                    rel.domain(Record),
-                ]))
-                targets_by_key = {k: v.ensure_one() for k, v in
-                                  targets.groupby(rel.via)}
-
-                # Update target fields
-                for key, recs in batch.groupby(keygetter):
-                    target = targets_by_key.get(key)
-                    if required and not target:
-                        target = recs.missing_edi_relates(rel, key)
-                    if target:
-                        recs.write({rel.target: target.id})
+        rels = self._edi_relates
+        stats = self.statistics()
+
+        # Find records missing a target, if any
+        missing = self.filtered(lambda x: any(
+            x[rel.key] and not x[rel.target] for rel in rels
+        ))
+
+        # Process records in batches to minimise database lookups
+        for r, batch in missing.batched(self.BATCH_SIZE):
+            _logger.info("%s recording %s relationships %d-%d of %d",
+                         doc.name, self._name, r[0], r[-1], len(missing))
+
+            # Look up target records by key for all relationships
+            pending = {}
+            for rel in rels:
+                recs = batch.filtered(
+                    lambda x: x[rel.key] and not x[rel.target]
+                )
+                if recs:
+                    pending[rel] = recs
+            ids_by_rel = self._edi_relates_targets({
+                rel: [x[rel.key] for x in recs]
+                for rel, recs in pending.items()
+            })
+
+            # Update target fields
+            for rel, recs in pending.items():
+                ids_by_key = ids_by_rel[rel]
+                for key, keyrecs in recs.groupby(itemgetter(rel.key)):
+                    target_id = ids_by_key.get(key)
+                    if required and not target_id:
+                        target_id = keyrecs.missing_edi_relates(rel, key).id
+                    if target_id:
+                        keyrecs.write({rel.target: target_id})
                     else:
-                        ready -= recs
+                        ready -= keyrecs
+
+        # Record statistics
+        stats.stop()
+        if missing and len(doc) == 1:
+            doc.record_metrics('relates', stats, model=self._name,
+                               records_in=len(missing),
+                               records_out=(len(missing) -
+                                            len(self - ready)))
         return ready
 
     @api.multi
@@ -196,28 +265,144 @@ class EdiRecord(models.AbstractModel):
         incurring the cost of creating full recordset objects for
         records that may be elided from the final document.
         """
-        Record = self.browse()
+        # Find values with a defined key but missing a target, if any
+        pending = {}
         for rel in self._edi_relates:
-            # pylint: disable=cell-var-from-loop
-
-            # Find values with a defined key but missing a target, if any
             missing = [x for x in vlist
                        if x.get(rel.key) and rel.target not in x]
+            if missing:
+                pending[rel] = missing
+
+        # Look up target records by key for all relationships
+        ids_by_rel = self._edi_relates_targets({
+            rel: [x[rel.key] for x in missing]
+            for rel, missing in pending.items()
+        })
+
+        # Add target values where known
+        for rel, missing in pending.items():
+            ids_by_key = ids_by_rel[rel]
+            for vals in missing:
+                target_id = ids_by_key.get(vals[rel.key])
+                vals[rel.target] = target_id if target_id else models.NewId()
+
+    @api.model
+    def _edi_relates_query(self, rel, domain, keys):
+        """Construct SQL query for EDI lookup relationship target IDs
+
+        The query returns a ``(index, target_id)`` row for each target
+        record matching a lookup key, where ``index`` is the (1-based)
+        position of the lookup key within ``keys``.  The lookup keys
+        are passed as a single array parameter and joined against the
+        target table via ``UNNEST``.
+
+        Returns a ``(query, params)`` tuple, or ``None`` if the lookup
+        cannot be expressed as a plain SQL join.
+        """
+        Target = self.browse()[rel.target]
+        field = Target._fields.get(rel.via)
+        if (field is None or not field.store or not field.column_type or
+                field.inherited or field.translate):
+            return None
+        query = Target._where_calc(domain)
+        Target._apply_ir_rules(query, 'read')
+        from_clause, where_clause, where_params = query.get_sql()
+        conditions = ['"%s"."%s" = k.key' % (Target._table, rel.via)]
+        if where_clause:
+            conditions.append(where_clause)
+        sql = ('SELECT k.idx, "%s".id FROM unnest(%%s) WITH ORDINALITY '
+               'AS k(key, idx), %s WHERE %s' % (
+                   Target._table, from_clause, ' AND '.join(conditions)
+               ))
+        return (sql, [keys] + list(where_params))
+
+    @api.model
+    def _edi_relates_targets(self, keys_by_rel):
+        """Look up EDI lookup relationship target IDs
+
+        Accepts a dictionary mapping EDI lookup relationships to
+        iterables of lookup keys.  Returns a dictionary mapping each
+        relationship to a dictionary mapping lookup keys to target
+        record IDs, for each key that identifies an existing target
+        record.
+
+        Keys found within the lookup cache are not searched for
+        again.  All remaining keys are resolved using a single SQL
+        query covering all relationships, falling back to a search of
+        the target model for any relationship that cannot be
+        expressed as a plain SQL join.
+        """
+        # pylint: disable=too-many-locals
+        Record = self.browse()
+        cache = self._edi_relates_cache
+        if cache:
+            lookup_cache.check(self.env.cr)
+        ids_by_rel = {}
+        found_by_rel = {}
+        queries = []
+        fallbacks = []
+        prefixes = {}
+        for rel, keys in keys_by_rel.items():
+            Target = Record[rel.target]
+            domain = rel.domain(Record)
+            ids_by_key = ids_by_rel[rel] = {}
+            keys = set(keys)
+
+            # Find cached target record IDs, if applicable
+            if cache:
+                active = Target._context.get('active_test', True)
+                prefix = prefixes[rel] = (
+                    self.env.cr.dbname, self.env.uid, Target._name,
+                    rel.via, repr((domain, active))
+                )
+                for key in keys:
+                    target_id = lookup_cache.get(prefix + (key,),
+                                                 cr=self.env.cr)
+                    if target_id is not None:
+                        ids_by_key[key] = target_id
+
+            # Construct query for remaining target records, if possible
+            missing = list(keys.difference(ids_by_key))
             if not missing:
                 continue
-
-            # Search for target records by key
-            targets = self.browse()[rel.target].search(expression.AND([
-                [(rel.via, 'in', list(set(x[rel.key] for x in missing)))],
-                rel.domain(Record),
+            found_by_rel[rel] = defaultdict(list)
+            query = self._edi_relates_query(rel, domain, missing)
+            if query is None:
+                fallbacks.append((rel, Target, domain, missing))
+            else:
+                queries.append((rel, missing, query))
+
+        # Resolve all compilable relationships with a single query
+        if queries:
+            self.env.cr.execute(' UNION ALL '.join(
+                'SELECT %d, idx, id FROM (%s) AS q%d' % (i, sql, i)
+                for i, (_rel, _missing, (sql, _params)) in enumerate(queries)
+            ), [p for _rel, _missing, (_sql, params) in queries
+                for p in params])
+            for i, idx, target_id in self.env.cr.fetchall():
+                (rel, missing, _query) = queries[i]
+                found_by_rel[rel][missing[idx - 1]].append(target_id)
+
+        # Search for target records of any remaining relationships
+        for rel, Target, domain, missing in fallbacks:
+            targets = Target.search(expression.AND([
+                [(rel.via, 'in', missing)],
+                domain,
             ]))
-            targets_by_key = {k: v.ensure_one() for k, v in
-                              targets.groupby(rel.via)}
-
-            # Add target values where known
-            for vals in missing:
-                target = targets_by_key.get(vals[rel.key])
-                vals[rel.target] = target.id if target else models.NewId()
+            for key, keytargets in targets.groupby(rel.via):
+                found_by_rel[rel][key].extend(keytargets.ids)
+
+        # Record found target record IDs
+        for rel, found in found_by_rel.items():
+            Target = Record[rel.target]
+            for key, target_ids in found.items():
+                targets = Target.browse(sorted(set(target_ids)))
+                target_id = targets.ensure_one().id
+                ids_by_rel[rel][key] = target_id
+                if cache:
+                    lookup_cache.put(prefixes[rel] + (key,), target_id,
+                                     cr=self.env.cr)
+        return ids_by_rel
 
     @api.model
     def add_edi_defaults(self, target, vlist):
@@ -257,6 +442,42 @@ class EdiRecord(models.AbstractModel):
         """
         for rel in self._edi_relates:
             self.mapped('%s.%s' % (rel.target, rel.via))
+        self.env['edi.precache.path'].precache(self, 'record', self)
+
+    @api.model
+    def evictor(self):
+        """Construct batch-scoped cache evictor
+
+        Cache eviction may be disabled via the ``cache_eviction``
+        option in the ``[edi]`` section of the local configuration
+        file.
+        """
+        return EdiCacheEvictor(
+            enabled=config.get_misc('edi', 'cache_eviction', True)
+        )
+
+    @api.model
+    def batch_statistics(self):
+        """Gather profiling statistics for a batch of records
+
+        Peak memory usage will be traced using :mod:`tracemalloc` if
+        enabled via the ``memory_tracing`` option in the ``[edi]``
+        section of the local configuration file.
+        """
+        return self.statistics(
+            trace_memory=config.get_misc('edi', 'memory_tracing', False)
+        )
+
+    @api.model
+    def _edi_precache_roots(self):
+        """Get roots for discovery of precache paths
+
+        Returns a list of ``(root, model)`` tuples in order of
+        preference, where ``root`` is a root type as used by
+        ``edi.precache.path`` and ``model`` is the corresponding
+        (empty) recordset.
+        """
+        return [('record', self.browse())]
 
     @api.model
     def prepare(self, doc, vlist):
@@ -266,19 +487,37 @@ class EdiRecord(models.AbstractModel):
         yielding value dictionaries that could be passed to
         :meth:`~odoo.models.Model.create` in order to create an EDI
         record.
+
+        Records are created in batches of :attr:`~.BATCH_PREPARE` using a
+        single multi-row ``INSERT`` statement per batch, or in batches
+        of :attr:`~.BATCH_COPY` using ``COPY FROM STDIN`` if
+        :attr:`~._edi_bulk_copy` is enabled.  Batch sizes are tuned
+        automatically if enabled via ``edi.batch.tuning``.
         """
 
+        # Never create records from lines removed from delta input
+        if self.env.context.get('edi_delta') == 'removed':
+            return
+
         # Initialise statistics
         count = 0
         _logger.info("%s preparing %s", doc.name, self._name)
 
         # Create records
+        creator = EdiBulkCreator(self)
+        if self._edi_bulk_copy:
+            operation, create = 'BATCH_COPY', creator.load
+        else:
+            operation, create = 'BATCH_PREPARE', creator.create
         with self.statistics() as stats:
             try:
-                for record_vals in vlist:
-                    record_vals['doc_id'] = doc.id
-                    self.create(record_vals)
-                    count += 1
+                for _r, batch in self.tuned(operation, vlist):
+                    for record_vals in batch:
+                        record_vals['doc_id'] = doc.id
+                    create(batch)
+                    count += len(batch)
+                if self._edi_bulk_copy:
+                    creator.invalidate()
                 self.recompute()
             except NoRecordValuesError:
                 # Values dictionary iterable was not implemented (most
@@ -287,8 +526,11 @@ class EdiRecord(models.AbstractModel):
                 pass
 
         # Log statistics
-        _logger.info("%s prepared %s in %.2fs, %d excess queries", doc.name,
-                     self._name, stats.elapsed, (stats.count - count))
+        _logger.info("%s prepared %s in %.2fs, %d records, %d queries "
+                     "(%d excess)", doc.name, self._name, stats.elapsed,
+                     count, stats.count, (stats.count - creator.count))
+        doc.record_metrics('create', stats, model=self._name,
+                           records_out=count)
 
     @api.multi
     def execute(self):
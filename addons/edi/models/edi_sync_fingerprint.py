@@ -0,0 +1,142 @@
+"""EDI synchronizer content fingerprints"""
+
+import hashlib
+from odoo import api, fields, models
+
+
+class EdiSyncFingerprint(models.Model):
+    """EDI synchronizer content fingerprint
+
+    A content fingerprint records a digest of the target model field
+    value dictionary (as constructed by
+    :meth:`edi.record.sync.target_values`) that was most recently
+    applied to (or found to match) a synchronizer target record.
+
+    This allows :meth:`edi.record.sync.elide` to elide unchanged EDI
+    records by comparing digests, without needing to load the target
+    records at all.  A fingerprint is trusted only if the target
+    record (and any ``_inherits`` parent records) were last modified
+    strictly before the fingerprint was recorded.  Since both
+    timestamps are taken from the start of the recording transaction,
+    a fingerprint is never trusted for a target record modified within
+    the same transaction, even if modified after the fingerprint was
+    recorded.
+
+    Since ``write_date`` is taken from the start of the modifying
+    transaction, a concurrent transaction that started before the
+    fingerprint was recorded but committed afterwards would leave an
+    older ``write_date``.  The fingerprint therefore also records the
+    row version (i.e. the PostgreSQL ``xmin`` system column) of the
+    target record and of any ``_inherits`` parent records, and is
+    trusted only if the row versions are unchanged.
+    """
+
+    _name = 'edi.sync.fingerprint'
+    _description = "EDI Synchronizer Fingerprint"
+    _log_access = False
+
+    model = fields.Char(string="Record Model", required=True, readonly=True,
+                        index=True)
+    key = fields.Char(string="Key", required=True, readonly=True)
+    target_id = fields.Integer(string="Target ID", required=True,
+                               readonly=True)
+    digest = fields.Char(string="Digest", required=True, readonly=True)
+    date = fields.Datetime(string="Fingerprinted on", required=True,
+                           readonly=True)
+    version = fields.Char(string="Row Version", readonly=True)
+
+    _sql_constraints = [
+        ('model_key_uniq', 'unique (model, key)',
+         "Each synchronizer key may have at most one fingerprint")
+    ]
+
+    @api.model
+    def digest_values(self, target_vals):
+        """Calculate digest of target model field value dictionary
+
+        Returns ``None`` if the dictionary cannot be fingerprinted
+        (e.g. because it refers to a target record that does not yet
+        exist).
+        """
+        if any(isinstance(v, models.NewId) for v in target_vals.values()):
+            return None
+        canonical = repr(sorted(target_vals.items()))
+        return hashlib.sha1(canonical.encode()).hexdigest()
+
+    @api.model
+    def _version_sql(self, RecModel):
+        """Construct SQL joins and expression for target row versions
+
+        Returns a ``(joins, parents, version)`` tuple, where ``joins``
+        is a list of SQL join clauses (from a target record ID column
+        named ``f.target_id``), ``parents`` is a list of the aliases
+        of the joined ``_inherits`` parent tables, and ``version`` is
+        an SQL expression for the combined row version.
+        """
+        Target = RecModel.browse()[RecModel._edi_sync_target]
+        joins = ['JOIN "%s" t ON t.id = f.target_id' % Target._table]
+        parents = []
+        for i, (parent, via) in enumerate(sorted(Target._inherits.items())):
+            Parent = self.env[parent]
+            joins.append('JOIN "%s" p%d ON p%d.id = t."%s"' % (
+                Parent._table, i, i, via
+            ))
+            parents.append('p%d' % i)
+        version = "concat_ws(',', %s)" % ', '.join(
+            '%s.xmin::text' % x for x in ['t'] + parents
+        )
+        return (joins, parents, version)
+
+    @api.model
+    def lookup(self, RecModel, keys):
+        """Look up fingerprints that are still valid
+
+        Returns a dictionary mapping each key to a ``(target_id,
+        digest)`` tuple, for all keys that have a fingerprint that is
+        strictly newer than the last modification of the target
+        record, and for which the target row versions are unchanged.
+        """
+        if not keys:
+            return {}
+        (joins, parents, version) = self._version_sql(RecModel)
+        checks = ['%s.write_date < f.date' % x for x in ['t'] + parents]
+        checks.append('f.version = %s' % version)
+        self.env.cr.execute(
+            'SELECT f.key, f.target_id, f.digest '
+            'FROM "%s" f %s WHERE f.model = %%s AND f.key IN %%s AND %s' % (
+                self._table, ' '.join(joins), ' AND '.join(checks)
+            ),
+            (RecModel._name, tuple(set(keys))),
+        )
+        return {key: (target_id, digest)
+                for key, target_id, digest in self.env.cr.fetchall()}
+
+    @api.model
+    def record(self, RecModel, entries):
+        """Record fingerprints
+
+        Accepts an iterable of ``(key, target_id, digest)`` tuples.
+        Entries with no digest are ignored.
+        """
+        entries = {key: (target_id, digest)
+                   for key, target_id, digest in entries if digest}
+        if not entries:
+            return
+        (joins, _parents, version) = self._version_sql(RecModel)
+        row = "(%s, %s, %s::integer, %s)"
+        params = []
+        for key, (target_id, digest) in entries.items():
+            params.extend((RecModel._name, key, target_id, digest))
+        self.env.cr.execute(
+            'INSERT INTO "%s" (model, key, target_id, digest, date, version) '
+            'SELECT f.model, f.key, f.target_id, f.digest, '
+            '(now() at time zone \'UTC\'), %s '
+            'FROM (VALUES %s) AS f (model, key, target_id, digest) %s '
+            'ON CONFLICT (model, key) DO UPDATE SET '
+            'target_id = EXCLUDED.target_id, digest = EXCLUDED.digest, '
+            'date = EXCLUDED.date, version = EXCLUDED.version' % (
+                self._table, version, ', '.join([row] * len(entries)),
+                ' '.join(joins)
+            ),
+            params,
+        )
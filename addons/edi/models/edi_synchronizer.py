@@ -1,9 +1,12 @@
 """EDI synchronizer documents"""
 
+from collections import defaultdict
 import logging
+from operator import attrgetter, itemgetter
 from odoo import api, fields, models
 from odoo.osv import expression
-from ..tools import batched, Comparator
+from ..tools import (batched, Comparator, EdiBulkCreator, EdiDigestSet,
+                     NoRecordValuesError)
 
 _logger = logging.getLogger(__name__)
 
@@ -45,6 +48,22 @@ class EdiSyncDocumentModel(models.AbstractModel):
     _inherit = 'edi.document.model'
     _description = "EDI Synchronizer Document"
 
+    @api.model
+    def prepare(self, doc):
+        """Prepare document
+
+        If the document type uses delta input, then the document is
+        first prepared using only the input lines that have been
+        removed since the previous document.  No records are created
+        from these lines: the synchronizer record models instead
+        capture the keys of the removed records so that only the
+        corresponding target records are subsequently deactivated.
+        """
+        super().prepare(doc)
+        if not self.env.context.get('edi_delta') and doc.delta_document():
+            removed = self.with_context(edi_delta='removed')
+            removed.prepare(doc.with_env(removed.env))
+
 
 class EdiSyncRecord(models.AbstractModel):
     """EDI synchronizer record
@@ -95,6 +114,69 @@ class EdiSyncRecord(models.AbstractModel):
     deduplication check (e.g. because the corresponding document model
     guarantees never to attempt to create duplicate EDI records) may
     set this to ``False`` to gain a slight improvement in performance.
+
+    Produced record values are tracked using compact fixed-size
+    digests (see :class:`~..tools.EdiDigestSet`).
+    """
+
+    _edi_sync_dedupe_spill = False
+    """Spill deduplication digests to disk
+
+    Derived models expecting extremely large documents may set this to
+    ``True`` to store the deduplication digest table in a temporary
+    file rather than in process memory.
+    """
+
+    _edi_sync_snapshot = True
+    """Compare target records using columnar snapshots
+
+    Where all fields returned by :meth:`~.target_values` are plain
+    database columns of the target model, :meth:`~.elide` will fetch
+    only those columns (in a single query per batch) rather than
+    loading and precaching full target records.  Elision falls back
+    to loading full target records whenever this is not possible.
+
+    The snapshot columns are taken from the target values of the
+    first record in each batch, and target values are then
+    constructed only for records with an existing target.  The cost
+    of a failed snapshot attempt is therefore one call to
+    :meth:`~.target_values` (and possibly one query) per batch.
+    Snapshots are never attempted for target models using
+    ``_inherits``, since these always have fields stored in the
+    parent model.
+
+    This is enabled by default.  Derived models that rely upon
+    :meth:`~.targets_by_key` or :meth:`~.precache_targets` being
+    called during elision, or for which a snapshot is never possible,
+    may set this to ``False``.
+    """
+
+    _edi_sync_fingerprint = False
+    """Elide unchanged records using persistent content fingerprints
+
+    Record a digest of the target model field value dictionary each
+    time a target record is created, updated, or found to be
+    unchanged, and use this digest to elide unchanged EDI records
+    without loading the target records.
+
+    Derived models may set this to ``True`` only if
+    :meth:`~.target_values` depends solely upon the EDI record value
+    dictionary, and only if every field that it returns is stored on
+    the target model (or on an ``_inherits`` parent model), so that
+    any modification will update the corresponding ``write_date`` and
+    row version (see ``edi.sync.fingerprint``).
+    """
+
+    _edi_sync_bulk_create = False
+    """Create target records in bulk
+
+    Create new target records (including any ``_inherits`` parent
+    records) using a single multi-row ``INSERT`` statement per table
+    for each batch of :attr:`~.BATCH_CREATE` records.
+
+    This bypasses any override of :meth:`~odoo.models.Model.create`
+    within the target model, and so must be enabled only for target
+    models that do not rely upon any such override.
     """
 
     _name = 'edi.record.sync'
@@ -124,6 +206,7 @@ class EdiSyncRecord(models.AbstractModel):
     def precache_targets(self, targets):
         """Precache associated target records"""
         targets.mapped(self._edi_sync_via)
+        self.env['edi.precache.path'].precache(self, 'target', targets)
 
     @api.multi
     def precache(self):
@@ -131,6 +214,17 @@ class EdiSyncRecord(models.AbstractModel):
         super().precache()
         self.precache_targets(self.mapped(self._edi_sync_target))
 
+    @api.model
+    def _edi_precache_roots(self):
+        """Get roots for discovery of precache paths
+
+        Paths from the target model are preferred, since these may
+        also be used for precaching target records before the EDI
+        records have been created.
+        """
+        Target = self.browse()[self._edi_sync_target]
+        return [('target', Target)] + super()._edi_precache_roots()
+
     @api.model
     def targets_by_key(self, vlist):
         """Construct lookup cache of target records indexed by key field"""
@@ -146,6 +240,48 @@ class EdiSyncRecord(models.AbstractModel):
         return {k: v.with_prefetch(targets._prefetch).ensure_one()
                 for k, v in targets.groupby(key)}
 
+    @api.model
+    def targets_snapshot(self, vlist, keys):
+        """Construct columnar snapshot of target records indexed by key field
+
+        Returns a ``(columns, rows)`` tuple, where ``rows`` is a
+        dictionary mapping each key to a tuple comprising the target
+        record ID followed by the raw database values of ``columns``.
+
+        Returns ``None`` if a snapshot cannot be constructed (e.g.
+        because a requested field is not a plain database column, or
+        because a key matches more than one target record).
+        """
+        Target = self.browse()[self._edi_sync_target].with_context(
+            active_test=False
+        )
+        key = self._edi_sync_via
+        columns = tuple(sorted(keys))
+        lang = self.env.lang or 'en_US'
+        for name in (key,) + columns:
+            field = Target._fields.get(name)
+            if (field is None or not field.store or not field.column_type or
+                    field.inherited or isinstance(field, fields.Binary) or
+                    (field.translate and lang != 'en_US')):
+                return None
+        query = Target._where_calc(expression.AND([
+            [(key, 'in', [x['name'] for x in vlist])],
+            self._edi_sync_domain_call()
+        ]))
+        Target._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+        self.env.cr.execute('SELECT %s FROM %s WHERE %s' % (
+            ', '.join('"%s"."%s"' % (Target._table, x)
+                      for x in ('id', key) + columns),
+            from_clause, where_clause or 'TRUE'
+        ), params)
+        rows = {}
+        for row in self.env.cr.fetchall():
+            if row[1] in rows:
+                return None
+            rows[row[1]] = (row[0],) + row[2:]
+        return (columns, rows)
+
     @api.model
     def target_values(self, record_vals):
         """Construct target model field value dictionary
@@ -182,8 +318,58 @@ class EdiSyncRecord(models.AbstractModel):
     @api.model
     def prepare(self, doc, vlist):
         """Prepare records"""
+        if self.env.context.get('edi_delta') == 'removed':
+            self.removed(doc, vlist)
+            return
         super().prepare(doc, self.elide(doc, vlist))
 
+    @api.model
+    def _removed_table(self):
+        """Create temporary table of removed delta input record keys"""
+        table = 'edi_removed_%s' % self._table
+        self.env.cr.execute(
+            'CREATE TEMPORARY TABLE IF NOT EXISTS "%s" '
+            '(name varchar PRIMARY KEY) ON COMMIT DROP' % table
+        )
+        return table
+
+    @api.model
+    def removed(self, doc, vlist):
+        """Capture keys of records removed from delta input
+
+        Accepts an iterable ``vlist`` of value dictionaries parsed
+        from the lines removed since the previous document, and
+        records their keys in a temporary database table for use by
+        :meth:`~.removed_keys`.
+        """
+        table = self._removed_table()
+        self.env.cr.execute('TRUNCATE "%s"' % table)
+        count = 0
+        try:
+            for _r, vbatch in batched(vlist, self.BATCH_SIZE):
+                self.env.cr.execute(
+                    'INSERT INTO "%s" (name) SELECT unnest(%%s::varchar[]) '
+                    'ON CONFLICT DO NOTHING' % table,
+                    ([x['name'] for x in vbatch],)
+                )
+                count += len(vbatch)
+        except NoRecordValuesError:
+            pass
+        _logger.info("%s prepared %s removed %d", doc.name, self._name, count)
+
+    @api.model
+    def removed_keys(self, doc):
+        """Get keys of records removed from delta input
+
+        Returns ``None`` if the document does not use delta input (or
+        if there is no previous document to compare against), in which
+        case all records are considered to be present in the input.
+        """
+        if not doc.delta_document():
+            return None
+        self.env.cr.execute('SELECT name FROM "%s"' % self._removed_table())
+        return [x[0] for x in self.env.cr.fetchall()]
+
     @api.model
     def elide(self, doc, vlist):
         """Elide records that would not result in a modification
@@ -196,98 +382,330 @@ class EdiSyncRecord(models.AbstractModel):
         modification to the corresponding target Odoo record will be
         automatically elided from the document.
 
-        After elision has completed, :meth:`~.matched` will be called
-        with a list of the matched target records (if any).  This
-        allows subclasses such as ``edi.record.sync.active`` to
-        perform further processing (e.g. automatically deactivating
-        any unmatched records).
+        After elision has completed, :meth:`~.matched_table` will be
+        called with the name of a temporary database table listing the
+        IDs of the matched target records (if any), and will in turn
+        call :meth:`~.matched` with the matched target records where
+        required.  This allows subclasses such as
+        ``edi.record.sync.active`` to perform further processing (e.g.
+        automatically deactivating any unmatched records).
 
         Note that the iterable ``vlist`` may choose to call
         :meth:`~.no_record_values` to indicate that the iterable is
-        unimplemented; in this case the call to :meth:`~.matched` will
-        be bypassed.
+        unimplemented; in this case the call to :meth:`~.matched_table`
+        will be bypassed.
         """
         # pylint: disable=too-many-locals
 
         # Get target model
         Target = self.browse()[self._edi_sync_target]
-        matched_ids = set()
+        Fingerprint = self.env['edi.sync.fingerprint']
+
+        # Construct temporary table of matched target record IDs
+        matched_table = self._matched_table()
 
         # Construct comparator for target model
         comparator = Comparator(Target)
 
-        # Construct produced values cache for deduplication
-        produced = set() if self._edi_sync_dedupe else None
+        # Construct produced values digest set for deduplication
+        produced = (EdiDigestSet(spill=self._edi_sync_dedupe_spill)
+                    if self._edi_sync_dedupe else None)
 
         # Initialise statistics
         total = 0
         count = 0
-        stats = self.statistics()
+        fingerprinted = 0
+        snapshotted = 0
+        queries = 0
+        elapsed = 0
 
         # Process records in batches for efficiency
-        for r, vbatch in batched(vlist, self.BATCH_SIZE):
+        for r, vbatch in self.tuned('BATCH_ELIDE', vlist):
 
             _logger.info("%s preparing %s %d-%d",
                          doc.name, self._name, r[0], r[-1])
             total += len(r)
 
-            # Add EDI lookup relationship target IDs where known
-            self._add_edi_relates_vlist(vbatch)
-
-            # Look up existing target records
-            targets_by_key = self.targets_by_key(vbatch)
+            # Measure only the queries performed by elision itself,
+            # excluding those performed by the consumer of the output
+            with self.statistics() as stats:
 
-            # Add to list of matched target record IDs
-            matched_ids |= set(x.id for x in targets_by_key.values())
+                # Add EDI lookup relationship target IDs where known
+                self._add_edi_relates_vlist(vbatch)
 
-            # Create EDI records
-            for record_vals in vbatch:
-
-                # Look up existing target record (if any)
-                target = targets_by_key.get(record_vals['name'])
-                if target:
-
-                    # Elide EDI records that would not change the target record
-                    target_vals = self.target_values(record_vals)
-                    if all(comparator[k](target[k], v)
-                           for k, v in target_vals.items()):
-                        continue
-
-                    # Add target to EDI record
-                    record_vals[self._edi_sync_target] = target.id
-
-                # Elide EDI records that are duplicates of earlier records
-                if produced is not None:
-                    frozen_record_vals = frozenset(
-                        (k, v) for k, v in record_vals.items()
-                        if not isinstance(v, models.NewId)
+                # Elide EDI records with unchanged content fingerprints
+                fresh = []
+                matched_ids = []
+                if self._edi_sync_fingerprint:
+                    fingerprints = Fingerprint.lookup(
+                        self, [x['name'] for x in vbatch]
                     )
-                    if frozen_record_vals in produced:
-                        continue
-                    produced.add(frozen_record_vals)
+                    unknown = []
+                    for record_vals in vbatch:
+                        fingerprint = fingerprints.get(record_vals['name'])
+                        if fingerprint is not None:
+                            (target_id, digest) = fingerprint
+                            digested = Fingerprint.digest_values(
+                                self.target_values(record_vals)
+                            )
+                            if digest == digested:
+                                matched_ids.append(target_id)
+                                continue
+                        unknown.append(record_vals)
+                    fingerprinted += len(vbatch) - len(unknown)
+                    vbatch = unknown
+
+                # Look up existing target records, using a columnar
+                # snapshot where possible
+                snapshot = None
+                vals_list = [None] * len(vbatch)
+                if self._edi_sync_snapshot and vbatch and not Target._inherits:
+                    vals_list[0] = self.target_values(vbatch[0])
+                    snapshot = self.targets_snapshot(vbatch, set(vals_list[0]))
+                if snapshot is not None:
+                    # Construct target values only for existing targets,
+                    # and check that the snapshot covers all fields
+                    (columns, rows) = snapshot
+                    for i, record_vals in enumerate(vbatch):
+                        if (vals_list[i] is None and
+                                record_vals['name'] in rows):
+                            vals_list[i] = self.target_values(record_vals)
+                    if any(set(x).difference(columns)
+                           for x in vals_list if x is not None):
+                        snapshot = None
+                if snapshot is not None:
+                    (columns, targets_by_key) = snapshot
+                    target_id = itemgetter(0)
+                    plan = lambda x: comparator.snapshot_plan(columns, x)
+                    snapshotted += len(vbatch)
+                else:
+                    targets_by_key = self.targets_by_key(vbatch)
+                    target_id = attrgetter('id')
+                    plan = comparator.plan
+
+                # Add to table of matched target record IDs
+                matched_ids.extend(target_id(x)
+                                   for x in targets_by_key.values())
+                self.env.cr.execute(
+                    'INSERT INTO "%s" (id) SELECT unnest(%%s) '
+                    'ON CONFLICT DO NOTHING' % matched_table,
+                    (matched_ids,)
+                )
+
+                # Construct EDI record value dictionaries
+                output = []
+                for record_vals, target_vals in zip(vbatch, vals_list):
+
+                    # Look up existing target record (if any)
+                    target = targets_by_key.get(record_vals['name'])
+                    if target:
+
+                        # Elide EDI records that would not change the target
+                        if target_vals is None:
+                            target_vals = self.target_values(record_vals)
+                        if plan(target_vals)(target, target_vals):
+                            if self._edi_sync_fingerprint:
+                                fresh.append((
+                                    record_vals['name'], target_id(target),
+                                    Fingerprint.digest_values(target_vals),
+                                ))
+                            continue
+
+                        # Add target to EDI record
+                        record_vals[self._edi_sync_target] = target_id(target)
+
+                    # Elide EDI records that are duplicates of earlier records
+                    if produced is not None:
+                        if not produced.add(produced.digest(record_vals)):
+                            continue
+
+                    output.append(record_vals)
+
+                # Record fingerprints of unchanged target records
+                Fingerprint.record(self, fresh)
 
-                # Create EDI record
-                count += 1
-                yield record_vals
+            # Create EDI records
+            queries += stats.count
+            elapsed += stats.elapsed
+            count += len(output)
+            yield from output
 
         # Process all matched target records
-        self.matched(doc, Target.browse(matched_ids))
+        with self.statistics() as stats:
+            self.matched_table(doc, matched_table)
+        queries += stats.count
+        elapsed += stats.elapsed
+
+        # Release deduplication digest set
+        peak = 0
+        if produced is not None:
+            peak = produced.peak
+            produced.close()
 
         # Log statistics
-        stats.stop()
-        excess = (stats.count - count)
-        _logger.info("%s prepared %s elided %d of %d, %d excess queries",
-                     doc.name, self._name, (total - count), total, excess)
+        excess = queries
+        _logger.info("%s prepared %s elided %d of %d (%d by fingerprint), "
+                     "%d compared via snapshot, %d excess queries, %d kB "
+                     "peak deduplication memory", doc.name, self._name,
+                     (total - count), total, fingerprinted, snapshotted,
+                     excess, (peak // 1024))
+        doc.record_metrics('elide', stats, model=self._name, elapsed=elapsed,
+                           queries=queries, records_in=total,
+                           records_out=count, elided=(total - count))
         if excess >= total and total > PRECACHE_WARNING_THRESHOLD:
             _logger.warning("%s missing precaching for %s: %d records, %d "
                             "excess queries", doc.name, self._name, total,
                             excess)
 
+    @api.model
+    def _matched_table(self):
+        """Create empty temporary table of matched target record IDs"""
+        table = 'edi_matched_%s' % self._table
+        self.env.cr.execute(
+            'CREATE TEMPORARY TABLE IF NOT EXISTS "%s" '
+            '(id integer PRIMARY KEY) ON COMMIT DROP' % table
+        )
+        self.env.cr.execute('TRUNCATE "%s"' % table)
+        return table
+
     @api.model
     def matched(self, _doc, _targets):
         """Process matched target records"""
         pass
 
+    @api.model
+    def matched_table(self, doc, table):
+        """Process matched target records listed in a temporary table
+
+        ``table`` is the name of a temporary database table with a
+        single ``id`` column listing the matched target record IDs.
+        If :meth:`~.matched` has been overridden, then the matched
+        target records are loaded and passed to :meth:`~.matched`.
+        Subclasses may override this method instead, to avoid loading
+        the matched target records.
+        """
+        if type(self).matched is EdiSyncRecord.matched:
+            return
+        Target = self.browse()[self._edi_sync_target]
+        self.env.cr.execute('SELECT id FROM "%s" ORDER BY id' % table)
+        self.matched(doc, Target.browse([x[0] for x in
+                                         self.env.cr.fetchall()]))
+
+    @api.multi
+    def record_fingerprints(self, vals_list):
+        """Record content fingerprints of applied target values
+
+        Accepts a list of target model field value dictionaries, in
+        the same order as the records in ``self``.
+        """
+        if self._edi_sync_fingerprint:
+            Fingerprint = self.env['edi.sync.fingerprint']
+            Fingerprint.record(self, (
+                (rec.name, rec[self._edi_sync_target].id,
+                 Fingerprint.digest_values(vals))
+                for rec, vals in zip(self, vals_list)
+            ))
+
+    @api.multi
+    def schedule(self):
+        """Schedule records in waves of lookup relationship readiness
+
+        Any lookup relationship targets that already exist must have
+        been filled in before scheduling (as performed by
+        :meth:`edi.record.execute`).
+
+        Each yielded wave is a recordset for which all lookup
+        relationships are ready, and must be executed (i.e. must have
+        its target records created or updated) before the next wave is
+        requested.
+
+        Records that refer to target records that will be created by
+        other records within the same document (e.g. parent locations)
+        are ordered topologically using a dependency graph constructed
+        once from the lookup keys.  The lookup relationships of each
+        wave are then filled in directly from the target records of
+        the previous waves, without any further searches.
+
+        Any records with dependencies that cannot be satisfied from
+        within the document (including any dependency cycles) are
+        deferred to a final stage that searches for lookup
+        relationship targets as each wave completes.
+        """
+        # pylint: disable=too-many-locals
+        target = self._edi_sync_target
+        Target = self.browse()[target]
+
+        # Identify records for which all lookup relationships are ready
+        # (having already been filled in by edi.record.execute())
+        rels = self._edi_relates
+        pending = self.filtered(lambda x: any(
+            x[rel.key] and not x[rel.target] for rel in rels
+        ))
+        ready = self - pending
+
+        # Identify relationships referring to records within the document
+        internal = set(
+            rel for rel in rels
+            if self._fields[rel.target].comodel_name == Target._name and
+            rel.via == self._edi_sync_via
+        )
+        producers = defaultdict(list)
+        for rec in self:
+            producers[rec.name].append(rec.id)
+
+        # Construct dependency graph
+        links = {}
+        children = defaultdict(list)
+        indegree = {}
+        deferred = []
+        for rec in pending:
+            reclinks = []
+            for rel in rels:
+                if not rec[rel.key] or rec[rel.target]:
+                    continue
+                ids = producers.get(rec[rel.key]) if rel in internal else None
+                if not ids or len(ids) != 1 or ids[0] == rec.id:
+                    deferred.append(rec.id)
+                    break
+                reclinks.append((rel.target, ids[0]))
+            else:
+                links[rec.id] = reclinks
+                indegree[rec.id] = len(reclinks)
+                for _field, producer_id in reclinks:
+                    children[producer_id].append(rec.id)
+
+        # Execute waves in topological order
+        wave = ready.ids
+        while wave:
+            recs = self.browse(wave)
+            updates = defaultdict(list)
+            for rec_id in wave:
+                for field, producer_id in links.get(rec_id, ()):
+                    target_id = self.browse(producer_id)[target].id
+                    updates[(field, target_id)].append(rec_id)
+            for (field, target_id), rec_ids in updates.items():
+                self.browse(rec_ids).write({field: target_id})
+            yield recs
+            nextwave = []
+            for producer_id in wave:
+                for rec_id in children.pop(producer_id, ()):
+                    indegree[rec_id] -= 1
+                    if not indegree[rec_id]:
+                        nextwave.append(rec_id)
+            wave = nextwave
+
+        # Process any deferred records (including dependency cycles)
+        remaining = self.browse(
+            deferred + [k for k, v in indegree.items() if v]
+        )
+        while remaining:
+            ready = remaining._add_edi_relates(required=False)
+            if remaining and not ready:
+                remaining._add_edi_relates(required=True)
+            remaining -= ready
+            if ready:
+                yield ready
+
     @api.multi
     def execute(self):
         """Execute records"""
@@ -311,60 +729,79 @@ class EdiSyncRecord(models.AbstractModel):
                     rec[target] = targets_by_key[rec.name]
 
         # Process records in order of lookup relationship readiness
-        remaining = self
         offset = 0
-        while remaining:
-
-            # Identify records for which all lookup relationships are ready
-            ready = remaining._add_edi_relates(required=False)
-            if remaining and not ready:
-                remaining._add_edi_relates(required=True)
-            remaining -= ready
+        evictor = self.evictor()
+        for ready in self.schedule():
 
-            # Update existing target records
+            # Update existing target records, using a single write
+            # for each distinct set of target values
             existing = ready.filtered(lambda x: x[target])
-            for r, batch in existing.batched(self.BATCH_UPDATE):
+            for r, batch in self.tuned('BATCH_UPDATE', existing):
                 batch.precache()
                 count = len(r)
                 _logger.info("%s updating %s %d-%d of %d", doc.name,
                              Target._name, offset, (offset + count - 1),
                              len(self))
-                with self.statistics() as stats:
+                with self.batch_statistics() as stats:
                     vals_list = [rec.target_values(rec._record_values())
                                  for rec in batch]
+                    payloads = {}
                     for rec, vals in zip(batch, vals_list):
-                        rec[target].write(vals)
+                        payload = payloads.setdefault(
+                            repr(sorted(vals.items())), (vals, [])
+                        )
+                        payload[1].append(rec[target].id)
+                    for vals, ids in payloads.values():
+                        Target.browse(ids).write(vals)
                     self.recompute()
-                _logger.info("%s updated %s %d-%d in %.2fs, %d excess queries",
-                             doc.name, Target._name, offset,
-                             (offset + count - 1), stats.elapsed,
-                             (stats.count - count))
+                    batch.record_fingerprints(vals_list)
+                writes = len(payloads)
+                evicted = evictor.evict(batch, batch.mapped(target))
+                _logger.info("%s updated %s %d-%d in %.2fs, %d writes (%d "
+                             "coalesced), %d excess queries, %dkB peak, %d "
+                             "evicted", doc.name, Target._name, offset,
+                             (offset + count - 1), stats.elapsed, writes,
+                             (count - writes), (stats.count - writes),
+                             stats.peak, evicted)
                 offset += count
 
             # Create new target records
             new = ready.filtered(lambda x: not x[target])
-            for r, batch in new.batched(self.BATCH_CREATE):
+            creator = EdiBulkCreator(Target)
+            for r, batch in self.tuned('BATCH_CREATE', new):
                 batch.precache()
                 count = len(r)
                 _logger.info("%s creating %s %d-%d of %d", doc.name,
                              Target._name, offset, (offset + count - 1),
                              len(self))
-                with self.statistics() as stats:
-                    vals_list = list(self.add_edi_defaults(
-                        Target,
-                        (rec.target_values(rec._record_values())
-                         for rec in batch)
-                    ))
-                    targets = [Target.create(vals) for vals in vals_list]
+                with self.batch_statistics() as stats:
+                    raw_vals_list = [rec.target_values(rec._record_values())
+                                     for rec in batch]
+                    vals_list = list(self.add_edi_defaults(Target,
+                                                           raw_vals_list))
+                    if self._edi_sync_bulk_create:
+                        statements = creator.count
+                        targets = creator.create(vals_list)
+                        expected = count + (creator.count - statements)
+                    else:
+                        targets = [Target.create(vals) for vals in vals_list]
+                        expected = 2 * count
                     for rec, created in zip(batch, targets):
                         rec[target] = created
                     self.recompute()
-                _logger.info("%s created %s %d-%d in %.2fs, %d excess queries",
-                             doc.name, Target._name, offset,
-                             (offset + count - 1), stats.elapsed,
-                             (stats.count - 2 * count))
+                    batch.record_fingerprints(raw_vals_list)
+                evicted = evictor.evict(batch, batch.mapped(target))
+                _logger.info("%s created %s %d-%d in %.2fs, %d excess "
+                             "queries, %dkB peak, %d evicted", doc.name,
+                             Target._name, offset, (offset + count - 1),
+                             stats.elapsed, (stats.count - expected),
+                             stats.peak, evicted)
                 offset += count
 
+        # Report evicted records
+        if evictor.count:
+            _logger.info("%s evicted %s", doc.name, evictor)
+
 
 class EdiDeactivatorRecord(models.AbstractModel):
     """EDI deactivator record
@@ -373,7 +810,9 @@ class EdiDeactivatorRecord(models.AbstractModel):
     records in a target model.  Each row represents an Odoo record
     that will be deactivated when the document is executed.
 
-    Derived models must override the comodel name for ``target_id``.
+    Derived models must override the comodel name for ``target_id``,
+    and may enable :attr:`~.edi.record._edi_bulk_copy` once they have
+    been validated not to rely on any create-time side effects.
     """
 
     _edi_deactivator_name = 'name'
@@ -423,11 +862,94 @@ class EdiActiveSyncRecord(models.AbstractModel):
 
     @api.model
     def matched(self, doc, targets):
-        """Process matched target records"""
+        """Process matched target records
+
+        Any target records matching the synchronizer domain that are
+        not present in ``targets`` are passed to the deactivator
+        record model (see :meth:`~.deactivate_unmatched`).
+        """
+        table = self._matched_table()
+        self.env.cr.execute(
+            'INSERT INTO "%s" (id) SELECT unnest(%%s) '
+            'ON CONFLICT DO NOTHING' % table, (targets.ids,)
+        )
+        self.deactivate_unmatched(doc, table)
+
+    @api.model
+    def matched_table(self, doc, table):
+        """Process matched target records listed in a temporary table
+
+        Unmatched target records are deactivated directly from the
+        table of matched target record IDs, without loading the
+        matched target records, unless :meth:`~.matched` has been
+        overridden.
+        """
+        if type(self).matched is not EdiActiveSyncRecord.matched:
+            super().matched_table(doc, table)
+            return
+        self.deactivate_unmatched(doc, table)
+
+    @api.model
+    def deactivate_unmatched(self, doc, table):
+        """Deactivate unmatched target records
+
+        Any target records matching the synchronizer domain that are
+        not present in the table of matched target record IDs are
+        identified using a database anti-join, and passed to the
+        deactivator record model.
+
+        For documents using delta input, only target records
+        corresponding to removed input lines are considered.
+        """
         if self._edi_sync_deactivator is not None:
             Deactivator = self.env[self._edi_sync_deactivator]
-            unmatched = (targets.search(self._edi_sync_domain_call()) - targets)
+            Target = self.browse()[self._edi_sync_target]
+            name = Deactivator._edi_deactivator_name
+            field = Target._fields[name]
+            is_column = (field.store and field.column_type and
+                         not field.inherited and not field.translate)
+            domain = self._edi_sync_domain_call()
+
+            # Consider only records removed from delta input, if any
+            removed = self.removed_keys(doc)
+            if removed is not None:
+                if not removed:
+                    return
+                domain = expression.AND([
+                    [(self._edi_sync_via, 'in', removed)], domain
+                ])
+
+            query = Target._where_calc(domain)
+            Target._apply_ir_rules(query, 'read')
+            from_clause, where_clause, params = query.get_sql()
+            sql = (
+                'SELECT "%s".id%s FROM %s WHERE %s AND "%s".id > %%s AND '
+                'NOT EXISTS (SELECT 1 FROM "%s" m WHERE m.id = "%s".id) '
+                'ORDER BY "%s".id LIMIT %d' % (
+                    Target._table,
+                    (', "%s"."%s"' % (Target._table, name)
+                     if is_column else ''),
+                    from_clause, where_clause or 'TRUE', Target._table,
+                    table, Target._table, Target._table, self.BATCH_SIZE,
+                )
+            )
+
+            def unmatched():
+                """Iterate over unmatched target records in batches"""
+                last = 0
+                while True:
+                    self.env.cr.execute(sql, params + [last])
+                    rows = self.env.cr.fetchall()
+                    if not rows:
+                        break
+                    last = rows[-1][0]
+                    if not is_column:
+                        rows = [(x.id, x[name])
+                                for x in Target.browse([r[0] for r in rows])]
+                    yield from rows
+
+            rows = unmatched()
             Deactivator.prepare(doc, ({
-                'target_id': target.id,
-                'name': target[Deactivator._edi_deactivator_name],
-            } for target in unmatched))
+                'target_id': target_id,
+                'name': target_name,
+            } for target_id, target_name in rows))
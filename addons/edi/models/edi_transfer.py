@@ -1,7 +1,7 @@
 """EDI transfers"""
 
 import logging
-from odoo import api, fields, models
+from odoo import api, fields, models, tools
 from odoo.tools.translate import _
 
 _logger = logging.getLogger(__name__)
@@ -34,6 +34,7 @@ class EdiTransfer(models.Model):
                                    default=True, readonly=True)
     allow_send = fields.Boolean(string="Send Outputs", required=True,
                                 default=True, readonly=True)
+    duration = fields.Float(string="Duration (s)", readonly=True)
 
     # Associated documents and attachments
     doc_ids = fields.One2many('edi.document', 'transfer_id',
@@ -60,6 +61,13 @@ class EdiTransfer(models.Model):
                                  readonly=True)
     issue_ids = fields.One2many(inverse_name='edi_transfer_id')
 
+    @api.model_cr
+    def init(self):
+        """Create index for :meth:`edi.openmetrics.recent` queries"""
+        super().init()
+        tools.create_index(self._cr, 'edi_transfer_create_date_index',
+                           self._table, ['create_date'])
+
     @api.depends('doc_ids')
     def _compute_doc_count(self):
         """Compute number of documents (for UI display)"""
@@ -171,7 +179,12 @@ class EdiTransfer(models.Model):
             self.receive_inputs(conn)
 
         # Prepare and execute documents, if applicable
-        if self.allow_process:
+        if self.allow_process and self.gateway_id.queue:
+            for job in self.env['edi.job'].enqueue(self.doc_ids):
+                _logger.info("%s queued %s",
+                             self.gateway_id.name, job.doc_id.name)
+                self.message_post(body=(_("Queued %s") % job.doc_id.name))
+        elif self.allow_process:
             for doc in self.doc_ids:
                 _logger.info("%s preparing %s",
                              self.gateway_id.name, doc.name)
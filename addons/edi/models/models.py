@@ -27,6 +27,20 @@ def batched(self, size=models.PREFETCH_MAX):
     """Return the recordset ``self`` split into batches of a specified size"""
     return tools.ranged(self.sliced(size=size))
 
+@add_if_not_exists(models.BaseModel)
+def tuned(self, operation, iterable=None):
+    """Return ``iterable`` split into batches of an automatically tuned size
+
+    The iterable defaults to the recordset ``self``.  The untuned
+    batch size is taken from the attribute named by ``operation``
+    (e.g. ``BATCH_SIZE``).  Precache paths may be learned while
+    processing the first batch.
+    """
+    batches = self.env['edi.batch.tuning'].batched(
+        self, operation, (self if iterable is None else iterable)
+    )
+    return self.env['edi.precache.path'].learning(self, batches)
+
 @add_if_not_exists(models.BaseModel)
 def groupby(self, key, sort=True):
     """Return the recordset ``self`` grouped by ``key``
@@ -52,9 +66,10 @@ def groupby(self, key, sort=True):
             for k, v in itertools.groupby(recs, key=key))
 
 @add_if_not_exists(models.BaseModel)
-def statistics(self, cache=False):
+def statistics(self, cache=False, profile=False, trace_memory=False):
     """Gather profiling statistics for an operation"""
-    return tools.EdiStatistics(self.env, cache=cache)
+    return tools.EdiStatistics(self.env, cache=cache, profile=profile,
+                               trace_memory=trace_memory)
 
 @add_if_not_exists(models.BaseModel)
 def trace(self, filter=None, max=None):
@@ -1,14 +1,25 @@
 """EDI tests"""
 
 from . import test_autocreate
+from . import test_benchmark
+from . import test_bulk
+from . import test_comparators
+from . import test_dedupe
 from . import test_edi_connection_local
 from . import test_edi_connection_mail
 from . import test_edi_connection_sftp
 from . import test_edi_document
 from . import test_edi_issue
+from . import test_edi_job
 from . import test_edi_transfer
+from . import test_eviction
 from . import test_iterators
+from . import test_lookup
+from . import test_openmetrics
 from . import test_partner
 from . import test_partner_tutorial
+from . import test_profiling
 from . import test_raw
 from . import test_sap
+from . import test_tracing
+from . import test_tuning
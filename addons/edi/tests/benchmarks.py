@@ -0,0 +1,22 @@
+"""EDI synthetic benchmarks"""
+
+from ..tools import EdiBenchmark
+
+
+class EdiPartnerTutorialBenchmark(EdiBenchmark):
+    """Partner tutorial CSV benchmark"""
+
+    name = 'partner'
+    doc_type = 'edi.partner_tutorial_document_type'
+
+    TITLES = ('Miss', 'Mr', 'Ms', '')
+    """Partner titles"""
+
+    def inputs(self):
+        rows = []
+        for ref in self.codes('P', self.scale):
+            name = self.word()
+            rows.append('%s,%s,%s,%s@example.com' % (
+                ref, self.random.choice(self.TITLES), name, name.lower()
+            ))
+        yield ('partners.csv', '\n'.join(rows).encode())
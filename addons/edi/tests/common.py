@@ -11,6 +11,7 @@ from odoo.exceptions import UserError
 from odoo.modules.module import get_resource_from_path, get_resource_path
 from odoo.tools import mute_logger
 from odoo.tests import common
+from ..tools import batch_tuner, lookup_cache
 
 
 class EdiTestFile(pathlib.PurePosixPath):
@@ -64,6 +65,14 @@ class EdiCase(common.SavepointCase):
             lambda x: x.model_id.model not in cls.env
         ).unlink()
 
+    def setUp(self):
+        super().setUp()
+        # Discard cached lookups that may refer to rolled back records
+        lookup_cache.clear(self.env.cr.dbname)
+        lookup_cache.rollback(self.env.cr)
+        # Discard learned batch sizes from previous tests
+        batch_tuner.clear()
+
     @classmethod
     def create_attachment(cls, *filenames):
         """Create attachment(s)"""
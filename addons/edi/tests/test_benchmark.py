@@ -0,0 +1,83 @@
+"""Synthetic benchmark tests"""
+
+from unittest import TestCase
+from .benchmarks import EdiPartnerTutorialBenchmark
+from .common import EdiCase
+from ..tools import EdiBenchmark
+from ..tools.benchmark import METRICS, parse_scale, regressions
+
+
+class TestBenchmarkTools(TestCase):
+    """Synthetic benchmark tool tests"""
+
+    def test01_scale(self):
+        """Parse benchmark scales"""
+        self.assertEqual(parse_scale('250'), 250)
+        self.assertEqual(parse_scale('1k'), 1000)
+        self.assertEqual(parse_scale('100K'), 100000)
+        self.assertEqual(parse_scale('1M'), 1000000)
+        with self.assertRaises(ValueError):
+            parse_scale('1G')
+
+    def test02_regressions(self):
+        """Detect regressions against a baseline"""
+        baseline = {'partner': {'1000': {
+            'prepare': {'records_per_second': 100, 'queries_per_record': 2,
+                        'memory_growth': 1000},
+            'execute': {'records_per_second': 50, 'queries_per_record': 4,
+                        'memory_growth': 2000},
+        }}}
+        results = {'partner': {'1000': {
+            'prepare': {'records_per_second': 85, 'queries_per_record': 1,
+                        'memory_growth': 1100},
+            'execute': {'records_per_second': 60, 'queries_per_record': 5,
+                        'memory_growth': 2000},
+        }}, 'product': {'1000': {
+            'prepare': {'records_per_second': 1, 'queries_per_record': 100,
+                        'memory_growth': 1},
+        }}}
+        self.assertEqual(list(regressions(baseline, results, 0.2)), [
+            ('partner', '1000', 'execute', 'queries_per_record', 4, 5),
+        ])
+        self.assertEqual(list(regressions(baseline, results, 0.1)), [
+            ('partner', '1000', 'execute', 'queries_per_record', 4, 5),
+            ('partner', '1000', 'prepare', 'records_per_second', 100, 85),
+        ])
+
+
+class TestBenchmark(EdiCase):
+    """Synthetic benchmark tests"""
+
+    def test01_registry(self):
+        """Benchmarks are discoverable by name"""
+        self.assertIs(EdiBenchmark.benchmarks()['partner'],
+                      EdiPartnerTutorialBenchmark)
+
+    def test02_seeded(self):
+        """Generated inputs are reproducible"""
+        first = list(EdiPartnerTutorialBenchmark(self.env, 10).inputs())
+        second = list(EdiPartnerTutorialBenchmark(self.env, 10).inputs())
+        other = list(EdiPartnerTutorialBenchmark(self.env, 10,
+                                                 seed=1).inputs())
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test03_run(self):
+        """Run benchmark"""
+        results = EdiPartnerTutorialBenchmark(self.env, 20).run()
+        self.assertEqual(set(results), {'prepare', 'execute'})
+        self.assertEqual(results['prepare']['records'], 20)
+        self.assertGreater(results['execute']['queries_per_record'], 0)
+        self.assertGreaterEqual(results['execute']['memory_growth'], 0)
+        self.assertNotIn('peak_memory', results['execute'])
+        results = EdiPartnerTutorialBenchmark(self.env, 20,
+                                              trace_memory=True).run()
+        self.assertGreater(results['prepare']['peak_memory'], 0)
+
+    def test04_metrics(self):
+        """Benchmark results include all regression metrics"""
+        results = EdiPartnerTutorialBenchmark(self.env, 10).run()
+        for phase in ('prepare', 'execute'):
+            self.assertEqual(results[phase]['records'], 10)
+            self.assertEqual(set(METRICS) - set(results[phase]),
+                             {'peak_memory'})
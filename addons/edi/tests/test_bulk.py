@@ -0,0 +1,84 @@
+"""Bulk record creation tests"""
+
+from ..tools import EdiBulkCreator
+from .common import EdiCase
+
+
+class TestBulk(EdiCase):
+    """Bulk record creation tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        EdiDocumentType = cls.env['edi.document.type']
+        IrModel = cls.env['ir.model']
+        cls.doc_type = EdiDocumentType.create({
+            'name': "Bulk test document",
+            'model_id': IrModel._get_id('edi.document.model'),
+        })
+        cls.doc = cls.create_document(cls.doc_type)
+
+    def test01_insert(self):
+        """Test bulk creation using a single query"""
+        EdiPartnerRecord = self.env['edi.partner.record']
+        creator = EdiBulkCreator(EdiPartnerRecord)
+        vlist = [{'doc_id': self.doc.id, 'name': 'REF%03d' % i}
+                 for i in range(50)]
+        with self.env['edi.document'].statistics() as stats:
+            recs = creator.create(vlist)
+        self.assertEqual(creator.count, 1)
+        self.assertLess(stats.count, len(vlist))
+        self.assertEqual(recs.mapped('name'), [x['name'] for x in vlist])
+        self.assertEqual(set(recs.mapped('full_name')), {"Anonymous"})
+        self.assertEqual(self.doc.partner_ids, recs)
+
+    def test02_fallback(self):
+        """Test fallback to individual creation for non-column fields"""
+        EdiRecordType = self.env['edi.record.type']
+        IrModel = self.env['ir.model']
+        creator = EdiBulkCreator(EdiRecordType)
+        model_id = IrModel._get_id('edi.partner.record')
+        recs = creator.create([
+            {'name': "Plain", 'model_id': model_id},
+            {'name': "Linked", 'model_id': model_id,
+             'doc_type_ids': [(6, 0, self.doc_type.ids)]},
+            {'name': "Also plain", 'model_id': model_id},
+        ])
+        self.assertEqual(recs.mapped('name'),
+                         ["Plain", "Linked", "Also plain"])
+        self.assertEqual(recs[1].doc_type_ids, self.doc_type)
+        self.assertFalse(recs[0].doc_type_ids)
+        self.assertEqual(creator.count, 2)
+
+    def test03_copy(self):
+        """Test bulk loading using COPY"""
+        EdiPartnerRecord = self.env['edi.partner.record']
+        creator = EdiBulkCreator(EdiPartnerRecord)
+        self.assertFalse(self.doc.partner_ids)
+        creator.load([{'doc_id': self.doc.id, 'name': 'REF%03d' % i,
+                       'full_name': "Tab\there\\%d" % i}
+                      for i in range(20)])
+        creator.invalidate()
+        self.assertEqual(creator.count, 1)
+        recs = self.doc.partner_ids
+        self.assertEqual(len(recs), 20)
+        self.assertEqual(recs[3].name, 'REF003')
+        self.assertEqual(recs[3].full_name, "Tab\there\\3")
+        self.assertTrue(recs[3].create_date)
+
+    def test04_plain_model(self):
+        """Test bulk creation of a plain target model"""
+        Partner = self.env['res.partner']
+        parent = Partner.create({'name': "Parent"})
+        self.assertFalse(parent.child_ids)
+        creator = EdiBulkCreator(Partner)
+        vlist = [{'name': "Child %d" % i, 'ref': 'CHILD%d' % i,
+                  'parent_id': parent.id} for i in range(5)]
+        recs = creator.create(vlist)
+        Partner.recompute()
+        self.assertEqual(creator.count, 1)
+        self.assertEqual(recs.mapped('ref'), [x['ref'] for x in vlist])
+        self.assertTrue(all(recs.mapped('active')))
+        self.assertEqual(set(recs.mapped('type')), {'contact'})
+        self.assertEqual(recs[2].display_name, "Parent, Child 2")
+        self.assertEqual(parent.child_ids, recs)
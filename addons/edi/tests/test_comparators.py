@@ -0,0 +1,140 @@
+"""Comparator tests"""
+
+import logging
+import time
+from unittest.mock import patch
+from odoo import models
+from ..tools import comparators, Comparator
+from .common import EdiCase
+
+_logger = logging.getLogger(__name__)
+
+
+class TestComparator(EdiCase):
+    """Comparator tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Partner = cls.env['res.partner']
+        Title = cls.env['res.partner.title']
+        cls.title = Title.create({'name': "Captain", 'shortcut': "Capt."})
+        cls.partner = Partner.create({
+            'name': "Haddock",
+            'ref': 'HADDOCK',
+            'title': cls.title.id,
+            'partner_latitude': 51.12345,
+        })
+
+    def assertPlanEqual(self, target, values, expected):
+        """Assert that compiled and per-field comparisons agree"""
+        comparator = Comparator(target.browse())
+        per_field = all(comparator[k](target[k], v) for k, v in values.items())
+        compiled = comparator.plan(values)(target, values)
+        self.assertEqual(per_field, expected)
+        self.assertEqual(compiled, expected)
+
+    def test01_plain(self):
+        """Test plain field comparison"""
+        self.assertPlanEqual(self.partner, {'name': "Haddock"}, True)
+        self.assertPlanEqual(self.partner, {'name': "Tintin"}, False)
+        self.assertPlanEqual(self.partner, {'email': False}, True)
+        self.assertPlanEqual(self.partner, {'email': None}, True)
+        self.assertPlanEqual(self.partner, {'email': ''}, True)
+        self.assertPlanEqual(self.partner, {'email': 'x@example.com'}, False)
+
+    def test02_many2one(self):
+        """Test Many2one field comparison"""
+        self.assertPlanEqual(self.partner, {'title': self.title.id}, True)
+        self.assertPlanEqual(self.partner, {'title': False}, False)
+        self.assertPlanEqual(self.partner, {'parent_id': False}, True)
+        self.assertPlanEqual(self.partner, {'parent_id': models.NewId()},
+                             False)
+
+    def test03_float(self):
+        """Test floating-point precision field comparison"""
+        self.assertPlanEqual(self.partner, {'partner_latitude': 51.123451},
+                             True)
+        self.assertPlanEqual(self.partner, {'partner_latitude': 51.1235},
+                             False)
+
+    def test04_mixed(self):
+        """Test mixed field comparison"""
+        self.assertPlanEqual(self.partner, {
+            'name': "Haddock",
+            'ref': 'HADDOCK',
+            'title': self.title.id,
+            'partner_latitude': 51.12345,
+        }, True)
+        self.assertPlanEqual(self.partner, {
+            'name': "Haddock",
+            'ref': 'HADDOCK',
+            'title': self.title.id,
+            'partner_latitude': 52,
+        }, False)
+
+    def test05_cached(self):
+        """Test that compiled plans are cached per registry"""
+        Partner = self.env['res.partner']
+        plan = Comparator(Partner).plan(['name', 'ref'])
+        self.assertIs(Comparator(Partner).plan(('ref', 'name')), plan)
+        self.assertIsNot(Comparator(Partner).plan(['name']), plan)
+
+    def test06_precision(self):
+        """Test that compiled plans respect changes in precision"""
+        Partner = self.env['res.partner']
+        field = Partner._fields['partner_latitude']
+        values = {'partner_latitude': 51.12}
+        self.assertFalse(Comparator(Partner).plan(values)(self.partner,
+                                                          values))
+        with patch.object(field, '_digits', (16, 2)):
+            self.assertTrue(Comparator(Partner).plan(values)(self.partner,
+                                                             values))
+            self.assertTrue(Comparator(Partner).snapshot_plan(
+                ['partner_latitude'], values
+            )((self.partner.id, 51.12345), values))
+        self.assertFalse(Comparator(Partner).plan(values)(self.partner,
+                                                          values))
+
+    def test07_bounded(self):
+        """Test that the compiled plan cache is bounded"""
+        Partner = self.env['res.partner']
+        with patch.object(comparators, 'PLAN_CACHE_SIZE', 2):
+            first = Comparator(Partner).plan(['name'])
+            Comparator(Partner).plan(['ref'])
+            Comparator(Partner).plan(['email'])
+            self.assertLessEqual(len(Comparator(Partner).plans), 2)
+            self.assertIsNot(Comparator(Partner).plan(['name']), first)
+
+    def test08_benchmark(self):
+        """Benchmark compiled plans against per-field comparison"""
+        Partner = self.env['res.partner']
+        partners = Partner.browse()
+        for i in range(500):
+            partners += Partner.create({
+                'name': "Partner %d" % i,
+                'ref': 'REF%d' % i,
+                'email': 'p%d@example.com' % i,
+                'title': self.title.id,
+            })
+        values = [{'name': x.name, 'ref': x.ref, 'email': x.email,
+                   'comment': False, 'title': self.title.id}
+                  for x in partners]
+        partners.mapped('title.name')
+        comparator = Comparator(Partner)
+        start = time.perf_counter()
+        for _ in range(10):
+            per_field = [all(comparator[k](target[k], v)
+                             for k, v in vals.items())
+                         for target, vals in zip(partners, values)]
+        per_field_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(10):
+            compiled = [comparator.plan(vals)(target, vals)
+                        for target, vals in zip(partners, values)]
+        compiled_elapsed = time.perf_counter() - start
+        self.assertTrue(all(per_field))
+        self.assertEqual(compiled, per_field)
+        _logger.info("Comparator benchmark: per-field %.3fs, compiled %.3fs "
+                     "(%.1fx)", per_field_elapsed, compiled_elapsed,
+                     (per_field_elapsed / compiled_elapsed))
@@ -0,0 +1,40 @@
+"""Deduplication tests"""
+
+from unittest import TestCase
+from odoo import models
+from ..tools import EdiDigestSet
+
+
+class TestDigestSet(TestCase):
+    """Deduplication tests"""
+
+    def check(self, spill):
+        """Check equivalence with a set of frozen value dictionaries"""
+        expected = set()
+        with EdiDigestSet(capacity=4, spill=spill) as produced:
+            for i in range(5000):
+                vals = {'name': str(i % 1234), 'qty': i % 3}
+                frozen = frozenset(vals.items())
+                self.assertEqual(produced.add(produced.digest(vals)),
+                                 frozen not in expected)
+                expected.add(frozen)
+            self.assertEqual(len(produced), len(expected))
+        return produced
+
+    def test01_memory(self):
+        """Check in-memory hash table"""
+        produced = self.check(spill=False)
+        self.assertEqual(produced.peak, 3 * produced.nbytes // 2)
+
+    def test02_spill(self):
+        """Check disk-spilled hash table"""
+        produced = self.check(spill=True)
+        self.assertEqual(produced.peak, 0)
+
+    def test03_newid(self):
+        """Check values referring to nonexistent records are ignored"""
+        digest = EdiDigestSet.digest
+        self.assertEqual(digest({'name': 'A', 'product_id': models.NewId()}),
+                         digest({'name': 'A'}))
+        self.assertNotEqual(digest({'name': 'A', 'product_id': 1}),
+                            digest({'name': 'A'}))
@@ -1,6 +1,6 @@
 """EDI document tests"""
 
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
 from .common import EdiCase
 
 
@@ -115,3 +115,67 @@ class TestEdiDocument(EdiCase):
         self.assertEqual(len(doc2.input_ids), 2)
         for attachment in doc2.input_ids:
             self.assertAttachment(attachment)
+
+    def test14_rec_type_waves(self):
+        """Test grouping of record types by dependency"""
+        EdiRecordType = self.env['edi.record.type']
+        IrModel = self.env['ir.model']
+        titles = EdiRecordType.create({
+            'name': "Titles",
+            'model_id': IrModel._get_id('edi.partner.title.record'),
+        })
+        partners = EdiRecordType.create({
+            'name': "Partners",
+            'model_id': IrModel._get_id('edi.partner.record'),
+            'depends_ids': [(6, 0, [titles.id])],
+        })
+        raws = EdiRecordType.create({
+            'name': "Raw",
+            'model_id': IrModel._get_id('edi.raw.record'),
+        })
+        self.doc_type.rec_type_ids = titles | partners | raws
+        self.assertEqual(self.doc.rec_type_waves(),
+                         [titles | raws, partners])
+        self.assertEqual(self.doc.pending_rec_type_waves(),
+                         [titles | raws, partners])
+        self.doc.mark_executed(titles)
+        self.assertEqual(self.doc.pending_rec_type_waves(),
+                         [raws, partners])
+        self.doc.mark_executed(raws)
+        self.doc.mark_executed(partners)
+        self.assertFalse(self.doc.pending_rec_type_waves())
+        titles.depends_ids = partners
+        with self.assertRaises(UserError):
+            self.doc.rec_type_waves()
+
+    def test15_claim(self):
+        """Test claiming unprocessed documents"""
+        EdiDocument = self.env['edi.document']
+        others = EdiDocument.search([
+            ('state', 'in', ('draft', 'prep', 'part')),
+            ('id', '!=', self.doc.id),
+        ])
+        others.write({'state': 'cancel'})
+        self.assertEqual(EdiDocument.claim(), self.doc)
+        self.doc.release()
+        self.doc.doc_type_id = self.doc_type_unknown
+        with self.assertRaisesIssue(self.doc):
+            self.doc.action_prepare()
+        self.assertFalse(EdiDocument.claim())
+
+    def test16_relock(self):
+        """Test reacquiring document lock"""
+        self.doc.lock_for_action()
+        self.doc.relock()
+        self.env.cr.execute("UPDATE edi_document SET state = 'done' "
+                            "WHERE id = %s", (self.doc.id,))
+        with self.assertRaises(UserError):
+            self.doc.relock()
+
+    def test17_delta_unsupported(self):
+        """Test delta input is restricted to line-oriented documents"""
+        with self.assertRaises(ValidationError):
+            self.doc_type.delta = True
+        doc_type_tutorial = self.env.ref('edi.partner_tutorial_document_type')
+        doc_type_tutorial.delta = True
+        self.assertTrue(doc_type_tutorial.delta)
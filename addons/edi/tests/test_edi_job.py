@@ -0,0 +1,132 @@
+"""EDI job tests"""
+
+from unittest.mock import patch
+from .common import EdiCase
+
+
+class TestEdiJob(EdiCase):
+    """EDI job tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        EdiDocumentType = cls.env['edi.document.type']
+        IrModel = cls.env['ir.model']
+
+        # Create document type
+        cls.doc_type = EdiDocumentType.create({
+            'name': "Test EDI document",
+            'model_id': IrModel._get_id('edi.document.model'),
+        })
+
+    def test01_enqueue(self):
+        """Test enqueueing documents"""
+        EdiJob = self.env['edi.job']
+        doc1 = self.create_document(self.doc_type)
+        doc2 = self.create_document(self.doc_type)
+        jobs = EdiJob.enqueue(doc1 | doc2)
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(set(jobs.mapped('state')), {'pending'})
+        self.assertEqual(doc1.job_ids, jobs.filtered(lambda x:
+                                                     x.doc_id == doc1))
+        self.assertFalse(EdiJob.enqueue(doc1))
+
+    def test02_run_pending(self):
+        """Test running pending jobs"""
+        EdiJob = self.env['edi.job']
+        doc1 = self.create_document(self.doc_type)
+        doc2 = self.create_document(self.doc_type)
+        jobs = EdiJob.enqueue(doc1 | doc2)
+        self.assertEqual(EdiJob.run_pending(limit=1, worker='test'), 1)
+        self.assertEqual(EdiJob.run_pending(worker='test'), 1)
+        self.assertEqual(EdiJob.run_pending(worker='test'), 0)
+        self.assertEqual(set(jobs.mapped('state')), {'done'})
+        self.assertEqual(set(jobs.mapped('worker')), {'test'})
+        self.assertTrue(all(x.start_date and x.end_date for x in jobs))
+        self.assertEqual(doc1.state, 'done')
+        self.assertEqual(doc2.state, 'done')
+        self.assertEqual(len(EdiJob.enqueue(doc1)), 1)
+
+    def test03_failed(self):
+        """Test failed job"""
+        EdiJob = self.env['edi.job']
+        doc = self.create_document(self.doc_type_unknown)
+        job = EdiJob.enqueue(doc)
+        with self.assertRaisesIssue(doc):
+            self.assertEqual(EdiJob.run_pending(), 1)
+        self.assertEqual(job.state, 'failed')
+        self.assertEqual(len(EdiJob.enqueue(doc)), 1)
+
+    def test04_transfer(self):
+        """Test transfer via queueing gateway"""
+        EdiGateway = self.env['edi.gateway']
+        EdiTransfer = self.env['edi.transfer']
+        IrModel = self.env['ir.model']
+        gateway = EdiGateway.create({
+            'name': "Test gateway",
+            'model_id': IrModel._get_id('edi.connection.model'),
+            'queue': True,
+        })
+        xfer = EdiTransfer.create({
+            'gateway_id': gateway.id,
+            'allow_receive': False,
+            'allow_send': False,
+        })
+        doc = self.create_document(self.doc_type)
+        xfer.doc_ids += doc
+        xfer.do_transfer(None)
+        self.assertEqual(doc.state, 'draft')
+        self.assertEqual(doc.job_ids.state, 'pending')
+
+    def test05_exception(self):
+        """Test job raising an unexpected exception"""
+        EdiDocument = self.env['edi.document']
+        EdiJob = self.env['edi.job']
+        doc1 = self.create_document(self.doc_type)
+        doc2 = self.create_document(self.doc_type)
+        jobs = EdiJob.enqueue(doc1 | doc2)
+        with patch.object(EdiDocument.__class__, 'action_execute',
+                          autospec=True, side_effect=RuntimeError("Oops")):
+            self.assertEqual(EdiJob.run_pending(worker='test'), 2)
+        self.assertEqual(set(jobs.mapped('state')), {'failed'})
+        self.assertTrue(all(x.end_date for x in jobs))
+        self.assertEqual(doc1.state, 'draft')
+
+    def test06_running(self):
+        """Test running jobs are not claimed"""
+        EdiJob = self.env['edi.job']
+        EdiJob.search([('state', 'in', ('pending', 'running'))]).write({
+            'state': 'done',
+        })
+        doc = self.create_document(self.doc_type)
+        job = EdiJob.enqueue(doc)
+        self.assertEqual(EdiJob.claim(), job)
+        job.start(worker='test')
+        job.release()
+        self.assertEqual(job.state, 'running')
+        with self.registry.cursor() as cr:
+            cr.execute(
+                "SELECT pg_advisory_lock(%s::regclass::oid::integer, %s)",
+                (EdiJob._table, job.id)
+            )
+            self.assertFalse(EdiJob.claim())
+            cr.execute(
+                "SELECT pg_advisory_unlock(%s::regclass::oid::integer, %s)",
+                (EdiJob._table, job.id)
+            )
+
+    def test07_reclaim(self):
+        """Test reclaiming abandoned jobs"""
+        EdiJob = self.env['edi.job']
+        EdiJob.search([('state', 'in', ('pending', 'running'))]).write({
+            'state': 'done',
+        })
+        doc = self.create_document(self.doc_type)
+        job = EdiJob.enqueue(doc)
+        job.start(worker='dead')
+        self.assertEqual(EdiJob.claim(), job)
+        job.release()
+        self.assertEqual(EdiJob.run_pending(worker='test'), 1)
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.worker, 'test')
+        self.assertEqual(doc.state, 'done')
@@ -0,0 +1,65 @@
+"""Cache eviction tests"""
+
+import tracemalloc
+from .common import EdiCase
+from ..tools import EdiCacheEvictor
+
+
+class TestEviction(EdiCase):
+    """Cache eviction tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Partner = cls.env['res.partner']
+        cls.alice = Partner.create({'name': "Alice"})
+        cls.bob = Partner.create({'name': "Bob"})
+
+    def assertCached(self, rec, fname, cached=True):
+        """Assert that a field value is (or is not) cached"""
+        values = self.env.cache._data.get(rec._fields[fname], {})
+        self.assertEqual(rec.id in values, cached)
+
+    def test01_evict(self):
+        """Evict records from cache"""
+        partners = self.alice + self.bob
+        partners.mapped('name')
+        self.assertCached(self.alice, 'name')
+        evictor = EdiCacheEvictor()
+        self.assertGreater(evictor.evict(self.alice), 0)
+        self.assertCached(self.alice, 'name', cached=False)
+        self.assertCached(self.bob, 'name')
+        self.assertEqual(evictor.records['res.partner'], 1)
+        self.assertEqual(evictor.count, evictor.entries['res.partner'])
+        self.assertIn('res.partner:1', str(evictor))
+        self.assertEqual(self.alice.name, "Alice")
+
+    def test02_disabled(self):
+        """Disabled cache evictor"""
+        self.alice.mapped('name')
+        evictor = EdiCacheEvictor(enabled=False)
+        self.assertEqual(evictor.evict(self.alice), 0)
+        self.assertCached(self.alice, 'name')
+        self.assertFalse(evictor.count)
+
+    def test03_inherits(self):
+        """Evict parent records"""
+        user = self.env.ref('base.user_root')
+        user.mapped('name')
+        evictor = EdiCacheEvictor()
+        evictor.evict(user)
+        self.assertEqual(evictor.records['res.users'], 1)
+        self.assertEqual(evictor.records['res.partner'], 1)
+        self.assertCached(user.partner_id, 'name', cached=False)
+
+    def test04_trace_memory(self):
+        """Trace peak memory usage"""
+        with self.alice.statistics(trace_memory=True) as stats:
+            data = bytearray(4 * 1024 * 1024)
+            del data
+        self.assertGreaterEqual(stats.peak, 4 * 1024)
+        self.assertFalse(tracemalloc.is_tracing())
+        with self.alice.statistics() as stats:
+            data = bytearray(4 * 1024 * 1024)
+            del data
+        self.assertEqual(stats.peak, 0)
@@ -0,0 +1,150 @@
+"""Lookup cache tests"""
+
+from unittest import TestCase
+from ..tools import EdiLookupCache
+
+
+class FakeCursor(object):
+    """Minimal database cursor supporting sequences and event handlers"""
+
+    dbname = 'db'
+
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self.handlers = {'commit': [], 'rollback': []}
+        self.rows = None
+
+    def execute(self, query):
+        """Execute sequence query"""
+        if query.startswith('SELECT nextval'):
+            self.sequence[0] += 1
+        self.rows = [(self.sequence[0],)]
+
+    def fetchall(self):
+        """Fetch sequence value"""
+        return self.rows
+
+    def after(self, event, func):
+        """Register event handler"""
+        self.handlers[event].append(func)
+
+    def end(self, event):
+        """End transaction"""
+        handlers = self.handlers
+        self.handlers = {'commit': [], 'rollback': []}
+        for func in handlers[event]:
+            func()
+
+
+class TestLookupCache(TestCase):
+    """Lookup cache tests"""
+
+    def test01_basic(self):
+        """Check basic functionality"""
+        cache = EdiLookupCache()
+        key = ('db', 1, 'product.product', 'default_code', '[]', 'X')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, 42)
+        self.assertEqual(cache.get(key), 42)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test02_evict(self):
+        """Check least recently used entries are evicted"""
+        cache = EdiLookupCache(size=2)
+        keys = [('db', 1, 'res.partner', 'ref', '[]', x) for x in 'ABC']
+        cache.put(keys[0], 1)
+        cache.put(keys[1], 2)
+        self.assertEqual(cache.get(keys[0]), 1)
+        cache.put(keys[2], 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(keys[0]), 1)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[2]), 3)
+
+    def test03_invalidate(self):
+        """Check invalidation by model and by database"""
+        cache = EdiLookupCache()
+        product = ('db', 1, 'product.product', 'default_code', '[]', 'X')
+        partner = ('db', 2, 'res.partner', 'ref', '[]', 'Y')
+        other = ('other', 1, 'res.partner', 'ref', '[]', 'Y')
+        cache.put(product, 1)
+        cache.put(partner, 2)
+        cache.put(other, 3)
+        cache.invalidate('db', 'res.partner')
+        self.assertEqual(cache.get(product), 1)
+        self.assertIsNone(cache.get(partner))
+        self.assertEqual(cache.get(other), 3)
+        cache.clear('db')
+        self.assertIsNone(cache.get(product))
+        self.assertEqual(cache.get(other), 3)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test04_signal(self):
+        """Check invalidation is signalled to other processes"""
+        sequence = [1]
+        local = EdiLookupCache()
+        remote = EdiLookupCache()
+        local_cr = FakeCursor(sequence)
+        remote_cr = FakeCursor(sequence)
+        key = ('db', 1, 'res.partner', 'ref', '[]', 'X')
+        local.check(local_cr)
+        remote.check(remote_cr)
+        local.put(key, 1)
+        remote.put(key, 2)
+        local.signal(local_cr)
+        local.signal(local_cr)
+        remote.check(remote_cr)
+        self.assertEqual(remote.get(key), 2)
+        local_cr.end('commit')
+        self.assertEqual(sequence, [2])
+        local.check(local_cr)
+        self.assertEqual(local.get(key), 1)
+        remote.check(remote_cr)
+        self.assertIsNone(remote.get(key))
+        local.signal(local_cr)
+        local_cr.end('rollback')
+        self.assertEqual(sequence, [2])
+
+    def test05_rollback(self):
+        """Check entries are published only when committed"""
+        cache = EdiLookupCache()
+        cr = FakeCursor([1])
+        other_cr = FakeCursor([1])
+        committed = ('db', 1, 'res.partner', 'ref', '[]', 'X')
+        rolled_back = ('db', 1, 'res.partner', 'ref', '[]', 'Y')
+        cache.put(committed, 1, cr=cr)
+        self.assertEqual(cache.get(committed, cr=cr), 1)
+        self.assertIsNone(cache.get(committed, cr=other_cr))
+        self.assertIsNone(cache.get(committed))
+        cr.end('commit')
+        self.assertEqual(cache.get(committed), 1)
+        self.assertEqual(cache.get(committed, cr=other_cr), 1)
+        cache.put(rolled_back, 2, cr=cr)
+        self.assertEqual(cache.get(rolled_back, cr=cr), 2)
+        cr.end('rollback')
+        self.assertIsNone(cache.get(rolled_back, cr=cr))
+        self.assertEqual(cache.get(committed), 1)
+        cr.end('commit')
+        self.assertIsNone(cache.get(rolled_back))
+
+    def test06_modified(self):
+        """Check entries are not buffered for modified target models"""
+        cache = EdiLookupCache()
+        cr = FakeCursor([1])
+        partner = ('db', 1, 'res.partner', 'ref', '[]', 'X')
+        product = ('db', 1, 'product.product', 'default_code', '[]', 'X')
+        cache.put(partner, 1, cr=cr)
+        cache.put(product, 2, cr=cr)
+        cache.invalidate('db', 'res.partner', cr=cr)
+        self.assertIsNone(cache.get(partner, cr=cr))
+        cache.put(partner, 3, cr=cr)
+        self.assertIsNone(cache.get(partner, cr=cr))
+        self.assertEqual(cache.get(product, cr=cr), 2)
+        cr.end('commit')
+        self.assertIsNone(cache.get(partner))
+        self.assertEqual(cache.get(product), 2)
+        cache.put(partner, 4, cr=cr)
+        cr.end('commit')
+        self.assertEqual(cache.get(partner), 4)
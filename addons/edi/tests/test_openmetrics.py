@@ -0,0 +1,46 @@
+"""OpenMetrics exporter tests"""
+
+from .common import EdiCase
+from ..tools import EdiOpenMetrics
+
+
+class TestOpenMetrics(EdiCase):
+    """OpenMetrics exporter tests"""
+
+    def test01_writer(self):
+        """Check exposition format"""
+        out = EdiOpenMetrics()
+        out.family('edi_things', 'counter', "Things")
+        out.sample(3, model='a"b\\c')
+        out.family('edi_widgets', 'gauge', "Widgets")
+        out.sample(None)
+        self.assertEqual(str(out).splitlines(), [
+            '# TYPE edi_things counter',
+            '# HELP edi_things Things',
+            'edi_things_total{model="a\\"b\\\\c"} 3.0',
+            '# TYPE edi_widgets gauge',
+            '# HELP edi_widgets Widgets',
+            'edi_widgets 0.0',
+            '# EOF',
+        ])
+
+    def test02_export(self):
+        """Check exported metrics"""
+        EdiDocument = self.env['edi.document']
+        self.create_document(self.doc_type_unknown)
+        count = EdiDocument.search_count([
+            ('doc_type_id', '=', self.doc_type_unknown.id),
+            ('state', '=', 'draft'),
+        ])
+        text = self.env['edi.openmetrics'].export()
+        lines = text.splitlines()
+        self.assertTrue(text.endswith('# EOF\n'))
+        self.assertIn('edi_metrics_window_seconds 3600.0', lines)
+        self.assertIn('edi_backlog_documents{state="draft",type="%s"} %s' % (
+            self.doc_type_unknown.name, float(count)
+        ), lines)
+        self.assertFalse([x for x in lines if 'state="done"' in x])
+        for family in ('edi_recent_documents', 'edi_recent_records',
+                       'edi_elided_ratio', 'edi_recent_transfers',
+                       'edi_recent_transfer_bytes', 'edi_open_issues'):
+            self.assertIn('# TYPE %s gauge' % family, text)
@@ -1,6 +1,11 @@
 """EDI partner tutorial tests"""
 
+import base64
+from unittest.mock import patch
+from odoo.tools import config
 from .common import EdiCase
+from ..models import edi_precache_path
+from ..tools import EdiSampler
 
 
 class TestPartnerTutorial(EdiCase):
@@ -81,3 +86,303 @@ class TestPartnerTutorial(EdiCase):
         self.assertEqual(partners_by_ref['B'].email, 'bob@example.com')
         self.assertEqual(partners_by_ref['E'].title.name, 'Ms')
         self.assertFalse(partners_by_ref['U'].title)
+
+    def backdate(self, records):
+        """Backdate records as though modified by an earlier transaction
+
+        Any fingerprints of the records are updated to match the new
+        row versions.
+        """
+        self.env.cr.execute(
+            'UPDATE "%s" SET write_date = write_date - interval \'1 hour\' '
+            'WHERE id IN %%s' % records._table, (tuple(records.ids),)
+        )
+        self.env.cr.execute(
+            'UPDATE edi_sync_fingerprint f SET version = t.xmin::text '
+            'FROM "%s" t WHERE t.id = f.target_id AND t.id IN %%s'
+            % records._table, (tuple(records.ids),)
+        )
+
+    def test05_fingerprint(self):
+        """Identical document elided using content fingerprints"""
+        EdiPartnerTutorialRecord = self.env['edi.partner.tutorial.record']
+        Fingerprint = self.env['edi.sync.fingerprint']
+        with patch.object(EdiPartnerTutorialRecord.__class__,
+                          '_edi_sync_fingerprint', True):
+            doc1 = self.create_tutorial('friends.csv')
+            self.assertTrue(doc1.action_execute())
+            fingerprints = Fingerprint.search([
+                ('model', '=', EdiPartnerTutorialRecord._name),
+            ])
+            self.assertEqual(len(fingerprints), 4)
+            keys = fingerprints.mapped('key')
+            self.assertEqual(
+                Fingerprint.lookup(EdiPartnerTutorialRecord, keys), {}
+            )
+            self.backdate(doc1.mapped('partner_tutorial_ids.partner_id'))
+            self.assertEqual(
+                len(Fingerprint.lookup(EdiPartnerTutorialRecord, keys)), 4
+            )
+            doc2 = self.create_tutorial('friends.csv')
+            self.assertTrue(doc2.action_execute())
+            self.assertEqual(len(doc2.partner_tutorial_ids), 0)
+
+    def test06_fingerprint_stale(self):
+        """Modified target records are not elided using fingerprints"""
+        EdiPartnerTutorialRecord = self.env['edi.partner.tutorial.record']
+        Fingerprint = self.env['edi.sync.fingerprint']
+        with patch.object(EdiPartnerTutorialRecord.__class__,
+                          '_edi_sync_fingerprint', True):
+            doc1 = self.create_tutorial('friends.csv')
+            self.assertTrue(doc1.action_execute())
+            partners = doc1.mapped('partner_tutorial_ids.partner_id')
+            self.backdate(partners)
+            # Modify a target record after its fingerprint was recorded
+            partners.filtered(lambda x: x.ref == 'E').email = 'eve@example.org'
+            fingerprints = Fingerprint.lookup(EdiPartnerTutorialRecord,
+                                              partners.mapped('ref'))
+            self.assertEqual(sorted(fingerprints), ['A', 'B', 'U'])
+            # Modify a target record in a separate (sub)transaction
+            # without updating its write date
+            with self.env.cr.savepoint():
+                self.env.cr.execute(
+                    "UPDATE res_partner SET email = 'bob@example.org' "
+                    "WHERE id = %s",
+                    (partners.filtered(lambda x: x.ref == 'B').id,)
+                )
+            partners.invalidate_cache()
+            fingerprints = Fingerprint.lookup(EdiPartnerTutorialRecord,
+                                              partners.mapped('ref'))
+            self.assertEqual(sorted(fingerprints), ['A', 'U'])
+            doc2 = self.create_tutorial('friends.csv')
+            self.assertTrue(doc2.action_execute())
+            partners = doc2.mapped('partner_tutorial_ids.partner_id')
+            self.assertEqual(sorted(partners.mapped('ref')), ['B', 'E'])
+            self.assertEqual(sorted(partners.mapped('email')),
+                             ['bob@example.com', 'eve@example.com'])
+
+    def test07_snapshot(self):
+        """Columnar snapshot of target records"""
+        EdiPartnerTutorialRecord = self.env['edi.partner.tutorial.record']
+        doc = self.create_tutorial('friends.csv')
+        self.assertTrue(doc.action_execute())
+        alice = doc.partner_tutorial_ids.filtered(lambda x: x.name == 'A')
+        vlist = [{'name': 'A'}, {'name': 'NOBODY'}]
+        (columns, rows) = EdiPartnerTutorialRecord.targets_snapshot(
+            vlist, {'name', 'email'}
+        )
+        self.assertEqual(columns, ('email', 'name'))
+        self.assertEqual(rows, {
+            'A': (alice.partner_id.id, alice.partner_id.email, 'Alice'),
+        })
+        self.assertIsNone(EdiPartnerTutorialRecord.targets_snapshot(
+            vlist, {'name', 'display_name', 'category_id'}
+        ))
+
+    def test08_chunked(self):
+        """Chunked execution resumed from checkpoint"""
+        EdiPartnerTutorialRecord = self.env['edi.partner.tutorial.record']
+        self.doc_type_tutorial.chunked = True
+        doc = self.create_tutorial('friends.csv')
+        self.assertTrue(doc.action_prepare())
+        execute = EdiPartnerTutorialRecord.__class__.execute
+
+        def fail(recs):
+            """Fail to execute a specific record"""
+            if 'E' in recs.mapped('name'):
+                raise ValueError("Eve is not welcome here")
+            return execute(recs)
+
+        with patch.object(EdiPartnerTutorialRecord.__class__,
+                          'BATCH_SIZE', 1):
+            with patch.object(EdiPartnerTutorialRecord.__class__, 'execute',
+                              autospec=True, side_effect=fail):
+                with self.assertRaisesIssue(doc, ValueError):
+                    doc.action_execute()
+            self.assertEqual(doc.state, 'part')
+            recs = doc.partner_tutorial_ids.sorted('id')
+            self.assertEqual(doc.checkpoint_rec_id, recs[1].id)
+            self.assertEqual(len(recs.mapped('partner_id')), 2)
+            self.assertTrue(doc.action_execute())
+        self.assertEqual(doc.state, 'done')
+        self.assertFalse(doc.checkpoint_rec_type_id)
+        self.assertEqual(len(doc.mapped('partner_tutorial_ids.partner_id')), 4)
+
+    def test09_tuning(self):
+        """Automatically tuned batch sizes"""
+        EdiBatchTuning = self.env['edi.batch.tuning']
+        options = {'batch_tuning': True, 'batch_min': 1, 'batch_max': 2}
+        with patch.dict(config.misc, {'edi': options}):
+            doc = self.create_tutorial('friends.csv')
+            self.assertTrue(doc.action_execute())
+        self.assertEqual(len(doc.mapped('partner_tutorial_ids.partner_id')), 4)
+        tuned = EdiBatchTuning.search([
+            ('name', '=', 'edi.partner.tutorial.record'),
+        ])
+        self.assertTrue({'BATCH_PREPARE', 'BATCH_ELIDE', 'BATCH_CREATE'} <=
+                        set(tuned.mapped('operation')))
+        self.assertTrue(all(1 <= x.size <= 2 for x in tuned))
+        self.assertTrue(all(x.samples for x in tuned))
+        samples = {x.operation: x.samples for x in tuned}
+        with patch.dict(config.misc, {'edi': options}):
+            doc = self.create_tutorial('friends.csv')
+            self.assertTrue(doc.action_execute())
+        tuned = EdiBatchTuning.search([
+            ('name', '=', 'edi.partner.tutorial.record'),
+            ('operation', '=', 'BATCH_ELIDE'),
+        ])
+        self.assertGreater(tuned.samples, samples['BATCH_ELIDE'])
+
+    def test10_precache_learning(self):
+        """Automatically learned precache paths"""
+        EdiPrecachePath = self.env['edi.precache.path']
+        EdiPartnerTutorialRecord = self.env['edi.partner.tutorial.record']
+        Title = self.env['res.partner.title']
+        Partner = self.env['res.partner']
+        partners = Partner.create({
+            'name': 'Alice',
+            'title': Title.create({'name': 'Dr', 'shortcut': 'Dr'}).id,
+        }) | Partner.create({
+            'name': 'Bob',
+            'title': Title.create({'name': 'Rev', 'shortcut': 'Rv'}).id,
+        })
+        partners.invalidate_cache()
+        with edi_precache_path.EdiPrecacheRecorder(self.env) as recorder:
+            partners[0].with_prefetch().mapped('title.name')
+        EdiPrecachePath.learn(EdiPartnerTutorialRecord, recorder)
+        self.assertFalse(EdiPrecachePath.paths(
+            'edi.partner.tutorial.record', 'target'
+        ))
+        partners.invalidate_cache()
+        with edi_precache_path.EdiPrecacheRecorder(self.env) as recorder:
+            for partner in partners:
+                partner.with_prefetch().mapped('title.name')
+        self.assertEqual(recorder.reads['res_partner_title'], 2)
+        self.assertIn(('res.partner', 'title'), recorder.edges)
+        EdiPrecachePath.learn(EdiPartnerTutorialRecord, recorder)
+        self.assertIn('title.name', EdiPrecachePath.paths(
+            'edi.partner.tutorial.record', 'target'
+        ))
+        EdiPrecachePath.store('edi.partner.tutorial.record', 'target',
+                              'title.name')
+        self.assertEqual(len(EdiPrecachePath.search([
+            ('name', '=', 'edi.partner.tutorial.record'),
+            ('path', '=', 'title.name'),
+        ])), 1)
+        with patch.dict(config.misc, {'edi': {'precache_learning': True}}):
+            doc = self.create_tutorial('friends.csv')
+            self.assertTrue(doc.action_execute())
+        self.assertEqual(len(doc.mapped('partner_tutorial_ids.partner_id')), 4)
+
+    def test11_analyse(self):
+        """Query analysis report"""
+        self.doc_type_tutorial.analyse = True
+        doc = self.create_tutorial('friends.csv')
+        self.assertTrue(doc.action_execute())
+        reports = self.env['ir.attachment'].search([
+            ('res_model', '=', 'edi.document'),
+            ('res_id', '=', doc.id),
+            ('name', '=like', '%.queries.json'),
+        ])
+        self.assertEqual(len(reports), 2)
+
+    def test12_metrics(self):
+        """Performance metrics"""
+        doc = self.create_tutorial('friends.csv')
+        self.assertTrue(doc.action_execute())
+        metrics = doc.metric_ids
+        self.assertTrue({'audit', 'prepare', 'create', 'elide', 'records',
+                         'execute'} <= set(metrics.mapped('phase')))
+        prepare = metrics.filtered(lambda x: x.phase == 'prepare')
+        self.assertEqual(prepare.records_out, doc.record_count())
+        self.assertEqual(prepare.doc_type_id, self.doc_type_tutorial)
+        for elide in metrics.filtered(lambda x: x.phase == 'elide'):
+            self.assertEqual(elide.records_in,
+                             elide.records_out + elide.elided)
+        self.assertTrue(all(x.memory >= 0 for x in metrics))
+
+    def test13_profile(self):
+        """Sampling profiler report"""
+        self.doc_type_tutorial.profile = True
+        doc = self.create_tutorial('friends.csv')
+        with patch.object(EdiSampler, 'INTERVAL', 0.0001):
+            self.assertTrue(doc.action_execute())
+        Attachment = self.env['ir.attachment']
+        domain = [('res_model', '=', 'edi.document'), ('res_id', '=', doc.id)]
+        stacks = Attachment.search(domain + [
+            ('name', '=like', '%.collapsed.txt'),
+        ])
+        reports = Attachment.search(domain + [
+            ('name', '=like', '%.profile.json'),
+        ])
+        self.assertTrue(stacks)
+        self.assertEqual(len(stacks), len(reports))
+        self.assertRegex(base64.b64decode(stacks[0].datas).decode(),
+                         r'^\S+ \d+\n')
+
+    def test14_eviction(self):
+        """Batch-scoped cache eviction and memory tracing"""
+        options = {'batch_tuning': True, 'batch_min': 1, 'batch_max': 2,
+                   'memory_tracing': True}
+        with patch.dict(config.misc, {'edi': options}):
+            doc = self.create_tutorial('friends.csv')
+            self.assertTrue(doc.action_execute())
+        partners = doc.mapped('partner_tutorial_ids.partner_id')
+        self.assertEqual(len(partners), 4)
+        self.assertEqual({x.ref: x.name for x in partners}['B'], 'Bob')
+        doc = self.create_tutorial('friends.csv')
+        with patch.dict(config.misc, {'edi': {'cache_eviction': False}}):
+            self.assertTrue(doc.action_execute())
+        self.assertEqual(len(doc.partner_tutorial_ids), 0)
+
+    def test15_parallel(self):
+        """Parallel execution resumed after failure"""
+        EdiPartnerTutorialRecord = self.env['edi.partner.tutorial.record']
+        self.doc_type_tutorial.parallel = True
+        rec_type = self.doc_type_tutorial.rec_type_ids
+        doc = self.create_tutorial('friends.csv')
+        self.assertTrue(doc.action_prepare())
+        with patch.object(EdiPartnerTutorialRecord.__class__, 'execute',
+                          autospec=True,
+                          side_effect=ValueError("Nobody is welcome here")):
+            with self.assertRaisesIssue(doc, ValueError):
+                doc.action_execute()
+        self.assertEqual(doc.state, 'part')
+        self.assertFalse(doc.executed_rec_type_ids)
+        self.assertFalse(doc.mapped('partner_tutorial_ids.partner_id'))
+        self.assertTrue(doc.action_execute())
+        self.assertEqual(doc.state, 'done')
+        self.assertFalse(doc.executed_rec_type_ids)
+        self.assertEqual(len(doc.mapped('partner_tutorial_ids.partner_id')), 4)
+        doc = self.create_tutorial('friends.csv')
+        self.assertTrue(doc.action_prepare())
+        doc.mark_executed(rec_type)
+        self.assertEqual(doc.executed_rec_type_ids, rec_type)
+        with patch.object(EdiPartnerTutorialRecord.__class__, 'execute',
+                          autospec=True) as execute:
+            self.assertTrue(doc.action_execute())
+        execute.assert_not_called()
+
+    def test16_parallel_threads(self):
+        """Parallel execution in worker threads resumed after failure"""
+        EdiPartnerTutorialRecord = self.env['edi.partner.tutorial.record']
+        rec_type = self.doc_type_tutorial.rec_type_ids
+        doc = self.create_tutorial('friends.csv')
+        self.assertTrue(doc.action_prepare())
+        self.assertEqual(doc.pending_rec_type_waves(), [rec_type])
+        self.registry.enter_test_mode(self.cr)
+        try:
+            with patch.object(EdiPartnerTutorialRecord.__class__, 'execute',
+                              autospec=True,
+                              side_effect=ValueError("Nobody is welcome")):
+                with self.assertRaises(ValueError):
+                    doc.execute_rec_types_parallel(rec_type)
+            self.assertFalse(doc.executed_rec_type_ids)
+            self.assertFalse(doc.mapped('partner_tutorial_ids.partner_id'))
+            self.assertEqual(doc.pending_rec_type_waves(), [rec_type])
+            doc.execute_rec_types_parallel(rec_type)
+        finally:
+            self.registry.leave_test_mode()
+        self.assertEqual(doc.executed_rec_type_ids, rec_type)
+        self.assertEqual(len(doc.mapped('partner_tutorial_ids.partner_id')), 4)
+        self.assertFalse(doc.pending_rec_type_waves())
@@ -0,0 +1,50 @@
+"""Sampling profiler tests"""
+
+import time
+from unittest import TestCase
+from ..tools import EdiSampler
+
+
+def spin(duration):
+    """Consume CPU for a specified duration"""
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        pass
+
+
+class TestSampler(TestCase):
+    """Sampling profiler tests"""
+
+    def test01_sample(self):
+        """Capture samples"""
+        with EdiSampler(interval=0.001) as sampler:
+            spin(0.1)
+        self.assertGreater(sampler.samples, 10)
+        self.assertIsNone(sampler.thread)
+        top = sampler.top(limit=1)
+        self.assertEqual(len(top), 1)
+        self.assertTrue(top[0]['function'].endswith(':spin'))
+        self.assertGreater(top[0]['fraction'], 0.5)
+
+    def test02_collapsed(self):
+        """Generate collapsed call stacks"""
+        with EdiSampler(interval=0.001) as sampler:
+            spin(0.05)
+        lines = sampler.collapsed().splitlines()
+        self.assertTrue(lines)
+        total = 0
+        for line in lines:
+            (stack, _sep, count) = line.rpartition(' ')
+            self.assertIn(':test02_collapsed;', stack)
+            total += int(count)
+        self.assertEqual(total, sampler.samples)
+
+    def test03_restart(self):
+        """Discard samples when restarted"""
+        sampler = EdiSampler(interval=0.001)
+        sampler.start()
+        spin(0.02)
+        sampler.stop()
+        sampler.start()
+        sampler.stop()
+        self.assertLess(sampler.samples, 5)
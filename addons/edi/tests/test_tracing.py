@@ -0,0 +1,65 @@
+"""Query tracing tests"""
+
+from unittest import TestCase
+from ..tools import fingerprint, EdiQueryAnalyser
+
+
+class DummyCursor(object):
+    """Dummy database cursor"""
+
+    def execute(self, query, params=None, log_exceptions=None):
+        """Execute query"""
+        pass
+
+
+class TestTracing(TestCase):
+    """Query tracing tests"""
+
+    def test01_fingerprint(self):
+        """Check query fingerprints"""
+        self.assertEqual(
+            fingerprint("SELECT id FROM  res_partner\n WHERE ref = 'A''s' "
+                        "AND id IN (1, 2, 3) AND x > 4.5"),
+            "SELECT id FROM res_partner WHERE ref = ? AND id IN (...) "
+            "AND x > ?"
+        )
+        self.assertEqual(fingerprint('SELECT * FROM "table2" WHERE id = 7'),
+                         'SELECT * FROM "table2" WHERE id = ?')
+
+    def test02_analyser(self):
+        """Check N+1 query pattern detection"""
+        cr = DummyCursor()
+        with EdiQueryAnalyser(cr) as analyser:
+            for i in range(5):
+                cr.execute('SELECT name FROM res_partner WHERE id = %d' % i)
+            cr.execute('SELECT 1')
+        cr.execute('SELECT 2')
+        self.assertEqual(sum(analyser.counts.values()), 6)
+        report = analyser.report({'res.partner': 5})
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['fingerprint'],
+                         'SELECT name FROM res_partner WHERE id = ?')
+        self.assertEqual(report[0]['count'], 5)
+        self.assertEqual(report[0]['record_type'], 'res.partner')
+        self.assertIn('test_tracing.py', report[0]['site'])
+        self.assertFalse(analyser.report({'res.partner': 6}))
+        self.assertFalse(analyser.report({'res.partner': 0}))
+        self.assertFalse(analyser.report({}))
+
+    def test03_record_types(self):
+        """Check N+1 query pattern detection across record types"""
+        cr = DummyCursor()
+        with EdiQueryAnalyser(cr) as analyser:
+            for i in range(10):
+                cr.execute('SELECT name FROM res_partner WHERE id = %d' % i)
+            for i in range(3):
+                cr.execute('SELECT name FROM res_users WHERE id = %d' % i)
+            cr.execute('SELECT 1')
+        report = analyser.report({'partner': 10, 'title': 3, 'other': 1})
+        self.assertEqual([(x['record_type'], x['count'], x['per_record'])
+                          for x in report],
+                         [('partner', 10, 1.0), ('title', 3, 1.0)])
+        report = analyser.report({'partner': 100, 'title': 3})
+        self.assertEqual([(x['record_type'], x['count']) for x in report],
+                         [('title', 10), ('title', 3)])
+        self.assertEqual(len(analyser.report({'partner': 2}, limit=1)), 1)
@@ -0,0 +1,47 @@
+"""Batch size tuning tests"""
+
+from unittest import TestCase
+from ..tools import EdiBatchTuner
+
+
+class TestBatchTuner(TestCase):
+    """Batch size tuning tests"""
+
+    def test01_grow(self):
+        """Check batch size grows while time per record improves"""
+        tuner = EdiBatchTuner(minimum=10, maximum=100)
+        key = ('db', 'edi.record', 'BATCH_SIZE')
+        self.assertEqual(tuner.size(key, 1000), 100)
+        self.assertEqual(tuner.size(('db', 'x', 'BATCH_SIZE'), 20), 20)
+        tuner.clear()
+        self.assertEqual(tuner.size(key, 20), 20)
+        self.assertEqual(tuner.record(key, 20, 20, 2.0, 40, 0), 30)
+        self.assertEqual(tuner.record(key, 30, 30, 2.4, 60, 0), 45)
+        self.assertEqual(tuner.record(key, 45, 45, 2.7, 90, 0), 68)
+        self.assertEqual(tuner.queries[key], 2)
+
+    def test02_reverse(self):
+        """Check batch size shrinks when time per record worsens"""
+        tuner = EdiBatchTuner(minimum=10, maximum=100)
+        key = ('db', 'edi.record', 'BATCH_SIZE')
+        tuner.size(key, 20)
+        self.assertEqual(tuner.record(key, 20, 20, 2.0, 20, 0), 30)
+        self.assertEqual(tuner.record(key, 30, 30, 6.0, 30, 0), 20)
+        self.assertEqual(tuner.record(key, 20, 20, 1.0, 20, 0), 13)
+
+    def test03_partial(self):
+        """Check incomplete batches are ignored"""
+        tuner = EdiBatchTuner()
+        key = ('db', 'edi.record', 'BATCH_SIZE')
+        tuner.size(key, 100)
+        self.assertEqual(tuner.record(key, 100, 7, 1.0, 7, 0), 100)
+        self.assertFalse(tuner.flush())
+
+    def test04_memory(self):
+        """Check batch size shrinks when memory limit is exceeded"""
+        tuner = EdiBatchTuner(memory=1024)
+        key = ('db', 'edi.record', 'BATCH_SIZE')
+        tuner.size(key, 300)
+        self.assertEqual(tuner.record(key, 300, 300, 1.0, 300, 4096), 200)
+        self.assertEqual(tuner.flush(), {key: 1})
+        self.assertFalse(tuner.flush())
@@ -1,7 +1,16 @@
 """Helper tools for EDI"""
 
+from .benchmark import EdiBenchmark
+from .bulk import EdiBulkCreator
 from .comparators import Comparator
+from .dedupe import EdiDigestSet
+from .eviction import EdiCacheEvictor
 from .iterators import batched, ranged, sliced, NoRecordValuesError
+from .lookup import lookup_cache, EdiLookupCache
+from .openmetrics import EdiOpenMetrics
+from .profiling import EdiSampler
 from .sap import sap_idoc_type, SapIDoc
 from .statistics import EdiStatistics
-from .tracing import EdiTracer
+from .tracing import (fingerprint, EdiTracer, EdiQueryAnalyser,
+                      EdiQueryRecorder)
+from .tuning import batch_tuner, EdiBatchTuner
@@ -0,0 +1,190 @@
+"""Synthetic benchmarks for EDI"""
+
+import base64
+import random
+import re
+from odoo.exceptions import UserError
+from odoo.tools.translate import _
+
+SCALE = re.compile(r'^(?P<value>\d+)(?P<unit>[kKmM]?)$')
+"""Regular expression matching a benchmark scale (e.g. ``100k``)"""
+
+SCALE_UNITS = {'': 1, 'k': 1000, 'm': 1000000}
+"""Benchmark scale unit multipliers"""
+
+METRICS = {
+    'records_per_second': -1,
+    'queries_per_record': 1,
+    'memory_growth': 1,
+    'peak_memory': 1,
+}
+"""Benchmark metrics checked for regressions
+
+Each metric is mapped to the direction in which it regresses: ``1``
+if a larger value is worse, ``-1`` if a smaller value is worse.
+"""
+
+
+def parse_scale(text):
+    """Parse a benchmark scale (e.g. ``1k``, ``100k``, or ``1M``)"""
+    m = SCALE.match(text.strip())
+    if not m:
+        raise ValueError("Invalid scale '%s'" % text)
+    return int(m.group('value')) * SCALE_UNITS[m.group('unit').lower()]
+
+
+def regressions(baseline, results, threshold):
+    """Find benchmark results that have regressed against a baseline
+
+    Both ``baseline`` and ``results`` are nested dictionaries mapping
+    benchmark name, scale, and phase to a dictionary of metrics (as
+    returned by :meth:`~.EdiBenchmark.run`).  A metric has regressed
+    if it is worse than the baseline by more than the relative
+    ``threshold`` (e.g. ``0.2`` for 20%).  Results with no
+    corresponding baseline are ignored.
+
+    Yields ``(name, scale, phase, metric, old, new)`` tuples.
+    """
+    for name, scales in sorted(results.items()):
+        for scale, phases in sorted(scales.items()):
+            for phase, metrics in sorted(phases.items()):
+                old_metrics = baseline.get(name, {}).get(scale, {}).get(phase)
+                if not old_metrics:
+                    continue
+                for metric, sign in sorted(METRICS.items()):
+                    old = old_metrics.get(metric)
+                    new = metrics.get(metric)
+                    if not old or new is None:
+                        continue
+                    if sign * (new - old) / old > threshold:
+                        yield (name, scale, phase, metric, old, new)
+
+
+class EdiBenchmark(object):
+    """Synthetic EDI benchmark
+
+    A benchmark creates a synthetic document of a single document
+    type at a configurable scale (the approximate number of generated
+    rows), using a pseudo-random number generator seeded from the
+    benchmark name, scale, and seed so that repeated runs generate
+    identical data.  The document is then prepared and executed,
+    capturing the elapsed time, query count, and growth in process
+    peak memory usage for each phase separately.
+
+    Since the process peak memory usage never decreases, its growth
+    during the execution phase will underestimate the memory used if
+    the preparation phase used more.  If ``trace_memory`` is enabled,
+    then the peak memory allocated by Python during each phase is
+    also captured using :mod:`tracemalloc`.  This is measured
+    independently for each phase, but slows down execution
+    considerably and so distorts the other metrics.
+
+    Document types using chunked or parallel execution will commit
+    intermediate changes, which cannot subsequently be rolled back.
+
+    Subclasses must define :attr:`~.name` and :attr:`~.doc_type`, and
+    will usually override :meth:`~.setup` to create any required
+    master data and :meth:`~.inputs` to generate input attachments.
+    Master data creation is not included in the measurements.
+    """
+
+    name = None
+    """Benchmark name"""
+
+    doc_type = None
+    """Document type XML ID"""
+
+    def __init__(self, env, scale, seed=0, trace_memory=False):
+        self.env = env
+        self.scale = scale
+        self.trace_memory = trace_memory
+        self.random = random.Random('%s:%d:%d' % (self.name, scale, seed))
+
+    @classmethod
+    def benchmarks(cls):
+        """Get all defined benchmarks, indexed by name"""
+        benchmarks = {}
+        subclasses = [cls]
+        while subclasses:
+            subclass = subclasses.pop()
+            subclasses.extend(subclass.__subclasses__())
+            if subclass.name:
+                benchmarks[subclass.name] = subclass
+        return benchmarks
+
+    @staticmethod
+    def codes(prefix, count):
+        """Generate a list of unique fixed-width codes"""
+        width = len(str(count))
+        return ['%s%0*d' % (prefix, width, i) for i in range(count)]
+
+    def word(self, length=8):
+        """Generate a random capitalised word"""
+        return ''.join(self.random.choice('abcdefghijklmnopqrstuvwxyz')
+                       for _i in range(length)).capitalize()
+
+    def setup(self):
+        """Create master data"""
+        pass
+
+    def inputs(self):
+        """Generate input attachments
+
+        Yields ``(filename, data)`` tuples.
+        """
+        return iter(())
+
+    def document(self):
+        """Create benchmark document"""
+        IrAttachment = self.env['ir.attachment']
+        EdiDocument = self.env['edi.document']
+        doc = EdiDocument.create({
+            'doc_type_id': self.env.ref(self.doc_type).id,
+        })
+        for fname, data in self.inputs():
+            IrAttachment.create({
+                'name': fname,
+                'datas_fname': fname,
+                'datas': base64.b64encode(data),
+                'res_model': 'edi.document',
+                'res_field': 'input_ids',
+                'res_id': doc.id,
+            })
+        return doc
+
+    def metrics(self, stats, records):
+        """Construct result metrics for a single phase"""
+        metrics = {
+            'records': records,
+            'elapsed': stats.elapsed,
+            'queries': stats.count,
+            'records_per_second': (records / stats.elapsed
+                                   if stats.elapsed else 0),
+            'queries_per_record': (stats.count / records if records else 0),
+            'memory_growth': stats.memory,
+        }
+        if self.trace_memory:
+            metrics['peak_memory'] = stats.peak
+        return metrics
+
+    def run(self):
+        """Run benchmark
+
+        Returns a dictionary mapping each phase (``prepare`` and
+        ``execute``) to a dictionary of metrics.
+        """
+        self.setup()
+        doc = self.document()
+        self.env.invalidate_all()
+        results = {}
+        for phase, action in (('prepare', doc.action_prepare),
+                              ('execute', doc.action_execute)):
+            with doc.statistics(trace_memory=self.trace_memory) as stats:
+                ok = action()
+            if not ok:
+                raise UserError(_("Benchmark %s failed to %s: %s") % (
+                    self.name, phase,
+                    ", ".join(doc.issue_ids.mapped('name'))
+                ))
+            results[phase] = self.metrics(stats, doc.record_count())
+        return results
@@ -0,0 +1,340 @@
+"""Bulk record creation for EDI"""
+
+from collections import defaultdict
+import io
+from odoo.models import LOG_ACCESS_COLUMNS
+
+MAGIC_COLUMN_SQL = "(now() at time zone 'UTC')"
+"""SQL expression used for ``create_date`` and ``write_date``"""
+
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+"""Character escapes for the PostgreSQL ``COPY`` text format"""
+
+
+def copy_value(value):
+    """Convert a column value to the PostgreSQL ``COPY`` text format"""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return str(value).translate(COPY_ESCAPES)
+
+
+class EdiCopyStream(io.RawIOBase):
+    """Readable stream of rows in the PostgreSQL ``COPY`` text format
+
+    The rows are encoded lazily as the stream is read, to avoid
+    constructing the complete ``COPY`` input in memory.
+    """
+
+    def __init__(self, rows):
+        super().__init__()
+        self.lines = (
+            ('\t'.join(copy_value(x) for x in row) + '\n').encode()
+            for row in rows
+        )
+        self.buf = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while len(self.buf) < len(b):
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buf += line
+        size = min(len(b), len(self.buf))
+        b[:size] = self.buf[:size]
+        self.buf = self.buf[size:]
+        return size
+
+
+class EdiBulkCreator(object):
+    """Bulk record creator
+
+    A bulk record creator inserts a list of value dictionaries using
+    a single multi-row ``INSERT`` statement, bypassing the per-record
+    overhead of :meth:`~odoo.models.Model.create`.
+
+    Missing default values are calculated only once for each distinct
+    set of value dictionary keys, in the same way as
+    :meth:`edi.record.add_edi_defaults`.  Recomputation triggers,
+    constraint checks and access rule checks are performed once for
+    the whole batch.
+
+    Records may alternatively be loaded using ``COPY FROM STDIN`` via
+    :meth:`~.copy`.  This bypasses constraint checks and recomputation
+    triggers entirely, and is therefore suitable only for models that
+    do not rely on any create-time side effects.
+
+    Parent records for models using ``_inherits`` are created in bulk
+    in the same way, before the records themselves.
+
+    Any value dictionaries that cannot be represented as a plain
+    ``INSERT`` (e.g. those providing values for ``One2many`` or
+    ``Many2many`` fields) are passed to
+    :meth:`~odoo.models.Model.create` as normal.  Models with a parent
+    store are always created via :meth:`~odoo.models.Model.create`.
+
+    Note that bulk creation bypasses any override of
+    :meth:`~odoo.models.Model.create` within the model.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.defaults = {}
+        self.count = 0
+        self.parents = {
+            parent: type(self)(model.env[parent])
+            for parent in model._inherits
+        }
+
+    @property
+    def enabled(self):
+        """Bulk creation is possible for this model"""
+        Model = self.model
+        return not Model._parent_store and all(
+            x.enabled for x in self.parents.values()
+        )
+
+    def add_defaults(self, vals):
+        """Add missing default values to a value dictionary"""
+        keys = frozenset(vals)
+        defaults = self.defaults.get(keys)
+        if defaults is None:
+            defaults = {
+                k: v for k, v in
+                self.model._add_missing_default_values(vals).items()
+                if k not in vals
+            }
+            self.defaults[keys] = defaults
+        return dict(defaults, **vals)
+
+    def is_column(self, name):
+        """Check if field may be written directly as a database column"""
+        field = self.model._fields.get(name)
+        if field is None or not field.store or not field.column_type:
+            return False
+        if field.inverse or field.inherited or name in LOG_ACCESS_COLUMNS:
+            return False
+        if field.translate and (self.model.env.lang or 'en_US') != 'en_US':
+            return False
+        return True
+
+    def insert(self, vlist):
+        """Insert value dictionaries using a single ``INSERT`` statement
+
+        All value dictionaries must contain the same keys, must
+        already include any default values, and must contain only
+        column fields.  Returns the list of new record IDs in the
+        order of ``vlist``.
+        """
+        Model = self.model
+        names = sorted(vlist[0])
+        fmts = [Model._fields[k].column_format for k in names]
+        columns = ['"%s"' % k for k in names]
+        magic = ()
+        if Model._log_access:
+            columns += ['"%s"' % k for k in LOG_ACCESS_COLUMNS]
+            magic = (Model._uid, Model._uid)
+            fmts += ['%s', MAGIC_COLUMN_SQL, '%s', MAGIC_COLUMN_SQL]
+        row = '(%s)' % ', '.join(fmts)
+        params = []
+        for vals in vlist:
+            params.extend(
+                Model._fields[k].convert_to_column(vals[k], Model, vals)
+                for k in names
+            )
+            params.extend(magic)
+        Model.env.cr.execute(
+            'INSERT INTO "%s" (%s) VALUES %s RETURNING id' % (
+                Model._table, ', '.join(columns),
+                ', '.join([row] * len(vlist))
+            ),
+            params,
+        )
+        self.count += 1
+        Model._invalidate_edi_lookups()
+        return [x[0] for x in Model.env.cr.fetchall()]
+
+    def copy(self, vlist):
+        """Load value dictionaries using ``COPY FROM STDIN``
+
+        All value dictionaries must contain the same keys, must
+        already include any default values, and must contain only
+        column fields.  No record IDs are returned.
+        """
+        Model = self.model
+        cr = Model.env.cr
+        names = sorted(vlist[0])
+        columns = ['"%s"' % k for k in names]
+        magic = ()
+        if Model._log_access:
+            cr.execute("SELECT %s" % MAGIC_COLUMN_SQL)
+            [(now,)] = cr.fetchall()
+            columns += ['"%s"' % k for k in LOG_ACCESS_COLUMNS]
+            magic = (Model._uid, now, Model._uid, now)
+        rows = (
+            [Model._fields[k].convert_to_column(vals[k], Model, vals)
+             for k in names] + list(magic)
+            for vals in vlist
+        )
+        cr.copy_expert('COPY "%s" (%s) FROM STDIN' % (
+            Model._table, ', '.join(columns)
+        ), EdiCopyStream(rows))
+        self.count += 1
+        Model._invalidate_edi_lookups()
+
+    def load(self, vlist):
+        """Load records using ``COPY FROM STDIN``
+
+        Accepts a list of value dictionaries that could each be passed
+        to :meth:`~odoo.models.Model.create`.  Any value dictionaries
+        that cannot be represented as a plain ``COPY`` row are passed
+        to :meth:`~.create` instead.
+
+        The ORM cache is not updated: the caller must call
+        :meth:`~.invalidate` once all records have been loaded.
+        """
+        Model = self.model
+        if not vlist:
+            return
+        if not self.enabled or Model._inherits:
+            self.create(vlist)
+            return
+        Model.check_access_rights('create')
+        keysets = defaultdict(list)
+        others = []
+        for vals in vlist:
+            full = self.add_defaults(vals)
+            if all(self.is_column(k) for k in full):
+                keysets[frozenset(full)].append(full)
+            else:
+                others.append(vals)
+        for full_vlist in keysets.values():
+            self.copy(full_vlist)
+        self.create(others)
+
+    def invalidate(self):
+        """Invalidate ORM cache after loading records"""
+        Model = self.model
+        Model.env.invalidate([
+            (invf, None)
+            for field in Model._fields.values()
+            for invf in Model._field_inverses[field]
+        ])
+
+    def prepare(self, vals):
+        """Prepare value dictionary for bulk insertion
+
+        Returns a ``(full, parents)`` tuple, where ``full`` is the
+        value dictionary (including any default values) for the
+        model's own columns, and ``parents`` is a dictionary mapping
+        each ``_inherits`` parent model to its own prepared tuple.
+
+        Returns ``None`` if the value dictionary requires a full
+        :meth:`~odoo.models.Model.create`.
+        """
+        Model = self.model
+        full = self.add_defaults(vals)
+        inherited = {parent: {} for parent in Model._inherits}
+        for k in list(full):
+            field = Model._fields.get(k)
+            if field is not None and field.inherited:
+                inherited[field.related_field.model_name][k] = full.pop(k)
+        if not all(self.is_column(k) for k in full):
+            return None
+        if any(via in full for via in Model._inherits.values()):
+            return None
+        parents = {}
+        for parent, parent_vals in inherited.items():
+            parents[parent] = self.parents[parent].prepare(parent_vals)
+            if parents[parent] is None:
+                return None
+        return (full, parents)
+
+    def insert_prepared(self, prepared):
+        """Insert prepared value dictionaries
+
+        Returns the list of new record IDs in the order of
+        ``prepared``.
+        """
+        Model = self.model
+        Model.check_access_rights('create')
+
+        # Create parent records
+        for parent, via in Model._inherits.items():
+            creator = self.parents[parent]
+            statements = creator.count
+            parent_ids = creator.insert_prepared(
+                [x[1][parent] for x in prepared]
+            )
+            self.count += (creator.count - statements)
+            for (full, _parents), parent_id in zip(prepared, parent_ids):
+                full[via] = parent_id
+
+        # Insert records with one statement per key set
+        ids = [None] * len(prepared)
+        keysets = defaultdict(list)
+        for i, (full, _parents) in enumerate(prepared):
+            keysets[frozenset(full)].append(i)
+        for indices in keysets.values():
+            new_ids = self.insert([prepared[i][0] for i in indices])
+            for i, new_id in zip(indices, new_ids):
+                ids[i] = new_id
+
+        # Trigger recomputation and check constraints once per batch
+        records = Model.browse(ids)
+        fnames = set(k for keys in keysets for k in keys)
+        Model.env.invalidate([
+            (invf, None)
+            for k in fnames
+            for invf in Model._field_inverses[Model._fields[k]]
+        ])
+        records.modified(Model._fields)
+        records._validate_fields(fnames)
+        records.check_access_rule('create')
+        return ids
+
+    def create(self, vlist):
+        """Create records
+
+        Accepts a list of value dictionaries that could each be passed
+        to :meth:`~odoo.models.Model.create`, and returns the created
+        records in the order of ``vlist``.
+        """
+        Model = self.model
+        if not vlist:
+            return Model.browse()
+        if not self.enabled:
+            return Model.browse([Model.create(vals).id for vals in vlist])
+
+        # Separate value dictionaries that require a full create()
+        prepared = [self.prepare(vals) for vals in vlist]
+        bulk = [i for i, x in enumerate(prepared) if x is not None]
+        ids = [None] * len(vlist)
+
+        # Insert plain value dictionaries
+        if bulk:
+            new_ids = self.insert_prepared([prepared[i] for i in bulk])
+            for i, new_id in zip(bulk, new_ids):
+                ids[i] = new_id
+
+        # Create any remaining records individually
+        for i, vals in enumerate(vlist):
+            if ids[i] is None:
+                ids[i] = Model.create(vals).id
+                self.count += 1
+
+        return Model.browse(ids)
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, self.model._name)
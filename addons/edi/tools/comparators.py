@@ -1,9 +1,16 @@
 """Comparator helpers for EDI"""
 
-from collections import UserDict
+from collections import OrderedDict, UserDict
+import threading
 from odoo import fields, models
 from odoo.tools import float_compare
 
+PLAN_CACHE_SIZE = 1000
+"""Maximum number of compiled comparison plans cached per registry"""
+
+PLAN_CACHE_LOCK = threading.Lock()
+"""Lock protecting compiled comparison plan caches"""
+
 
 class Comparator(UserDict):
     """Mapping that produces a comparator function for each field of a model
@@ -15,11 +22,16 @@ class Comparator(UserDict):
 
     Comparator functions are produced on demand and cached within the
     mapping.
+
+    A whole-record comparison function for a given set of fields may
+    be obtained using :meth:`~.plan`, or using :meth:`~.snapshot_plan`
+    for rows of raw database column values.
     """
 
     def __init__(self, model):
         super().__init__()
         self.model = model
+        self.resolved = {}
 
     def __missing__(self, key):
         field = self.model._fields[key]
@@ -37,3 +49,157 @@ class Comparator(UserDict):
             (_precision, scale) = field.digits
             return lambda x, y: float_compare(x, y, precision_digits=scale) == 0
         return lambda x, y: (not x and not y) or (x == y)
+
+    def column_comparator(self, field):
+        """Construct comparator function for raw database column values
+
+        Returns ``None`` for plain fields.
+        """
+        if isinstance(field, fields.Many2one):
+            return lambda x, y: (
+                (not x and not y and not isinstance(y, models.NewId))
+                or (x == y)
+            )
+        elif isinstance(field, fields.Float) and field.digits:
+            (_precision, scale) = field.digits
+            return lambda x, y: float_compare(x or 0.0, y,
+                                              precision_digits=scale) == 0
+        return None
+
+    @staticmethod
+    def is_plain(field):
+        """Check if field values may be compared directly
+
+        Values of plain fields are considered equal if they are equal
+        or if they are both false, and so may be compared as part of
+        a tuple by mapping all false values to ``None``.
+        """
+        return not (isinstance(field, fields.Many2one) or
+                    (isinstance(field, fields.Float) and field.digits))
+
+    @property
+    def plans(self):
+        """Compiled comparison plans
+
+        Plans are cached within the model registry, since they hold
+        references to field objects that are valid only for the
+        lifetime of the registry.  Plans are keyed on the current
+        floating-point precision of each field (see :meth:`~.digits`),
+        so that a plan is never reused after a precision is changed.
+        The cache is bounded to :data:`~.PLAN_CACHE_SIZE` plans, with
+        the least recently used plans being discarded.
+        """
+        registry = self.model.pool
+        plans = getattr(registry, 'edi_comparator_plans', None)
+        if plans is None:
+            plans = registry.edi_comparator_plans = OrderedDict()
+        return plans
+
+    def digits(self, keys):
+        """Get current floating-point precisions for a set of fields
+
+        The precision of a field may be taken from ``decimal.precision``
+        and so may be changed at any time.
+        """
+        model_fields = self.model._fields
+        return tuple((k, model_fields[k].digits) for k in sorted(keys)
+                     if isinstance(model_fields[k], fields.Float))
+
+    def resolve(self, plankey, keys, compile_plan):
+        """Get compiled plan from registry cache
+
+        The plan is also cached within this comparator, so that the
+        current field precisions are checked only once per set of
+        fields for the lifetime of the comparator.
+        """
+        plan = self.resolved.get(plankey)
+        if plan is None:
+            fullkey = (self.model._name,) + plankey + (self.digits(keys),)
+            plans = self.plans
+            with PLAN_CACHE_LOCK:
+                plan = plans.get(fullkey)
+                if plan is not None:
+                    plans.move_to_end(fullkey)
+            if plan is None:
+                plan = compile_plan(*plankey)
+                with PLAN_CACHE_LOCK:
+                    plans[fullkey] = plan
+                    while len(plans) > PLAN_CACHE_SIZE:
+                        plans.popitem(last=False)
+            self.resolved[plankey] = plan
+        return plan
+
+    def plan(self, keys):
+        """Get compiled comparison function for a set of fields
+
+        The returned function takes a singleton target record and a
+        value dictionary with the specified keys, and returns a
+        boolean indicating whether or not the record matches all of
+        the values.
+
+        Plain field values are read directly from the record cache
+        (where already prefetched) and compared as a single tuple.
+        Only ``Many2one`` fields and fields with a floating-point
+        precision use the per-field comparator functions.
+        """
+        keys = frozenset(keys)
+        return self.resolve((keys,), keys, self.compile)
+
+    def compile(self, keys):
+        """Compile comparison function for a set of fields"""
+        model_fields = self.model._fields
+        plain = tuple(sorted(k for k in keys
+                             if self.is_plain(model_fields[k])))
+        plain_fields = tuple(model_fields[k] for k in plain)
+        special = tuple((k, self.comparator(model_fields[k]))
+                        for k in sorted(keys) if k not in plain)
+
+        def compare(target, values):
+            """Compare target record against value dictionary"""
+            cache = target.env.cache
+            try:
+                current = tuple(cache.get(target, field) or None
+                                for field in plain_fields)
+            except KeyError:
+                current = tuple(target[k] or None for k in plain)
+            if current != tuple(values[k] or None for k in plain):
+                return False
+            return all(comparator(target[k], values[k])
+                       for k, comparator in special)
+
+        return compare
+
+    def snapshot_plan(self, columns, keys):
+        """Get compiled comparison function for rows of column values
+
+        The returned function takes a row tuple comprising a record ID
+        followed by the raw database values of the specified
+        ``columns``, and a value dictionary with the specified keys
+        (which must be a subset of ``columns``).  It returns a boolean
+        indicating whether or not the row matches all of the values.
+        """
+        keys = frozenset(keys)
+        return self.resolve((tuple(columns), keys), keys,
+                            self.compile_snapshot)
+
+    def compile_snapshot(self, columns, keys):
+        """Compile comparison function for rows of column values"""
+        model_fields = self.model._fields
+        index = {k: i for i, k in enumerate(columns, 1)}
+        plain = tuple(sorted(k for k in keys
+                             if self.is_plain(model_fields[k])))
+        plain_index = tuple(index[k] for k in plain)
+        special = tuple(
+            (index[k], k, self.column_comparator(model_fields[k]))
+            for k in sorted(keys) if k not in plain
+        )
+
+        def compare(row, values):
+            """Compare row of column values against value dictionary"""
+            if (tuple(row[i] or None for i in plain_index) !=
+                    tuple(values[k] or None for k in plain)):
+                return False
+            return all(comparator(row[i], values[k])
+                       for i, k, comparator in special)
+
+        return compare
@@ -0,0 +1,141 @@
+"""Deduplication helpers for EDI"""
+
+import hashlib
+import mmap
+import tempfile
+from odoo import models
+
+
+class EdiDigestSet(object):
+    """Compact set of value dictionary digests
+
+    Each value dictionary is represented by a fixed-size digest of its
+    canonicalised items, stored within an open-addressed hash table
+    backed by a single flat byte array.  This uses a small fraction of
+    the memory required to store the value dictionaries themselves
+    (or their ``frozenset`` equivalents).
+
+    The hash table may optionally be spilled to disk, in which case
+    the byte array is a memory-mapped anonymous temporary file that
+    may be paged out by the operating system as required.
+    """
+
+    SIZE = 16
+    """Digest size (in bytes)"""
+
+    EMPTY = bytes(SIZE)
+    """Empty hash table slot"""
+
+    def __init__(self, capacity=1024, spill=False):
+        self.spill = spill
+        self.count = 0
+        self.zero = False
+        self.peak = 0
+        self.capacity = 1
+        while self.capacity < capacity:
+            self.capacity <<= 1
+        self.file, self.table = self.allocate(self.capacity)
+
+    def __len__(self):
+        return self.count + self.zero
+
+    def __contains__(self, digest):
+        if digest == self.EMPTY:
+            return self.zero
+        return self.slot(self.table, self.capacity, digest)[1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def digest(cls, values):
+        """Calculate digest of value dictionary
+
+        Any values that refer to records that do not yet exist are
+        ignored.
+        """
+        canonical = repr(sorted(
+            (k, v) for k, v in values.items()
+            if not isinstance(v, models.NewId)
+        ))
+        return hashlib.blake2b(canonical.encode(),
+                               digest_size=cls.SIZE).digest()
+
+    @property
+    def nbytes(self):
+        """Current hash table size (in bytes)"""
+        return self.capacity * self.SIZE
+
+    def allocate(self, capacity):
+        """Allocate empty hash table"""
+        nbytes = capacity * self.SIZE
+        if not self.spill:
+            table = bytearray(nbytes)
+            self.peak = max(self.peak, nbytes)
+            return (None, table)
+        file = tempfile.TemporaryFile()
+        file.truncate(nbytes)
+        return (file, mmap.mmap(file.fileno(), nbytes))
+
+    @classmethod
+    def slot(cls, table, capacity, digest):
+        """Find hash table slot for digest
+
+        Returns a ``(offset, found)`` tuple, where ``offset`` is the
+        byte offset of either the slot containing the digest or the
+        first empty slot encountered.
+        """
+        size = cls.SIZE
+        mask = capacity - 1
+        index = int.from_bytes(digest[:8], 'little') & mask
+        while True:
+            offset = index * size
+            current = table[offset:offset + size]
+            if current == digest:
+                return (offset, True)
+            if current == cls.EMPTY:
+                return (offset, False)
+            index = (index + 1) & mask
+
+    def add(self, digest):
+        """Add digest to set
+
+        Returns ``True`` if the digest was not already present.
+        """
+        if digest == self.EMPTY:
+            added = not self.zero
+            self.zero = True
+            return added
+        (offset, found) = self.slot(self.table, self.capacity, digest)
+        if found:
+            return False
+        self.table[offset:offset + self.SIZE] = digest
+        self.count += 1
+        if 2 * self.count > self.capacity:
+            self.grow()
+        return True
+
+    def grow(self):
+        """Double the hash table capacity"""
+        size = self.SIZE
+        capacity = self.capacity << 1
+        (file, table) = self.allocate(capacity)
+        if not self.spill:
+            self.peak = max(self.peak, self.nbytes + capacity * size)
+        for offset in range(0, self.nbytes, size):
+            digest = bytes(self.table[offset:offset + size])
+            if digest != self.EMPTY:
+                (new, _found) = self.slot(table, capacity, digest)
+                table[new:new + size] = digest
+        self.close()
+        (self.file, self.table, self.capacity) = (file, table, capacity)
+
+    def close(self):
+        """Release hash table storage"""
+        if self.file is not None:
+            self.table.close()
+            self.file.close()
+            self.file = None
@@ -0,0 +1,70 @@
+"""Environment cache eviction for EDI"""
+
+from collections import Counter
+
+
+class EdiCacheEvictor(object):
+    """Batch-scoped environment cache evictor
+
+    The environment cache is normally discarded only at the end of a
+    transaction, and so grows with every batch processed within a
+    long document.  A cache evictor discards all cached field values
+    for records that will not be required by any later batch (such as
+    the EDI records within a completed batch and the target records
+    that they created or updated), while leaving any records shared
+    between batches (such as units of measure) in the cache.
+
+    Evicted records are also removed from the recordset's prefetch
+    set, to avoid reloading them when a field is next read from any
+    other record in the same prefetch set.  Records with pending
+    field values are never evicted, and parent records (for models
+    using ``_inherits``) are evicted along with their children.
+
+    Eviction never affects correctness, since any evicted field value
+    will simply be reloaded from the database if accessed again.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.records = Counter()
+        self.entries = Counter()
+
+    def __str__(self):
+        return ", ".join("%s:%d (%d values)" % (k, v, self.entries[k])
+                         for k, v in sorted(self.records.items()))
+
+    @property
+    def count(self):
+        """Total number of evicted cached field values"""
+        return sum(self.entries.values())
+
+    def evict(self, *recordsets):
+        """Evict records from the environment cache
+
+        Returns the number of evicted cached field values.
+        """
+        if not self.enabled:
+            return 0
+        count = 0
+        for recs in recordsets:
+            if not recs:
+                continue
+            parents = [recs.mapped(via) for via in recs._inherits.values()]
+            dirty = getattr(recs.env, 'dirty', {})
+            ids = set(x.id for x in recs if x not in dirty)
+            cache = recs.env.cache._data
+            evicted = 0
+            for field in recs._fields.values():
+                values = cache.get(field)
+                if not values:
+                    continue
+                for rec_id in ids.intersection(values):
+                    del values[rec_id]
+                    evicted += 1
+            prefetch = recs._prefetch.get(recs._name)
+            if prefetch:
+                prefetch.difference_update(ids)
+            self.records[recs._name] += len(ids)
+            self.entries[recs._name] += evicted
+            count += evicted + self.evict(*parents)
+        return count
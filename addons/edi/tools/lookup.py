@@ -0,0 +1,204 @@
+"""Lookup caching for EDI"""
+
+from collections import OrderedDict, defaultdict
+import threading
+
+SIGNAL_SEQUENCE = 'edi_lookup_cache_signaling'
+"""Database sequence used to signal lookup cache invalidation"""
+
+
+class EdiLookupCache(object):
+    """EDI lookup relationship cache
+
+    This is a bounded least-recently-used cache mapping lookup keys to
+    target record IDs, shared by all EDI record models within the
+    process.  Each cache key is a tuple of the form ``(dbname, uid,
+    model, via, domain, key)``.
+
+    Only successful lookups are cached.  Entries added by a
+    transaction are held in a buffer attached to the transaction's
+    cursor, and are published to the shared cache (and hence made
+    visible to other threads) only after the transaction has been
+    committed.  A rolled back transaction simply discards its buffer.
+
+    All entries for a target model are discarded whenever any record
+    in that model is created, written, or unlinked within the same
+    process.  A transaction that modifies a target model will also
+    stop buffering entries for that model, since any such entry may
+    depend upon changes that are subsequently undone by rolling back
+    to a savepoint.
+
+    Other processes are notified of any such modification via the
+    database sequence :data:`~.SIGNAL_SEQUENCE`, which is incremented
+    (using :meth:`~.signal`) after the modifying transaction has been
+    committed, in the same way as for Odoo's own registry cache
+    signalling.  All entries for the database are discarded (using
+    :meth:`~.check`) whenever the sequence is found to have changed.
+
+    Hit and miss counters are maintained for the lifetime of the
+    process, and are captured by :class:`~.EdiStatistics`.
+    """
+
+    def __init__(self, size=100000):
+        self.size = size
+        self.data = OrderedDict()
+        self.index = defaultdict(set)
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.signals = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, cr=None):
+        """Get cached target record ID, or ``None``
+
+        If a cursor is provided, then any entries added by the
+        cursor's current transaction will also be found.
+        """
+        with self.lock:
+            value = self.data.get(key)
+            if value is None and cr is not None:
+                pending = getattr(cr, '_edi_lookup_pending', None)
+                if pending is not None:
+                    value = pending.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if key in self.data:
+                    self.data.move_to_end(key)
+            return value
+
+    def put(self, key, value, cr=None):
+        """Add target record ID to cache
+
+        If a cursor is provided, then the entry will be published to
+        the shared cache only after the cursor's transaction has been
+        committed.
+        """
+        if cr is not None:
+            (pending, tainted) = self.transaction(cr)
+            if key[2] not in tainted:
+                pending[key] = value
+                while len(pending) > self.size:
+                    pending.popitem(last=False)
+            return
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            self.index[(key[0], key[2])].add(key)
+            while len(self.data) > self.size:
+                old, _value = self.data.popitem(last=False)
+                self.discard(old)
+
+    def transaction(self, cr):
+        """Get buffered entries and modified models for a transaction
+
+        Returns a ``(pending, tainted)`` tuple, where ``pending`` is
+        the ordered dictionary of entries awaiting publication, and
+        ``tainted`` is the set of target models modified within the
+        transaction.
+        """
+        pending = getattr(cr, '_edi_lookup_pending', None)
+        if pending is None:
+            pending = cr._edi_lookup_pending = OrderedDict()
+            cr._edi_lookup_tainted = set()
+            cr.after('commit', lambda: self.publish(cr))
+            cr.after('rollback', lambda: self.rollback(cr))
+        return (pending, cr._edi_lookup_tainted)
+
+    def publish(self, cr):
+        """Publish entries added by a committed transaction"""
+        pending = getattr(cr, '_edi_lookup_pending', None) or {}
+        self.rollback(cr)
+        for key, value in pending.items():
+            self.put(key, value)
+
+    def rollback(self, cr):
+        """Discard entries added by a rolled back transaction"""
+        cr._edi_lookup_pending = None
+        cr._edi_lookup_tainted = None
+
+    def discard(self, key):
+        """Remove key from model index"""
+        model = (key[0], key[2])
+        keys = self.index.get(model)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.index[model]
+
+    def invalidate(self, dbname, model, cr=None):
+        """Discard all cached entries for a target model
+
+        If a cursor is provided, then any entries for the model added
+        by the cursor's current transaction are also discarded, and
+        no further entries for the model will be added by the
+        transaction.
+        """
+        if cr is not None:
+            (pending, tainted) = self.transaction(cr)
+            tainted.add(model)
+            for key in [x for x in pending if x[2] == model]:
+                del pending[key]
+        if (dbname, model) not in self.index:
+            return
+        with self.lock:
+            for key in self.index.pop((dbname, model), ()):
+                self.data.pop(key, None)
+
+    @staticmethod
+    def setup(cr):
+        """Create invalidation signalling sequence"""
+        cr.execute('CREATE SEQUENCE IF NOT EXISTS %s' % SIGNAL_SEQUENCE)
+
+    def check(self, cr):
+        """Discard all cached entries invalidated by other processes"""
+        cr.execute('SELECT last_value FROM %s' % SIGNAL_SEQUENCE)
+        [(value,)] = cr.fetchall()
+        with self.lock:
+            if self.signals.get(cr.dbname) != value:
+                self.clear(cr.dbname)
+                self.signals[cr.dbname] = value
+
+    def signal(self, cr):
+        """Notify other processes of invalidation after commit
+
+        The sequence is incremented at most once per transaction, and
+        only once the transaction has been committed (so that other
+        processes cannot repopulate their caches from stale data).
+        """
+        if getattr(cr, '_edi_lookup_signal', False):
+            return
+        cr._edi_lookup_signal = True
+
+        def notify():
+            """Increment sequence"""
+            cr._edi_lookup_signal = False
+            cr.execute("SELECT nextval('%s')" % SIGNAL_SEQUENCE)
+            [(value,)] = cr.fetchall()
+            with self.lock:
+                # Avoid discarding our own entries unnecessarily
+                if self.signals.get(cr.dbname) == value - 1:
+                    self.signals[cr.dbname] = value
+
+        cr.after('commit', notify)
+        cr.after('rollback',
+                 lambda: setattr(cr, '_edi_lookup_signal', False))
+
+    def clear(self, dbname=None):
+        """Discard all cached entries (optionally for a single database)"""
+        with self.lock:
+            if dbname is None:
+                self.data.clear()
+                self.index.clear()
+                return
+            for model in [x for x in self.index if x[0] == dbname]:
+                for key in self.index.pop(model):
+                    self.data.pop(key, None)
+
+
+lookup_cache = EdiLookupCache()
+"""Process-level EDI lookup relationship cache"""
@@ -0,0 +1,48 @@
+"""OpenMetrics text exposition for EDI"""
+
+
+def escape(value):
+    """Escape an OpenMetrics label value"""
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+class EdiOpenMetrics(object):
+    """OpenMetrics text exposition writer
+
+    Metric families are declared using :meth:`~.family`, and samples
+    are added to the most recently declared family using
+    :meth:`~.sample`.  Counter samples are automatically given the
+    mandatory ``_total`` suffix.  The complete exposition (including
+    the terminating ``# EOF`` line) is obtained via ``str()``.
+    """
+
+    CONTENT_TYPE = ('application/openmetrics-text; version=1.0.0; '
+                    'charset=utf-8')
+    """OpenMetrics text exposition content type"""
+
+    def __init__(self):
+        self.lines = []
+        self.name = None
+        self.type = None
+
+    def family(self, name, type, help):
+        """Declare a metric family"""
+        # pylint: disable=redefined-builtin
+        self.name = name
+        self.type = type
+        self.lines.append('# TYPE %s %s' % (name, type))
+        self.lines.append('# HELP %s %s' % (name, help))
+        return self
+
+    def sample(self, value, **labels):
+        """Add a sample to the current metric family"""
+        name = self.name + ('_total' if self.type == 'counter' else '')
+        if labels:
+            name += '{%s}' % ','.join('%s="%s"' % (k, escape(v))
+                                      for k, v in sorted(labels.items()))
+        self.lines.append('%s %s' % (name, float(value or 0)))
+        return self
+
+    def __str__(self):
+        return '\n'.join(self.lines + ['# EOF', ''])
@@ -0,0 +1,108 @@
+"""Sampling profiler for EDI"""
+
+from collections import Counter
+import sys
+import threading
+
+
+class EdiSampler(object):
+    """Sampling profiler
+
+    A sampling profiler periodically captures the call stack of the
+    thread that started it, using a background thread.  The profiled
+    thread is never interrupted or traced, and so the overhead is
+    limited to the (brief) capture of one call stack per
+    :attr:`~.interval`.
+
+    Call stacks are accumulated in the collapsed stack format used
+    by flame graph tools, with each stack frame identified by the
+    module name and function name (e.g.
+    ``odoo.addons.edi.models.edi_record:target_values``).
+    """
+
+    INTERVAL = 0.005
+    """Default sampling interval (in seconds)"""
+
+    def __init__(self, interval=None):
+        self.interval = interval or self.INTERVAL
+        self.stacks = Counter()
+        self.labels = {}
+        self.ident = None
+        self.thread = None
+        self.stopping = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def samples(self):
+        """Number of captured samples"""
+        return sum(self.stacks.values())
+
+    def start(self):
+        """Start sampling the current thread"""
+        self.stop()
+        self.stacks.clear()
+        self.ident = threading.get_ident()
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, name='edi-sampler',
+                                       daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling"""
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        """Capture samples until stopped"""
+        while not self.stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.ident)
+            if frame is not None:
+                self.stacks[self.stack(frame)] += 1
+
+    def label(self, frame):
+        """Construct label for a stack frame"""
+        code = frame.f_code
+        label = self.labels.get(code)
+        if label is None:
+            label = '%s:%s' % (frame.f_globals.get('__name__', '?'),
+                               code.co_name)
+            self.labels[code] = label
+        return label
+
+    def stack(self, frame):
+        """Construct collapsed call stack (outermost frame first)"""
+        labels = []
+        while frame is not None:
+            labels.append(self.label(frame))
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    def collapsed(self):
+        """Get collapsed call stacks in flame graph input format"""
+        return ''.join('%s %d\n' % (stack, count)
+                       for stack, count in sorted(self.stacks.items()))
+
+    def top(self, limit=20):
+        """Get functions with the highest self time
+
+        Returns a list of dictionaries describing the (at most
+        ``limit``) functions most frequently found at the top of the
+        call stack, in descending order of frequency.
+        """
+        total = self.samples
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rpartition(';')[2]] += count
+        return [{
+            'function': function,
+            'samples': count,
+            'fraction': count / total,
+        } for function, count in leaves.most_common(limit)]
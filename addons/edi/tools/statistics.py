@@ -1,9 +1,15 @@
 """Profiling statistics for EDI"""
 
 from collections import defaultdict, namedtuple
+import resource
 import time
+import tracemalloc
+from .lookup import lookup_cache
+from .profiling import EdiSampler
 
-EdiMetrics = namedtuple('EdiMetrics', ('time', 'count', 'cache'))
+EdiMetrics = namedtuple('EdiMetrics',
+                        ('time', 'count', 'cache', 'hits', 'misses', 'rss',
+                         'traced', 'peak'))
 
 
 class EdiCacheMetrics(set):
@@ -25,13 +31,28 @@ class EdiStatistics(object):
     """EDI profiling statistics
 
     This is a lightweight profiling mechanism that captures the total
-    elapsed time and query count.  It may be used as a standalone
-    object or as a context manager.
+    elapsed time, query count, EDI lookup cache hit and miss counts,
+    and growth in process peak memory usage.  It may be used as a
+    standalone object or as a context manager.
+
+    If ``profile`` is true, then a sampling profiler will also run
+    between :meth:`~.start` and :meth:`~.stop`, and the results will
+    be available via :attr:`~.profiler`.
+
+    If ``trace_memory`` is true, then Python memory allocations will
+    be traced using :mod:`tracemalloc` (which is started if not
+    already running), and the peak growth in traced memory will be
+    available via :attr:`~.peak`.  If tracing was already running and
+    the peak cannot be reset (prior to Python 3.9), the peak is
+    measured from the point at which tracing started.
     """
 
-    def __init__(self, env, cache=False):
+    def __init__(self, env, cache=False, profile=False, trace_memory=False):
         self.env = env
         self.cache = cache
+        self.profiler = EdiSampler() if profile else None
+        self.trace_memory = trace_memory
+        self.tracing = False
         self.start()
         self.stop()
 
@@ -49,16 +70,34 @@ class EdiStatistics(object):
             for field, records in self.env.cache._data.items():
                 ids[field.model_name].update(k for k, v in records.items() if v)
         cache = EdiCacheMetrics(self.env[k].browse(v) for k, v in ids.items())
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        (traced, peak) = (tracemalloc.get_traced_memory()
+                          if tracemalloc.is_tracing() else (0, 0))
         return EdiMetrics(time=time.time(), count=self.env.cr.sql_log_count,
-                          cache=cache)
+                          cache=cache, hits=lookup_cache.hits,
+                          misses=lookup_cache.misses, rss=rss,
+                          traced=traced, peak=peak)
 
     def start(self):
         """Start profiling"""
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.tracing = True
+            elif hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
         self.started = self.metrics()
+        if self.profiler is not None:
+            self.profiler.start()
 
     def stop(self):
         """Stop profiling"""
+        if self.profiler is not None:
+            self.profiler.stop()
         self.stopped = self.metrics()
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
 
     @property
     def elapsed(self):
@@ -70,6 +109,26 @@ class EdiStatistics(object):
         """Query count"""
         return (self.stopped.count - self.started.count)
 
+    @property
+    def hits(self):
+        """Lookup cache hit count"""
+        return (self.stopped.hits - self.started.hits)
+
+    @property
+    def misses(self):
+        """Lookup cache miss count"""
+        return (self.stopped.misses - self.started.misses)
+
+    @property
+    def memory(self):
+        """Peak memory usage growth (in kB)"""
+        return (self.stopped.rss - self.started.rss)
+
+    @property
+    def peak(self):
+        """Peak traced memory growth (in kB)"""
+        return max(self.stopped.peak - self.started.traced, 0) // 1024
+
     @property
     def cached(self):
         """Newly cached records"""
@@ -1,9 +1,12 @@
 """Query tracing"""
 
+from collections import Counter
 from itertools import takewhile
 import logging
+import os.path
 import re
 import traceback
+import odoo
 from odoo import models
 from odoo.sql_db import Cursor
 
@@ -13,6 +16,32 @@ _logger = logging.getLogger(__name__)
 # Patch base Cursor class to provide "tracing" attribute
 Cursor.tracing = False
 
+FINGERPRINT_SUBS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+"""Substitutions used to construct a query fingerprint"""
+
+ODOO_PATH = os.path.dirname(odoo.__file__)
+"""Odoo core source directory"""
+
+ODOO_ADDONS_PATH = os.path.join(ODOO_PATH, 'addons')
+"""Odoo core addons source directory"""
+
+
+def fingerprint(query):
+    """Construct query fingerprint
+
+    The fingerprint is the query string with all literal values
+    replaced by placeholders, all lists of literal values collapsed,
+    and all whitespace normalised.
+    """
+    for regex, replacement in FINGERPRINT_SUBS:
+        query = regex.sub(replacement, query)
+    return query.strip()
+
 
 class EdiTracer(object):
     """Query tracer
@@ -93,20 +122,28 @@ class EdiTracer(object):
                 if self.count >= self.max:
                     self.stop()
 
-            # Skip all but the innermost common stack frames
-            full_tb = traceback.extract_stack()[:-1]
-            init_tb = iter(self.tb)
-            common = takewhile(lambda x: x == next(init_tb, None), full_tb)
-            skip = max((len(list(common)) - 1), 0)
-            tb = full_tb[skip:]
-
-            # Log query, parameters, and incremental traceback
-            _logger.info("query: %s : %s\n%s", query, params,
-                         ''.join(traceback.format_list(tb)))
+            # Log query
+            self.log(query, params)
 
         return self.execute(query, params=params,
                             log_exceptions=log_exceptions)
 
+    def traceback(self):
+        """Construct incremental traceback"""
+
+        # Skip all but the innermost common stack frames, and the
+        # frames within the tracer itself
+        full_tb = traceback.extract_stack()[:-3]
+        init_tb = iter(self.tb)
+        common = takewhile(lambda x: x == next(init_tb, None), full_tb)
+        skip = max((len(list(common)) - 1), 0)
+        return full_tb[skip:]
+
+    def log(self, query, params):
+        """Log query, parameters, and incremental traceback"""
+        _logger.info("query: %s : %s\n%s", query, params,
+                     ''.join(traceback.format_list(self.traceback())))
+
     def start(self):
         """Start tracing queries"""
         self.count = 0
@@ -125,3 +162,89 @@ class EdiTracer(object):
 
     def __exit__(self, exc_type, exc_value, tb):
         self.stop()
+
+
+class EdiQueryRecorder(EdiTracer):
+    """Query recorder
+
+    A query recorder is a query tracer that records the selected
+    queries and their parameters in :attr:`~.queries`, rather than
+    logging them.
+    """
+
+    def __init__(self, cr, filter=None, max=None):
+        self.queries = []
+        super().__init__(cr, filter=filter, max=max)
+
+    def log(self, query, params):
+        """Record query and parameters"""
+        self.queries.append((query, params))
+
+
+class EdiQueryAnalyser(EdiTracer):
+    """Query analyser
+
+    A query analyser is a query tracer that counts the selected
+    queries by query fingerprint (see :func:`~.fingerprint`) and by
+    Python call site, rather than logging them.
+
+    The call site is the innermost stack frame lying outside of the
+    Odoo core (i.e. within any addon module).  The analysis may be
+    used to identify N+1 query patterns, in which the same query is
+    issued from the same call site once for each record being
+    processed.
+    """
+
+    def __init__(self, cr, filter=None, max=None):
+        self.counts = Counter()
+        super().__init__(cr, filter=filter, max=max)
+
+    @staticmethod
+    def site(tb):
+        """Identify call site within traceback"""
+        for frame in reversed(tb):
+            filename = frame.filename
+            if (filename.startswith(ODOO_ADDONS_PATH) or
+                    not filename.startswith(ODOO_PATH)):
+                if filename != __file__:
+                    return '%s:%d in %s' % (filename, frame.lineno,
+                                            frame.name)
+        return None
+
+    def log(self, query, params):
+        """Count query by fingerprint and call site"""
+        self.counts[(fingerprint(query), self.site(self.traceback()))] += 1
+
+    def report(self, records, limit=10, minimum=2):
+        """Construct N+1 query pattern report
+
+        ``records`` is a dictionary mapping each record type (e.g. an
+        EDI record model name) to the number of records of that type.
+        A query is considered to be an N+1 query pattern if it was
+        issued from the same call site at least once per record of
+        any record type having at least ``minimum`` records, and is
+        attributed to the largest such record type.
+
+        Returns a list of dictionaries describing the (at most
+        ``limit``) most frequently issued N+1 query patterns, in
+        descending order of frequency.
+        """
+        sizes = sorted(((k, v) for k, v in records.items() if v >= minimum),
+                       key=lambda x: (-x[1], x[0]))
+        report = []
+        for (query, site), count in self.counts.most_common():
+            if len(report) >= limit:
+                break
+            match = next(((k, v) for k, v in sizes if v <= count), None)
+            if match is None:
+                continue
+            (rec_type, size) = match
+            report.append({
+                'fingerprint': query,
+                'site': site,
+                'count': count,
+                'record_type': rec_type,
+                'records': size,
+                'per_record': (count / size),
+            })
+        return report
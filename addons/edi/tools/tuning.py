@@ -0,0 +1,115 @@
+"""Batch size tuning for EDI"""
+
+import threading
+
+
+class EdiBatchTuner(object):
+    """Adaptive batch size tuner
+
+    The batch size for each key (typically a ``(dbname, model,
+    operation)`` tuple) is adjusted after each complete batch using a
+    simple hill-climbing algorithm.  The batch size continues to grow
+    (or shrink) by :attr:`~.FACTOR` for as long as the elapsed time
+    per record does not worsen, and reverses direction when it does.
+    The batch size is always reduced if the process peak memory usage
+    grows by more than :attr:`~.memory` kilobytes during a single
+    batch.
+
+    Batch sizes are always bounded by :attr:`~.minimum` and
+    :attr:`~.maximum`.  Incomplete batches (i.e. the final batch of an
+    operation) are ignored.
+    """
+
+    FACTOR = 1.5
+    """Batch size adjustment factor"""
+
+    TOLERANCE = 0.05
+    """Relative increase in elapsed time per record treated as noise"""
+
+    def __init__(self, minimum=10, maximum=10000, memory=0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.memory = memory
+        self.sizes = {}
+        self.costs = {}
+        self.steps = {}
+        self.queries = {}
+        self.peaks = {}
+        self.samples = {}
+        self.dirty = set()
+        self.lock = threading.RLock()
+
+    def __contains__(self, key):
+        return key in self.sizes
+
+    def configure(self, minimum=None, maximum=None, memory=None):
+        """Update batch size bounds and memory limit"""
+        if minimum is not None:
+            self.minimum = max(1, int(minimum))
+        if maximum is not None:
+            self.maximum = max(self.minimum, int(maximum))
+        if memory is not None:
+            self.memory = int(memory)
+
+    def clamp(self, size):
+        """Constrain batch size to configured bounds"""
+        return max(self.minimum, min(self.maximum, int(size)))
+
+    def size(self, key, default):
+        """Get current batch size"""
+        with self.lock:
+            size = self.sizes.get(key)
+            if size is None:
+                size = self.sizes[key] = self.clamp(default)
+            return size
+
+    def record(self, key, size, count, elapsed, queries, memory):
+        """Record measurements for a batch of ``count`` items
+
+        Returns the new batch size.
+        """
+        with self.lock:
+            current = self.sizes.get(key, self.clamp(size))
+            if not count or count < size:
+                return current
+            cost = elapsed / count
+            step = self.steps.get(key, 1)
+            previous = self.costs.get(key)
+            if self.memory and memory > self.memory:
+                step = -1
+            elif previous is not None and cost > previous * (1 +
+                                                             self.TOLERANCE):
+                step = -step
+            self.costs[key] = cost
+            self.steps[key] = step
+            self.queries[key] = queries / count
+            self.peaks[key] = memory
+            self.samples[key] = self.samples.get(key, 0) + 1
+            self.sizes[key] = self.clamp(round(current * (self.FACTOR ** step)))
+            self.dirty.add(key)
+            return self.sizes[key]
+
+    def flush(self, match=lambda key: True):
+        """Retrieve and clear the set of updated keys
+
+        Returns a dictionary mapping each updated key to the number of
+        batches recorded since the key was last flushed.
+        """
+        with self.lock:
+            keys = set(x for x in self.dirty if match(x))
+            self.dirty -= keys
+            flushed = {x: self.samples[x] for x in keys}
+            for key in keys:
+                self.samples[key] = 0
+            return flushed
+
+    def clear(self):
+        """Discard all learned batch sizes"""
+        with self.lock:
+            for data in (self.sizes, self.costs, self.steps, self.queries,
+                         self.peaks, self.samples, self.dirty):
+                data.clear()
+
+
+batch_tuner = EdiBatchTuner()
+"""Process-level EDI batch size tuner"""
@@ -67,4 +67,6 @@ class EdiInactiveProductRecord(models.Model):
     _inherit = 'edi.record.deactivator'
     _description = "Inactive Product"
 
+    _edi_bulk_copy = True
+
     target_id = fields.Many2one('product.product', string="Product")
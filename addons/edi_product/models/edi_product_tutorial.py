@@ -57,6 +57,7 @@ class EdiProductTutorialDocument(models.AbstractModel):
     _name = 'edi.product.tutorial.document'
     _inherit = 'edi.product.document'
     _description = "Tutorial product CSV file"
+    _edi_delta = True
 
     @api.model
     def product_record_values(self, data):
@@ -1,5 +1,6 @@
 """EDI product tests"""
 
+from . import test_bulk
 from . import test_product
 from . import test_sap
 from . import test_tutorial
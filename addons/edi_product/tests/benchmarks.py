@@ -0,0 +1,66 @@
+"""EDI product synthetic benchmarks"""
+
+from odoo.modules.module import get_module_resource
+from odoo.addons.edi.tools import EdiBenchmark
+
+
+def ean13(number):
+    """Construct an EAN-13 barcode (including check digit)"""
+    digits = '%012d' % number
+    total = sum(int(x) * (3 if i % 2 else 1) for i, x in enumerate(digits))
+    return '%s%d' % (digits, (10 - total % 10) % 10)
+
+
+class EdiProductTutorialBenchmark(EdiBenchmark):
+    """Product tutorial CSV benchmark"""
+
+    name = 'product'
+    doc_type = 'edi_product.tutorial_document_type'
+
+    def inputs(self):
+        rows = ('%s,%s %s,,%d,%d' % (
+            code, self.word(), self.word(), self.random.randint(1, 5000),
+            self.random.randint(1, 10000)
+        ) for code in self.codes('PRD', self.scale))
+        yield ('products.csv', '\n'.join(rows).encode())
+
+
+class EdiProductSapBenchmark(EdiBenchmark):
+    """SAP MATMAS01 IDoc benchmark
+
+    One IDoc is generated per material, as for the standard SAP
+    transactions that distribute material master data.  Each IDoc is
+    constructed from a template IDoc by substituting the IDoc number,
+    material number, description, and barcode in place.
+    """
+
+    name = 'matmas01'
+    doc_type = 'edi_product.sap_document_type'
+
+    TEMPLATE = 'LTESTEDI_00199014'
+    """Template IDoc filename"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        path = get_module_resource('edi_product', 'tests', 'files',
+                                   self.TEMPLATE)
+        with open(path, 'rb') as f:
+            self.template = f.read()
+
+    def idoc(self, docnum, matnr, maktx, ean11):
+        """Construct IDoc from template"""
+        data = self.template
+        for old, new, width in ((b'0000000000199014', docnum, 16),
+                                (b'MANG01', matnr, 18),
+                                (b'Enrobed Mango', maktx, 40),
+                                (b'5055365644456', ean11, 13)):
+            data = data.replace(old.ljust(width),
+                                new.encode().ljust(width)[:width])
+        return data
+
+    def inputs(self):
+        for i, matnr in enumerate(self.codes('MAT', self.scale)):
+            docnum = '%016d' % (i + 1)
+            maktx = '%s %s' % (self.word(), self.word())
+            yield ('LTESTEDI_%s' % docnum[-8:],
+                   self.idoc(docnum, matnr, maktx, ean13(200000000000 + i)))
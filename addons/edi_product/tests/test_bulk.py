@@ -0,0 +1,39 @@
+"""EDI bulk product creation tests"""
+
+from odoo.addons.edi.tools import EdiBulkCreator
+from .common import EdiProductCase
+
+
+class TestBulk(EdiProductCase):
+    """EDI bulk product creation tests"""
+
+    def test01_inherits(self):
+        """Test bulk creation of a model using _inherits"""
+        Product = self.env['product.product']
+        creator = EdiBulkCreator(Product)
+        self.assertIn('product.template', creator.parents)
+        vlist = [{'name': "Widget %d" % i, 'default_code': 'WIDGET%d' % i,
+                  'list_price': 1.5 * i} for i in range(5)]
+        products = creator.create(vlist)
+        Product.recompute()
+        self.assertEqual(creator.count, 2)
+        self.assertEqual(products.mapped('default_code'),
+                         [x['default_code'] for x in vlist])
+        templates = products.mapped('product_tmpl_id')
+        self.assertEqual(len(templates), 5)
+        self.assertEqual(templates.mapped('name'),
+                         [x['name'] for x in vlist])
+        self.assertEqual(products[3].name, "Widget 3")
+        self.assertEqual(products[3].list_price, 4.5)
+        self.assertTrue(all(products.mapped('active')))
+        self.assertTrue(all(templates.mapped('active')))
+        self.assertTrue(all(templates.mapped('uom_id')))
+        self.assertTrue(all(templates.mapped('categ_id')))
+        self.assertEqual(set(templates.mapped('type')),
+                         {Product.default_get(['type'])['type']})
+        for product in products:
+            self.assertEqual(product.product_tmpl_id.product_variant_ids,
+                             product)
+        self.assertEqual(Product.search([
+            ('default_code', '=like', 'WIDGET%'),
+        ]), products)
@@ -1,5 +1,6 @@
 """EDI product tutorial tests"""
 
+from unittest.mock import patch
 from .common import EdiProductCase
 
 
@@ -92,3 +93,56 @@ class TestTutorial(EdiProductCase):
         self.assertEqual(len(doc3.product_tutorial_ids), 1)
         self.assertEqual(doc3.product_tutorial_ids.product_id, product)
         self.assertTrue(product.active)
+
+    def test07_delta(self):
+        """Delta input against previous document"""
+        self.doc_type_tutorial.delta = True
+        doc1 = self.create_tutorial('books02.csv')
+        self.assertTrue(doc1.action_execute())
+        self.assertEqual(len(doc1.product_tutorial_ids), 3)
+        Product = self.env['product.product']
+        other = Product.create({
+            'name': "Mort",
+            'default_code': '9780552131063',
+            'barcode': '9780552131063',
+        })
+        doc2 = self.create_tutorial('books03.csv')
+        self.assertEqual([x for _fname, x in doc2.inputs()], [b''])
+        self.assertTrue(doc2.action_execute())
+        self.assertEqual(len(doc2.product_tutorial_ids), 0)
+        self.assertEqual(len(doc2.inactive_product_ids), 1)
+        product = doc2.inactive_product_ids.target_id
+        self.assertEqual(product.barcode, '9780552134651')
+        self.assertFalse(product.active)
+        doc3 = self.create_tutorial('books02.csv')
+        self.assertTrue(doc3.action_execute())
+        self.assertEqual(len(doc3.product_tutorial_ids), 1)
+        self.assertEqual(doc3.product_tutorial_ids.product_id, product)
+        self.assertEqual(len(doc3.inactive_product_ids), 0)
+        self.assertTrue(product.active)
+        self.assertTrue(other.active)
+
+    def test08_matched_override(self):
+        """Deactivation via an overridden matched target records hook"""
+        EdiProductTutorialRecord = self.env['edi.product.tutorial.record']
+        doc1 = self.create_tutorial('books02.csv')
+        self.assertTrue(doc1.action_execute())
+        seen = []
+        original = type(EdiProductTutorialRecord).matched
+
+        def matched(self, doc, targets):
+            """Capture matched target records"""
+            seen.append(targets)
+            return original(self, doc, targets)
+
+        with patch.object(type(EdiProductTutorialRecord), 'matched',
+                          matched):
+            doc2 = self.create_tutorial('books03.csv')
+            self.assertTrue(doc2.action_execute())
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(sorted(seen[0].mapped('barcode')),
+                         ['9780552145428', '9780552146166'])
+        self.assertEqual(len(doc2.inactive_product_ids), 1)
+        product = doc2.inactive_product_ids.target_id
+        self.assertEqual(product.barcode, '9780552134651')
+        self.assertFalse(product.active)
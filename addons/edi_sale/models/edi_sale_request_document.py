@@ -101,7 +101,8 @@ class EdiSaleRequestDocument(models.AbstractModel):
         if self._auto_confirm:
             SaleRequestRecord = self.sale_request_record_model(doc)
             reqs = SaleRequestRecord.search([('doc_id', '=', doc.id)])
-            for r, sales in reqs.mapped('sale_id').batched(self.BATCH_CONFIRM):
+            orders = reqs.mapped('sale_id')
+            for r, sales in self.tuned('BATCH_CONFIRM', orders):
                 _logger.info("%s confirming %d-%d", doc.name, r[0], r[-1])
                 with self.statistics() as stats:
                     sales.action_confirm()
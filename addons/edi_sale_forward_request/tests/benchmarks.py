@@ -0,0 +1,73 @@
+"""EDI sale order forward request synthetic benchmarks"""
+
+import json
+import math
+from odoo.addons.edi.tools import EdiBenchmark
+
+
+class EdiSaleForwardRequestBenchmark(EdiBenchmark):
+    """Sale order forward request JSON benchmark"""
+
+    name = "sale_forward_request"
+    doc_type = "edi_sale_forward_request.sale_forward_request_document_type"
+
+    PRODUCTS = 1000
+    """Maximum number of distinct products"""
+
+    LINES = 10
+    """Number of order lines per sale order"""
+
+    TITLES = ("Dame", "Miss", "Mr", "Ms")
+    """Customer titles"""
+
+    def setup(self):
+        Product = self.env["product.product"]
+        self.product_codes = self.codes("SKU", min(self.scale, self.PRODUCTS))
+        for code in self.product_codes:
+            Product.create(
+                dict(name="%s %s" % (self.word(), self.word()), default_code=code)
+            )
+
+    def customer(self, ref):
+        """Generate customer"""
+        return {
+            "customer_ref": ref,
+            "customer_type": "person",
+            "name": {"title": self.random.choice(self.TITLES), "name": self.word()},
+            "address": {
+                "first": "%d %s Street" % (self.random.randint(1, 999), self.word()),
+                "second": self.word(),
+                "town": self.word(),
+                "postcode": "%s%d %d%s"
+                % (
+                    self.word(2).upper(),
+                    self.random.randint(1, 99),
+                    self.random.randint(1, 9),
+                    self.word(2).upper(),
+                ),
+            },
+        }
+
+    def inputs(self):
+        customers = []
+        orders = []
+        refs = self.codes("C", math.ceil(self.scale / self.LINES))
+        for i, ref in enumerate(refs):
+            customers.append(self.customer(ref))
+            lines = min(self.LINES, self.scale - i * self.LINES)
+            orders.append(
+                {
+                    "customer_ref": ref,
+                    "order_ref": "S%s" % ref,
+                    "lines": [
+                        {
+                            "line_ref": code,
+                            "product_ref": code,
+                            "quantity": self.random.randint(1, 100),
+                        }
+                        for code in self.random.sample(self.product_codes, lines)
+                    ],
+                }
+            )
+        data = {"customers": customers, "orders": orders}
+        yield ("orders.json", json.dumps(data).encode())
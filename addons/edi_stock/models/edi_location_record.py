@@ -62,6 +62,8 @@ class EdiInactiveLocationRecord(models.Model):
     _inherit = 'edi.record.deactivator'
     _description = "Inactive Stock Location"
 
+    _edi_bulk_copy = True
+
     _edi_deactivator_name = 'complete_name'
 
     target_id = fields.Many2one('stock.location', string="Location")
@@ -56,6 +56,7 @@ class EdiLocationTutorialDocument(models.AbstractModel):
     _name = 'edi.location.tutorial.document'
     _inherit = 'edi.location.document'
     _description = "Tutorial stock location CSV file"
+    _edi_delta = True
 
     @api.model
     def location_record_values(self, data):
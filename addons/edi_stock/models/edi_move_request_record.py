@@ -112,38 +112,50 @@ class EdiMoveRequestRecord(models.Model):
 
         # Process records in batches for efficiency
         cancel = Move.browse()
-        for r, batch in self.batched(self.BATCH_SIZE):
+        evictor = self.evictor()
+        for r, batch in self.tuned('BATCH_SIZE'):
             batch.precache()
             _logger.info("%s executing %s %d-%d of %d",
                          doc.name, self._name, r[0], r[-1], len(self))
 
             # Create, update, or cancel moves
-            for rec in batch:
-
-                # Find existing move, if any
-                move = rec.existing_move()
-                if move:
-                    if len(move) > 1:
-                        raise UserError(
-                            _("Multiple existing moves for %s") % rec.name
-                        )
-                    rec.move_id = move
-
-                # Construct move value dictionary
-                move_vals = rec.move_values()
-
-                # Create, update, or cancel move as applicable
-                if rec.move_id:
-                    if rec.move_id.move_line_ids.filtered(lambda x: x.qty_done):
-                        raise UserError(
-                            _("In-progress moves for %s") % rec.name
-                        )
-                    if move_vals['product_uom_qty']:
-                        rec.move_id.write(move_vals)
-                    else:
-                        cancel += rec.move_id
-                elif move_vals['product_uom_qty']:
-                    rec.move_id = Move.create(move_vals)
+            with self.batch_statistics() as stats:
+                for rec in batch:
+
+                    # Find existing move, if any
+                    move = rec.existing_move()
+                    if move:
+                        if len(move) > 1:
+                            raise UserError(
+                                _("Multiple existing moves for %s") % rec.name
+                            )
+                        rec.move_id = move
+
+                    # Construct move value dictionary
+                    move_vals = rec.move_values()
+
+                    # Create, update, or cancel move as applicable
+                    if rec.move_id:
+                        lines = rec.move_id.move_line_ids
+                        if lines.filtered(lambda x: x.qty_done):
+                            raise UserError(
+                                _("In-progress moves for %s") % rec.name
+                            )
+                        if move_vals['product_uom_qty']:
+                            rec.move_id.write(move_vals)
+                        else:
+                            cancel += rec.move_id
+                    elif move_vals['product_uom_qty']:
+                        rec.move_id = Move.create(move_vals)
+
+            # Evict batch records and moves (other than those still
+            # to be cancelled) from the cache
+            evicted = evictor.evict(batch, batch.mapped('move_id') - cancel)
+            _logger.info("%s executed %s %d-%d in %.2fs, %dkB peak, %d "
+                         "evicted", doc.name, self._name, r[0], r[-1],
+                         stats.elapsed, stats.peak, evicted)
+        if evictor.count:
+            _logger.info("%s evicted %s", doc.name, evictor)
 
         # Associate moves to pickings.  Do this as a bulk operation to
         # avoid triggering updates on the picking for each new move.
@@ -66,4 +66,6 @@ class EdiInactiveProcurementRecord(models.Model):
     _inherit = 'edi.record.deactivator'
     _description = "Inactive Procurement Rule"
 
+    _edi_bulk_copy = True
+
     target_id = fields.Many2one('procurement.rule', string="Rule")
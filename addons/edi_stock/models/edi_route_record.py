@@ -51,4 +51,6 @@ class EdiInactiveRouteRecord(models.Model):
     _inherit = 'edi.record.deactivator'
     _description = "Inactive Stock Route"
 
+    _edi_bulk_copy = True
+
     target_id = fields.Many2one('stock.location.route', string="Route")
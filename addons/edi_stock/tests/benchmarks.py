@@ -0,0 +1,135 @@
+"""EDI stock synthetic benchmarks"""
+
+import math
+from odoo.addons.edi.tools import EdiBenchmark, EdiBulkCreator
+
+
+class EdiStockBenchmark(EdiBenchmark):
+    """Base class for EDI stock benchmarks"""
+
+    PRODUCTS = 1000
+    """Maximum number of distinct products"""
+
+    LINES = 10
+    """Number of stock moves per stock transfer"""
+
+    def products(self):
+        """Create stockable products"""
+        Product = self.env['product.product']
+        codes = self.codes('STK', min(self.scale, self.PRODUCTS))
+        products = Product.browse()
+        for code in codes:
+            products += Product.create({
+                'default_code': code,
+                'name': '%s %s' % (self.word(), self.word()),
+                'type': 'product',
+            })
+        return products
+
+    def pick_types(self):
+        """Ensure picking type definitions are usable"""
+        loc_suppliers = self.env.ref('stock.stock_location_suppliers')
+        loc_stock = self.env.ref('stock.stock_location_stock')
+        loc_customers = self.env.ref('stock.stock_location_customers')
+        pick_type_in = self.env.ref('stock.picking_type_in')
+        pick_type_in.sequence_id.prefix = 'WH/IN/'
+        pick_type_in.default_location_src_id = loc_suppliers
+        pick_type_in.default_location_dest_id = loc_stock
+        pick_type_out = self.env.ref('stock.picking_type_out')
+        pick_type_out.sequence_id.prefix = 'WH/OUT/'
+        pick_type_out.default_location_src_id = loc_stock
+        pick_type_out.default_location_dest_id = loc_customers
+        return (pick_type_in, pick_type_out)
+
+
+class EdiPickRequestBenchmark(EdiStockBenchmark):
+    """Stock transfer request tutorial CSV benchmark"""
+
+    name = 'pick_request'
+    doc_type = 'edi_stock.pick_request_tutorial_document_type'
+
+    def setup(self):
+        self.pick_types()
+        self.product_codes = self.products().mapped('default_code')
+
+    def inputs(self):
+        rows = []
+        orders = self.codes('ORD', math.ceil(self.scale / self.LINES))
+        for i, order in enumerate(orders):
+            lines = min(self.LINES, self.scale - i * self.LINES)
+            for code in self.random.sample(self.product_codes, lines):
+                rows.append('%s,%s,%d,C' % (order, code,
+                                            self.random.randint(1, 100)))
+        yield ('OUT_BENCHMARK.csv', '\n'.join(rows).encode())
+
+
+class EdiPickReportBenchmark(EdiStockBenchmark):
+    """Stock transfer report tutorial CSV benchmark"""
+
+    name = 'pick_report'
+    doc_type = 'edi_stock.pick_report_tutorial_document_type'
+
+    BATCH_SIZE = 100
+    """Number of stock transfers completed at a time"""
+
+    def setup(self):
+        Picking = self.env['stock.picking']
+        Move = self.env['stock.move']
+        Tracker = self.env['edi.move.tracker']
+        (pick_type_in, _pick_type_out) = self.pick_types()
+        products = self.products()
+        picks = Picking.browse()
+        orders = self.codes('ORD', math.ceil(self.scale / self.LINES))
+        for i, order in enumerate(orders):
+            tracker = Tracker.create({'name': order})
+            pick = Picking.create({
+                'picking_type_id': pick_type_in.id,
+                'location_id': pick_type_in.default_location_src_id.id,
+                'location_dest_id': pick_type_in.default_location_dest_id.id,
+            })
+            lines = min(self.LINES, self.scale - i * self.LINES)
+            for product in self.random.sample(list(products), lines):
+                Move.create({
+                    'name': product.default_code,
+                    'picking_id': pick.id,
+                    'location_id': pick.location_id.id,
+                    'location_dest_id': pick.location_dest_id.id,
+                    'product_id': product.id,
+                    'product_uom': product.uom_id.id,
+                    'product_uom_qty': self.random.randint(1, 100),
+                    'edi_tracker_id': tracker.id,
+                })
+            picks += pick
+        for batch in picks.sliced(self.BATCH_SIZE):
+            batch.action_confirm()
+            for move in batch.mapped('move_lines'):
+                move.quantity_done = move.product_uom_qty
+            batch.action_done()
+
+
+class EdiQuantReportBenchmark(EdiStockBenchmark):
+    """Stock level report tutorial CSV benchmark"""
+
+    name = 'quant_report'
+    doc_type = 'edi_stock.quant_report_tutorial_document_type'
+
+    def setup(self):
+        Location = self.env['stock.location']
+        Quant = self.env['stock.quant']
+        loc_stock = self.env.ref('stock.stock_location_stock')
+        products = self.products()
+        count = math.ceil(self.scale / len(products))
+        vlist = []
+        for code in self.codes('BIN', count):
+            location = Location.create({
+                'name': code,
+                'location_id': loc_stock.id,
+            })
+            vlist.extend({
+                'product_id': product.id,
+                'location_id': location.id,
+                'quantity': self.random.randint(1, 100),
+            } for product in products[:self.scale - len(vlist)])
+        creator = EdiBulkCreator(Quant)
+        creator.load(vlist)
+        creator.invalidate()
@@ -1,5 +1,6 @@
 """EDI stock location tutorial tests"""
 
+from unittest.mock import patch
 from .common import EdiCase
 
 
@@ -39,3 +40,20 @@ class TestLocationTutorial(EdiCase):
         doc2 = self.create_tutorial('places.csv')
         self.assertTrue(doc2.action_execute())
         self.assertEqual(len(doc2.location_tutorial_ids), 0)
+
+    def test03_schedule(self):
+        """Dependent records are scheduled without further lookups"""
+        EdiLocationTutorialRecord = self.env['edi.location.tutorial.record']
+        doc = self.create_tutorial('places.csv')
+        self.assertTrue(doc.action_prepare())
+        add_edi_relates = EdiLocationTutorialRecord.__class__._add_edi_relates
+        with patch.object(EdiLocationTutorialRecord.__class__,
+                          '_add_edi_relates', autospec=True,
+                          side_effect=add_edi_relates) as mock:
+            self.assertTrue(doc.action_execute())
+        self.assertEqual(mock.call_count, 1)
+        locs = doc.mapped('location_tutorial_ids.location_id')
+        locs_by_code = {x.barcode: x for x in locs}
+        for code in ('LOC101', 'LOC102', 'LOC103'):
+            self.assertEqual(locs_by_code[code].location_id,
+                             locs_by_code['ZONE01'])
@@ -1,5 +1,6 @@
 """EDI orderpoint tutorial tests"""
 
+from unittest.mock import patch
 from .common import EdiOrderpointCase
 
 
@@ -70,3 +71,33 @@ class TestTutorial(EdiOrderpointCase):
         self.apple.default_code = 'APPLE'
         self.fridge.name = 'FRIDGE'
         self.assertTrue(doc.action_execute())
+
+    def test05_relates_single_query(self):
+        """Lookup relationships resolved using a single query"""
+        EdiOrderpointRecord = self.env['edi.orderpoint.record']
+        rels = {x.key: x for x in EdiOrderpointRecord._edi_relates}
+        keys_by_rel = {
+            rels['product_key']: ['APPLE', 'BANANA', 'CHERRY'],
+            rels['location_key']: ['FRIDGE', 'CUPBOARD'],
+        }
+        expected = {
+            rels['product_key']: {'APPLE': self.apple.id,
+                                  'BANANA': self.banana.id},
+            rels['location_key']: {'FRIDGE': self.fridge.id,
+                                   'CUPBOARD': self.cupboard.id},
+        }
+        with patch.object(EdiOrderpointRecord.__class__,
+                          '_edi_relates_cache', False):
+            EdiOrderpointRecord._edi_relates_targets(keys_by_rel)
+            with EdiOrderpointRecord.statistics() as stats:
+                ids_by_rel = EdiOrderpointRecord._edi_relates_targets(
+                    keys_by_rel
+                )
+            self.assertEqual(ids_by_rel, expected)
+            self.assertEqual(stats.count, 1)
+            with patch.object(EdiOrderpointRecord.__class__,
+                              '_edi_relates_query', return_value=None):
+                ids_by_rel = EdiOrderpointRecord._edi_relates_targets(
+                    keys_by_rel
+                )
+            self.assertEqual(ids_by_rel, expected)
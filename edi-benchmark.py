@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+"""Benchmark EDI document processing
+
+Run synthetic end-to-end benchmarks for each EDI document type at one
+or more scales (e.g. 1k, 100k, or 1M generated rows), measuring
+records per second, queries per record, and growth in peak memory
+usage for the prepare and execute phases separately.  Use --memory to
+also trace the peak memory allocated during each phase (at the cost
+of much slower execution).
+
+Each benchmark runs in a separate process (so that peak memory usage
+measurements are independent), and all changes made to the database
+are rolled back.  Document types using chunked or parallel execution
+commit intermediate changes, which will not be rolled back.  Documents
+that report on existing data (such as stock transfer reports) will
+include any matching data already present in the database, so a
+dedicated benchmark database should be used.
+
+Results are compared against a JSON baseline file, and the exit
+status is non-zero if any metric has regressed by more than the
+threshold.  Use --update to record the results as the new baseline.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import sys
+
+import odoo
+from odoo import api, SUPERUSER_ID
+from odoo.addons.edi.tools import EdiBenchmark
+from odoo.addons.edi.tools.benchmark import parse_scale, regressions
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(
+    description=__doc__,
+    formatter_class=argparse.RawDescriptionHelpFormatter,
+)
+parser.add_argument('-c', '--config', help="Odoo configuration file")
+parser.add_argument('-d', '--database', default='odoo', help="Database name")
+parser.add_argument('-b', '--benchmark', action='append',
+                    help="Benchmark name (default: all available)")
+parser.add_argument('-s', '--scale', action='append', type=parse_scale,
+                    help="Number of generated rows (default: 1k)")
+parser.add_argument('-S', '--seed', type=int, default=0,
+                    help="Random number generator seed")
+parser.add_argument('-B', '--baseline', default='edi-benchmark.json',
+                    help="Baseline results file")
+parser.add_argument('-t', '--threshold', type=float, default=0.2,
+                    help="Maximum permitted relative regression")
+parser.add_argument('-u', '--update', action='store_true',
+                    help="Record results as the new baseline")
+parser.add_argument('-m', '--memory', action='store_true',
+                    help="Trace peak memory allocated during each phase")
+parser.add_argument('-l', '--list', action='store_true',
+                    help="List available benchmarks")
+args = parser.parse_args()
+
+# Load Odoo configuration
+odoo.tools.config.parse_config(
+    ['--config', args.config] if args.config else []
+)
+odoo.netsvc.init_logger()
+_logger = logging.getLogger('edi-benchmark')
+
+
+def load_benchmarks(registry):
+    """Load benchmarks for all installed modules"""
+    with api.Environment.manage(), registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        modules = env['ir.module.module'].search([('state', '=', 'installed')])
+        names = modules.mapped('name')
+    for name in names:
+        module = 'odoo.addons.%s.tests.benchmarks' % name
+        if importlib.util.find_spec('odoo.addons.%s' % name) is None:
+            continue
+        if importlib.util.find_spec(module) is not None:
+            importlib.import_module(module)
+    return EdiBenchmark.benchmarks()
+
+
+def run(benchmark, scale, queue):
+    """Run a single benchmark and roll back all changes"""
+    registry = odoo.registry(args.database)
+    with api.Environment.manage(), registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        try:
+            queue.put(benchmark(env, scale, seed=args.seed,
+                                trace_memory=args.memory).run())
+        finally:
+            cr.rollback()
+
+
+# Identify benchmarks, and close database connections before forking
+available = load_benchmarks(odoo.registry(args.database))
+odoo.sql_db.close_db(args.database)
+if args.list:
+    print('\n'.join(sorted(available)))
+    sys.exit()
+names = args.benchmark or sorted(available)
+unknown = set(names) - set(available)
+if unknown:
+    sys.exit("Unknown benchmark(s): %s" % ', '.join(sorted(unknown)))
+scales = args.scale or [1000]
+
+# Run benchmarks
+results = {}
+failed = False
+for name in names:
+    for scale in scales:
+        _logger.info("running %s at scale %d", name, scale)
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=run, args=(available[name], scale, queue),
+            name='%s-%d' % (name, scale),
+        )
+        process.start()
+        process.join()
+        if process.exitcode or queue.empty():
+            _logger.error("%s at scale %d failed", name, scale)
+            failed = True
+            continue
+        phases = queue.get()
+        results.setdefault(name, {})[str(scale)] = phases
+        for phase, metrics in sorted(phases.items()):
+            _logger.info("%s %d %s: %d records in %.2fs (%.1f records/s, "
+                         "%.2f queries/record, %d kB peak RSS growth%s)",
+                         name, scale, phase, metrics['records'],
+                         metrics['elapsed'], metrics['records_per_second'],
+                         metrics['queries_per_record'],
+                         metrics['memory_growth'],
+                         (", %d kB peak traced" % metrics['peak_memory']
+                          if 'peak_memory' in metrics else ""))
+
+# Load baseline
+baseline = {}
+if os.path.exists(args.baseline):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+# Update baseline, if applicable
+if args.update:
+    for name, runs in results.items():
+        baseline.setdefault(name, {}).update(runs)
+    with open(args.baseline, 'w') as f:
+        json.dump(baseline, f, indent=4, sort_keys=True)
+    _logger.info("updated baseline %s", args.baseline)
+
+# Check for regressions
+regressed = ([] if args.update else
+             list(regressions(baseline, results, args.threshold)))
+for name, scale, phase, metric, old, new in regressed:
+    _logger.error("%s %s %s %s regressed from %.2f to %.2f", name, scale,
+                  phase, metric, old, new)
+if failed:
+    sys.exit("One or more benchmarks failed")
+if regressed:
+    sys.exit("One or more benchmarks regressed")
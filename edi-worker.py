@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+"""Process EDI documents
+
+Prepare and execute unprocessed EDI documents directly on the server,
+using multiple worker processes.  Each worker process loads the model
+registry once, and then repeatedly claims a single unprocessed
+document using a row-level lock (and a session-level advisory lock,
+which survives any intermediate commits).  Any number of workers (on
+any number of nodes) may therefore run concurrently against the same
+database.
+
+Documents with open issues are ignored.  A document that fails with
+an unexpected exception has an issue raised against it, and so will
+not be claimed again until the issue is closed.
+
+On receipt of SIGTERM or SIGINT, each worker will finish processing
+its current document and then exit.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+import odoo
+from odoo import api, SUPERUSER_ID
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(
+    description=__doc__,
+    formatter_class=argparse.RawDescriptionHelpFormatter,
+)
+parser.add_argument('-c', '--config', help="Odoo configuration file")
+parser.add_argument('-d', '--database', default='odoo', help="Database name")
+parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                    help="Number of worker processes")
+parser.add_argument('-i', '--interval', type=float, default=10,
+                    help="Polling interval when idle (in seconds)")
+parser.add_argument('-r', '--report', type=float, default=60,
+                    help="Throughput reporting interval (in seconds)")
+parser.add_argument('-l', '--limit', type=int,
+                    help="Maximum number of documents per worker")
+parser.add_argument('-x', '--exit', action='store_true',
+                    help="Exit when no unprocessed documents remain")
+args = parser.parse_args()
+
+# Load Odoo configuration
+odoo.tools.config.parse_config(
+    ['--config', args.config] if args.config else []
+)
+odoo.netsvc.init_logger()
+_logger = logging.getLogger('edi-worker')
+
+
+class Worker(object):
+    """EDI worker process"""
+
+    def __init__(self, index):
+        self.name = 'worker-%d' % index
+        self.stopping = False
+        self.count = 0
+        self.failed = 0
+
+    def stop(self, _signum, _frame):
+        """Stop after processing the current document"""
+        _logger.info("%s draining", self.name)
+        self.stopping = True
+
+    def idle(self):
+        """Wait for more documents to arrive"""
+        deadline = time.time() + args.interval
+        while not self.stopping and time.time() < deadline:
+            time.sleep(min(1, args.interval))
+
+    def process(self, registry):
+        """Claim and process a single document
+
+        Returns ``False`` if no unprocessed document was available.
+        """
+        with api.Environment.manage(), registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            doc = env['edi.document'].claim()
+            if not doc:
+                return False
+            start = time.time()
+            try:
+                # pylint: disable=broad-except
+                executed = doc.action_execute()
+            except Exception as err:
+                _logger.exception("%s failed to process %s", self.name,
+                                  doc.name)
+                cr.rollback()
+                env.clear()
+                doc.raise_issue("Processing failed: %s", err)
+                executed = False
+            finally:
+                doc.release()
+            _logger.info("%s %s %s in %.2fs", self.name,
+                         ('executed' if executed else 'failed'), doc.name,
+                         (time.time() - start))
+        self.count += 1
+        if not executed:
+            self.failed += 1
+        return True
+
+    def report(self, start):
+        """Log throughput"""
+        elapsed = time.time() - start
+        _logger.info("%s processed %d documents (%d failed) in %.1fs "
+                     "(%.2f documents/s)", self.name, self.count,
+                     self.failed, elapsed,
+                     (self.count / elapsed if elapsed else 0))
+
+    def run(self):
+        """Process documents until stopped"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        registry = odoo.registry(args.database)
+        start = reported = time.time()
+        while not self.stopping:
+            if args.limit is not None and self.count >= args.limit:
+                break
+            if not self.process(registry):
+                if args.exit:
+                    break
+                self.idle()
+            if time.time() - reported >= args.report:
+                self.report(start)
+                reported = time.time()
+        self.report(start)
+
+
+# Start worker processes
+processes = [multiprocessing.Process(target=Worker(i).run, name='edi-%d' % i)
+             for i in range(args.workers)]
+for process in processes:
+    process.start()
+
+
+def drain(_signum, _frame):
+    """Ask all workers to finish their current documents and exit"""
+    for proc in processes:
+        if proc.is_alive():
+            proc.terminate()
+
+
+signal.signal(signal.SIGTERM, drain)
+signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+# Wait for worker processes
+for process in processes:
+    process.join()
+if any(x.exitcode for x in processes):
+    sys.exit("One or more workers failed")